@@ -1,9 +1,57 @@
 """Coleção de funções utilitárias para auxiliar na análise de dados."""
 
+import io
+import json
 from pathlib import Path
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import pyarrow as pa
+
+# Servidor de consultas (`python -m src.api.servidor`), compartilhado entre notebooks.
+URL_SERVICO = 'http://127.0.0.1:8765'
 
 
 def open_data_file(file_path: str) -> str:
     """Abre um arquivo de dados e retorna seu conteúdo."""
     with Path.open(file_path) as file:
         return file.read()
+
+
+def consultar(rota: str, url: str = URL_SERVICO, **parametros):
+    """Consulta o servidor de unidades processadas e retorna o resultado como DataFrame.
+
+    Evita que cada notebook carregue e agregue os arquivos inteiros: o servidor
+    mantém as unidades mapeadas e os resultados em cache.
+
+    Args:
+    ----
+        rota (str): 'varrer', 'contagens', 'duracao', 'dfg', 'datasets' ou 'colunas'.
+        url (str): Endereço do servidor.
+        **parametros: Parâmetros da rota (dataset, colunas, dimensao, inicio, fim,
+            limite, min_frequencia); os demais são filtros por coluna, com um valor
+            ou uma lista de valores, ex.: `complexity=['Simples', 'Médio']`.
+
+    Returns:
+    -------
+        pd.DataFrame: O resultado das tabelas (transferido em Arrow); 'datasets' e
+            'colunas' retornam a lista/dicionário do JSON.
+
+    Exemplo:
+    -------
+        consultar('contagens', dataset='Unidade 1', dimensao='movement_detail')
+
+    """
+    if isinstance(parametros.get('colunas'), (list, tuple)):
+        parametros['colunas'] = ','.join(parametros['colunas'])
+    query = urlencode({**parametros, 'formato': 'arrow'}, doseq=True)
+    try:
+        with urlopen(f'{url.rstrip("/")}/{rota.lstrip("/")}?{query}') as resposta:
+            corpo = resposta.read()
+            tipo = resposta.headers.get_content_type()
+    except HTTPError as erro:
+        raise ValueError(erro.read().decode('utf-8', 'replace')) from erro
+    if tipo == 'application/json':
+        return json.loads(corpo)
+    return pa.ipc.open_stream(io.BytesIO(corpo)).read_all().to_pandas()
@@ -0,0 +1,369 @@
+"""Fachada de consultas sobre as unidades processadas, para notebooks e consumidores externos.
+
+Em vez de cada notebook (ou sessão do dashboard) reler o arquivo inteiro e refazer as
+mesmas agregações, `ServicoConsultas` responde a partir do armazém mapeado em
+memória (`src.data.compartilhado`) e dos artefatos do pipeline:
+
+- `varrer`: linhas com projeção de colunas, janela de datas (`dataInicio`) e filtros
+  por valores de colunas categóricas, avaliados sobre a tabela Arrow mapeada;
+- `contagens` e `duracao`: com filtros só nas dimensões do cubo e sem janela de datas,
+  saem do cubo (`*_cubo.parquet`) e dos sketches (`*_sketches.parquet`) da unidade;
+  nos demais casos, das linhas selecionadas;
+- `dfg`: arestas do grafo de sucessão direta com a medida de dependência.
+
+Os resultados ficam em um cache LRU limitado em bytes, chaveado pela consulta e pela
+versão (mtime) do arquivo da unidade: uma unidade reprocessada invalida suas entradas.
+`src.api.servidor` expõe a mesma fachada por HTTP, para que vários analistas usem um
+único processo já aquecido.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+from src.data.compartilhado import DATASET_OPTIONS, RegistroDatasets
+from src.features.sketches import DIMENSOES, carregar_sketches, construir_sketches, quantis_duracao
+from src.models.model import construir_dfg, medidas_dependencia
+from src.visualization.cube import (
+    COLUNA_DURACAO,
+    carregar_cubo_pre_computado,
+    construir_cubo,
+    contagens,
+    estatisticas_duracao,
+    filtrar_cubo,
+)
+
+COLUNA_DATA = 'dataInicio'
+COLUNAS_DFG = ['processoID', 'activity', COLUNA_DATA]
+QUANTIS = (0.5, 0.9)
+LIMITE_CACHE_BYTES = 512 * 1024**2
+
+
+def tamanho_em_bytes(valor) -> int:
+    """Memória ocupada por um resultado (DataFrame/Series pela soma das colunas)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(index=True, deep=True))
+    return sys.getsizeof(valor)
+
+
+class CacheLRUBytes:
+    """Cache LRU cujo limite é a soma dos tamanhos das entradas, em bytes.
+
+    Ao passar do limite, as entradas usadas há mais tempo saem primeiro; uma entrada
+    maior que o limite inteiro não é guardada. Seguro para uso entre threads.
+    """
+
+    def __init__(self, limite_bytes: int = LIMITE_CACHE_BYTES):
+        """Cria o cache.
+
+        Args:
+        ----
+            limite_bytes (int): Soma máxima dos tamanhos das entradas.
+
+        """
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obter(self, chave, calcular):
+        """Valor de `chave`, calculado com `calcular()` (fora da trava) se ausente."""
+        with self._trava:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave][0]
+            self.faltas += 1
+
+        valor = calcular()
+        self.guardar(chave, valor)
+        return valor
+
+    def guardar(self, chave, valor) -> None:
+        """Guarda `valor`, removendo as entradas mais antigas até caber no limite."""
+        tamanho = tamanho_em_bytes(valor)
+        with self._trava:
+            if chave in self._entradas:
+                self.bytes -= self._entradas.pop(chave)[1]
+            if tamanho > self.limite_bytes:
+                return
+            self._entradas[chave] = (valor, tamanho)
+            self.bytes += tamanho
+            while self.bytes > self.limite_bytes:
+                _, (_, removido) = self._entradas.popitem(last=False)
+                self.bytes -= removido
+
+    def limpar(self) -> None:
+        """Remove todas as entradas."""
+        with self._trava:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estatisticas(self) -> dict:
+        """Entradas, bytes ocupados, limite, acertos e faltas."""
+        with self._trava:
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self.bytes,
+                'limite_bytes': self.limite_bytes,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+            }
+
+
+class ServicoConsultas:
+    """Consultas sobre as unidades processadas, com resultados em cache."""
+
+    def __init__(
+        self,
+        opcoes: dict | None = None,
+        limite_bytes: int = LIMITE_CACHE_BYTES,
+        diretorio: str | None = None,
+    ):
+        """Cria o serviço.
+
+        Args:
+        ----
+            opcoes (dict): Nome do dataset -> arquivo processado; None usa `DATASET_OPTIONS`.
+            limite_bytes (int): Limite do cache de resultados.
+            diretorio (str): Diretório do armazém mapeado; ver `src.data.compartilhado`.
+
+        """
+        self.registro = RegistroDatasets(DATASET_OPTIONS if opcoes is None else opcoes, diretorio)
+        self.cache = CacheLRUBytes(limite_bytes)
+
+    def datasets(self) -> list:
+        """Nomes dos datasets disponíveis."""
+        return self.registro.nomes()
+
+    def colunas(self, dataset: str) -> dict:
+        """Colunas do dataset e seus tipos Arrow."""
+        schema = self.registro.tabela(dataset).schema
+        return {campo.name: str(campo.type) for campo in schema}
+
+    def varrer(
+        self,
+        dataset: str,
+        colunas: list | None = None,
+        inicio=None,
+        fim=None,
+        filtros: dict | None = None,
+        limite: int | None = None,
+    ) -> pd.DataFrame:
+        """Linhas do dataset que atendem aos filtros.
+
+        Args:
+        ----
+            dataset (str): Nome do dataset.
+            colunas (list): Projeção de colunas; None devolve todas.
+            inicio (str | pd.Timestamp): Menor `dataInicio` incluída.
+            fim (str | pd.Timestamp): `dataInicio` a partir da qual as linhas são excluídas.
+            filtros (dict): Coluna -> valores aceitos (ex.: {'complexity': ['Simples']}).
+            limite (int): Número máximo de linhas devolvidas.
+
+        Returns:
+        -------
+            pd.DataFrame: Linhas selecionadas (somente leitura, no schema compacto).
+
+        """
+        colunas, filtros = self._preparar(dataset, colunas, filtros)
+        chave = ('varrer', *self._chave(dataset, inicio, fim, filtros), colunas, limite)
+        return self.cache.obter(
+            chave, lambda: self._varrer(dataset, colunas, inicio, fim, filtros, limite),
+        )
+
+    def contagens(
+        self,
+        dataset: str,
+        dimensao: str,
+        inicio=None,
+        fim=None,
+        filtros: dict | None = None,
+    ) -> pd.Series:
+        """Número de movimentos por valor de `dimensao`, do maior para o menor.
+
+        Os parâmetros de seleção são os de `varrer`.
+        """
+        _, filtros = self._preparar(dataset, [dimensao], filtros)
+        chave = ('contagens', *self._chave(dataset, inicio, fim, filtros), dimensao)
+        return self.cache.obter(chave, lambda: self._contagens(dataset, dimensao, inicio, fim, filtros))
+
+    def duracao(
+        self,
+        dataset: str,
+        dimensao: str,
+        inicio=None,
+        fim=None,
+        filtros: dict | None = None,
+    ) -> pd.DataFrame:
+        """Estatísticas da duração por valor de `dimensao`.
+
+        Os parâmetros de seleção são os de `varrer`.
+
+        Returns:
+        -------
+            pd.DataFrame: n, média, desvio, mínimo, máximo e os quantis `QUANTIS` (p50,
+                p90; aproximados pelos sketches quando a consulta sai do cubo).
+
+        """
+        _, filtros = self._preparar(dataset, [dimensao], filtros)
+        chave = ('duracao', *self._chave(dataset, inicio, fim, filtros), dimensao)
+        return self.cache.obter(chave, lambda: self._duracao(dataset, dimensao, inicio, fim, filtros))
+
+    def dfg(
+        self,
+        dataset: str,
+        inicio=None,
+        fim=None,
+        filtros: dict | None = None,
+        min_frequencia: int = 1,
+    ) -> pd.DataFrame:
+        """Arestas do grafo de sucessão direta das linhas selecionadas.
+
+        Os parâmetros de seleção são os de `varrer`; a sucessão é contada só entre os
+        movimentos selecionados de cada processo.
+
+        Returns:
+        -------
+            pd.DataFrame: origem, destino, frequencia e dependencia, da aresta mais
+                frequente para a menos frequente.
+
+        """
+        _, filtros = self._preparar(dataset, COLUNAS_DFG, filtros)
+        chave = ('dfg', *self._chave(dataset, inicio, fim, filtros), min_frequencia)
+        return self.cache.obter(chave, lambda: self._dfg(dataset, inicio, fim, filtros, min_frequencia))
+
+    def _varrer(self, dataset, colunas, inicio, fim, filtros, limite):
+        df = self.registro.dataframe(dataset, colunas, _filtros_arrow(inicio, fim, filtros))
+        return df if limite is None else df.head(limite)
+
+    def _contagens(self, dataset, dimensao, inicio, fim, filtros):
+        if self._usa_cubo(dimensao, inicio, fim, filtros):
+            cubo = filtrar_cubo(self._cubo(dataset), *_filtros_cubo(filtros))
+            return contagens(cubo, dimensao)
+
+        linhas = self._selecionar(dataset, [dimensao], inicio, fim, filtros)
+        return linhas[dimensao].value_counts().loc[lambda c: c > 0]
+
+    def _duracao(self, dataset, dimensao, inicio, fim, filtros):
+        if self._usa_cubo(dimensao, inicio, fim, filtros):
+            movimentos, complexidades = _filtros_cubo(filtros)
+            estatisticas = estatisticas_duracao(filtrar_cubo(self._cubo(dataset), movimentos, complexidades), dimensao)
+            sketches = filtrar_cubo(self._sketches(dataset), movimentos, complexidades)
+            return estatisticas.join(quantis_duracao(sketches, dimensao, QUANTIS))
+
+        linhas = self._selecionar(dataset, [dimensao, COLUNA_DURACAO], inicio, fim, filtros)
+        agrupado = linhas.groupby(dimensao, observed=True)[COLUNA_DURACAO]
+        # Pelos rótulos: numa seleção vazia, o `unstack` não gera nenhuma coluna de quantil.
+        quantis = agrupado.quantile(list(QUANTIS)).unstack().reindex(columns=list(QUANTIS))
+        quantis.columns = [f'p{round(q * 100):g}' for q in QUANTIS]
+        return pd.DataFrame({
+            'n': agrupado.count(),
+            'media': agrupado.mean(),
+            'desvio': agrupado.std(),
+            'minimo': agrupado.min(),
+            'maximo': agrupado.max(),
+        }).join(quantis)
+
+    def _dfg(self, dataset, inicio, fim, filtros, min_frequencia):
+        linhas = self._selecionar(dataset, COLUNAS_DFG, inicio, fim, filtros)
+        arestas = medidas_dependencia(construir_dfg(linhas).arestas)
+        arestas = arestas[arestas['frequencia'] >= min_frequencia]
+        return arestas.sort_values('frequencia', ascending=False, ignore_index=True)
+
+    def _selecionar(self, dataset, colunas, inicio, fim, filtros):
+        return self.registro.dataframe(dataset, list(dict.fromkeys(colunas)), _filtros_arrow(inicio, fim, filtros))
+
+    def _cubo(self, dataset):
+        caminho = self.registro.caminho(dataset)
+
+        def calcular():
+            cubo = carregar_cubo_pre_computado(caminho)
+            if cubo is not None:
+                return cubo
+            return construir_cubo(self.registro.dataframe(dataset, [*DIMENSOES, COLUNA_DURACAO]))
+
+        return self.cache.obter(('cubo', dataset, _versao(caminho)), calcular)
+
+    def _sketches(self, dataset):
+        caminho = self.registro.caminho(dataset)
+
+        def calcular():
+            sketches = carregar_sketches(caminho)
+            if sketches is not None:
+                return sketches
+            return construir_sketches(self.registro.dataframe(dataset, [*DIMENSOES, COLUNA_DURACAO, 'processoID']))
+
+        return self.cache.obter(('sketches', dataset, _versao(caminho)), calcular)
+
+    @staticmethod
+    def _usa_cubo(dimensao, inicio, fim, filtros):
+        return dimensao in DIMENSOES and inicio is None and fim is None and set(filtros) <= set(DIMENSOES)
+
+    def _preparar(self, dataset, colunas, filtros):
+        """Confere as colunas e normaliza a consulta: (projeção como tupla, filtros).
+
+        Filtros com lista vazia são descartados (vazio = todos, como no dashboard) e
+        os valores são convertidos para o tipo da coluna (textos vindos do HTTP).
+        """
+        schema = self.registro.tabela(dataset).schema
+        desconhecidas = [coluna for coluna in [*(colunas or []), *(filtros or {})] if coluna not in schema.names]
+        if desconhecidas:
+            raise ValueError(f'Colunas desconhecidas em {dataset!r}: {desconhecidas}')
+
+        normalizados = {}
+        for coluna, valores in (filtros or {}).items():
+            lista = [valores] if isinstance(valores, str) else list(valores)
+            if lista:
+                normalizados[coluna] = _converter_valores(lista, schema.field(coluna).type, coluna)
+        return (tuple(colunas) if colunas else None), normalizados
+
+    def _chave(self, dataset, inicio, fim, filtros):
+        versao = _versao(self.registro.caminho(dataset))
+        filtros = tuple(sorted((coluna, tuple(sorted(map(str, valores)))) for coluna, valores in filtros.items()))
+        return dataset, versao, _data(inicio), _data(fim), filtros
+
+
+def _versao(caminho):
+    try:
+        return os.path.getmtime(caminho)
+    except OSError:
+        return None
+
+
+def _data(valor):
+    return None if valor is None else pd.Timestamp(valor)
+
+
+def _converter_valores(valores, tipo, coluna):
+    if pa.types.is_dictionary(tipo):
+        tipo = tipo.value_type
+    try:
+        return pa.array(valores).cast(tipo).to_pylist()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as erro:
+        raise ValueError(f'Valores inválidos para {coluna!r} ({tipo}): {valores}') from erro
+
+
+def _filtros_arrow(inicio, fim, filtros):
+    """Filtros no formato de `src.data.storage.carregar_movimentos` (None se não houver)."""
+    lista = [(coluna, 'in', valores) for coluna, valores in filtros.items()]
+    if inicio is not None:
+        lista.append((COLUNA_DATA, '>=', _data(inicio)))
+    if fim is not None:
+        lista.append((COLUNA_DATA, '<', _data(fim)))
+    return lista or None
+
+
+def _filtros_cubo(filtros):
+    return [list(filtros.get(dimensao, [])) for dimensao in DIMENSOES]
+
@@ -0,0 +1,223 @@
+"""Servidor HTTP local (asyncio) para `ServicoConsultas`.
+
+Um único processo mantém as unidades mapeadas e o cache de resultados aquecidos;
+notebooks e outros consumidores consultam por HTTP em vez de cada um carregar os
+arquivos. As consultas rodam em threads (`asyncio.to_thread`), para que o laço de
+eventos continue atendendo enquanto uma agregação é calculada.
+
+Rotas (GET; parâmetros na query string):
+
+- `/datasets`: nomes dos datasets;
+- `/colunas?dataset=...`: colunas e tipos;
+- `/varrer?dataset=...&colunas=a,b&inicio=...&fim=...&limite=...`;
+- `/contagens?dataset=...&dimensao=...`;
+- `/duracao?dataset=...&dimensao=...`;
+- `/dfg?dataset=...&min_frequencia=...`;
+- `/cache`: estatísticas do cache.
+
+Qualquer outro parâmetro é um filtro por valores da coluna de mesmo nome, repetido
+para aceitar vários valores (`complexity=Simples&complexity=Médio`). As tabelas saem
+em JSON (lista de registros) ou, com `formato=arrow`, em Arrow IPC (stream).
+
+Uso:
+    PYTHONPATH=. python -m src.api.servidor --porta 8765 --limite-cache-mb 512
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pyarrow as pa
+from src.api.consultas import LIMITE_CACHE_BYTES, ServicoConsultas
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8765
+LIMITE_CABECALHO = 64 * 1024
+ROTAS = {'/datasets', '/cache', '/colunas', '/varrer', '/contagens', '/duracao', '/dfg'}
+PARAMETROS = {'dataset', 'colunas', 'dimensao', 'inicio', 'fim', 'limite', 'min_frequencia', 'formato'}
+TIPO_JSON = 'application/json; charset=utf-8'
+TIPO_ARROW = 'application/vnd.apache.arrow.stream'
+
+
+def rotear(servico: ServicoConsultas, caminho: str, parametros: dict):
+    """Executa a consulta de uma rota.
+
+    Args:
+    ----
+        servico (ServicoConsultas): Fachada de consultas.
+        caminho (str): Rota (ex.: '/contagens').
+        parametros (dict): Query string já decodificada (nome -> lista de valores).
+
+    Returns:
+    -------
+        O resultado da consulta (DataFrame, Series, list ou dict).
+
+    Raises:
+    ------
+        LookupError: Rota ou dataset inexistente.
+        ValueError: Parâmetros inválidos.
+
+    """
+    if caminho not in ROTAS:
+        raise LookupError(f'Rota desconhecida: {caminho}')
+    if caminho == '/datasets':
+        return servico.datasets()
+    if caminho == '/cache':
+        return servico.cache.estatisticas()
+
+    dataset = _obrigatorio(parametros, 'dataset')
+    selecao = {
+        'inicio': _unico(parametros, 'inicio'),
+        'fim': _unico(parametros, 'fim'),
+        'filtros': {nome: valores for nome, valores in parametros.items() if nome not in PARAMETROS},
+    }
+    if caminho == '/colunas':
+        return servico.colunas(dataset)
+    if caminho == '/varrer':
+        colunas = _unico(parametros, 'colunas')
+        return servico.varrer(
+            dataset,
+            colunas=colunas.split(',') if colunas else None,
+            limite=_inteiro(parametros, 'limite'),
+            **selecao,
+        )
+    if caminho == '/contagens':
+        return servico.contagens(dataset, _obrigatorio(parametros, 'dimensao'), **selecao)
+    if caminho == '/duracao':
+        return servico.duracao(dataset, _obrigatorio(parametros, 'dimensao'), **selecao)
+    return servico.dfg(dataset, min_frequencia=_inteiro(parametros, 'min_frequencia') or 1, **selecao)
+
+
+def serializar(resultado, formato: str = 'json') -> tuple:
+    """Corpo e content-type da resposta.
+
+    Series e índices nomeados viram colunas; em JSON, datas saem em ISO 8601.
+    """
+    if isinstance(resultado, pd.Series):
+        resultado = resultado.rename(resultado.name or 'valor').to_frame()
+    if isinstance(resultado, pd.DataFrame):
+        if resultado.index.name is not None:
+            resultado = resultado.reset_index()
+        if formato == 'arrow':
+            tabela = pa.Table.from_pandas(resultado, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, tabela.schema) as writer:
+                writer.write_table(tabela)
+            return sink.getvalue().to_pybytes(), TIPO_ARROW
+        return resultado.to_json(orient='records', date_format='iso', force_ascii=False).encode(), TIPO_JSON
+    return json.dumps(resultado, ensure_ascii=False, default=str).encode(), TIPO_JSON
+
+
+async def atender(servico: ServicoConsultas, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Atende uma conexão: lê uma requisição GET, consulta e responde (sem keep-alive)."""
+    try:
+        cabecalho = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        writer.close()
+        return
+
+    try:
+        metodo, alvo, _ = cabecalho.split(b'\r\n', 1)[0].decode('latin-1').split(' ', 2)
+        if metodo != 'GET':
+            raise NotImplementedError(f'Método não suportado: {metodo}')
+        url = urlsplit(alvo)
+        parametros = parse_qs(url.query, keep_blank_values=False)
+        formato = _unico(parametros, 'formato') or 'json'
+        resultado = await asyncio.to_thread(rotear, servico, url.path, parametros)
+        corpo, tipo = await asyncio.to_thread(serializar, resultado, formato)
+        status = HTTPStatus.OK
+    except (LookupError, FileNotFoundError) as erro:
+        status, corpo, tipo = HTTPStatus.NOT_FOUND, *_erro(erro)
+    except NotImplementedError as erro:
+        status, corpo, tipo = HTTPStatus.METHOD_NOT_ALLOWED, *_erro(erro)
+    except ValueError as erro:
+        status, corpo, tipo = HTTPStatus.BAD_REQUEST, *_erro(erro)
+    except Exception as erro:  # a conexão sempre recebe uma resposta
+        status, corpo, tipo = HTTPStatus.INTERNAL_SERVER_ERROR, *_erro(erro)
+
+    writer.write(
+        f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+        f'Content-Type: {tipo}\r\n'
+        f'Content-Length: {len(corpo)}\r\n'
+        'Connection: close\r\n\r\n'.encode('latin-1') + corpo,
+    )
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def iniciar(servico: ServicoConsultas, host: str = HOST_PADRAO, porta: int = PORTA_PADRAO) -> asyncio.Server:
+    """Abre o socket e passa a aceitar conexões (`porta=0` escolhe uma porta livre)."""
+    return await asyncio.start_server(
+        lambda reader, writer: atender(servico, reader, writer), host, porta, limit=LIMITE_CABECALHO,
+    )
+
+
+async def servir(servico: ServicoConsultas, host: str = HOST_PADRAO, porta: int = PORTA_PADRAO) -> None:
+    """Atende conexões até o processo ser interrompido."""
+    servidor = await iniciar(servico, host, porta)
+    enderecos = ', '.join(f'http://{s.getsockname()[0]}:{s.getsockname()[1]}' for s in servidor.sockets)
+    print(f'servindo {len(servico.datasets())} dataset(s) em {enderecos}', flush=True)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def _erro(erro):
+    mensagem = f'Não encontrado: {erro.args[0]!r}' if isinstance(erro, KeyError) and erro.args else str(erro)
+    return json.dumps({'erro': mensagem}, ensure_ascii=False).encode(), TIPO_JSON
+
+
+def _unico(parametros, nome):
+    valores = parametros.get(nome)
+    return valores[-1] if valores else None
+
+
+def _obrigatorio(parametros, nome):
+    valor = _unico(parametros, nome)
+    if valor is None:
+        raise ValueError(f'Parâmetro obrigatório ausente: {nome}')
+    return valor
+
+
+def _inteiro(parametros, nome):
+    valor = _unico(parametros, nome)
+    return None if valor is None else int(valor)
+
+
+def main(argv: list | None = None) -> int:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument(
+        '--limite-cache-mb', type=int, default=LIMITE_CACHE_BYTES // 1024**2,
+        help='Limite do cache de resultados, em MiB.',
+    )
+    parser.add_argument(
+        '--dataset', action='append', metavar='NOME=ARQUIVO',
+        help='Dataset servido (repetível); sem esta opção, os de DATASET_OPTIONS.',
+    )
+    parser.add_argument('--diretorio', help='Diretório do armazém mapeado (ver src.data.compartilhado).')
+    parser.add_argument('--publicar', action='store_true', help='Publica os datasets no armazém antes de servir.')
+    args = parser.parse_args(argv)
+
+    opcoes = dict(item.split('=', 1) for item in args.dataset) if args.dataset else None
+    servico = ServicoConsultas(opcoes, limite_bytes=args.limite_cache_mb * 1024**2, diretorio=args.diretorio)
+    if args.publicar:
+        servico.registro.publicar_todos()
+    try:
+        asyncio.run(servir(servico, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
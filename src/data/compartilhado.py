@@ -0,0 +1,256 @@
+"""Armazém somente leitura de unidades processadas em Arrow IPC mapeado em memória.
+
+Cada unidade processada (`*_processado.parquet`) é publicada uma vez como um
+arquivo Arrow IPC sem compressão, já no schema compacto. Os leitores abrem o
+arquivo com `pa.memory_map`: os buffers das colunas apontam direto para as páginas
+do arquivo no page cache, que o sistema operacional compartilha entre todos os
+processos e sessões que mapeiam o mesmo arquivo. Servir vários analistas custa
+praticamente a mesma RAM que servir um.
+
+Na conversão para pandas, inteiros e datas sem nulos e textos (`string[pyarrow]`)
+continuam apontando para o mapeamento; só os códigos das categóricas (1 a 4 bytes
+por linha) são copiados. Os DataFrames devolvidos são somente leitura.
+
+O nome publicado leva um hash do caminho absoluto da origem (unidades de
+diretórios diferentes com o mesmo nome não colidem) e outro do mtime/tamanho, então
+cada versão da origem tem seu próprio arquivo. A publicação grava em um arquivo
+temporário, troca com `os.replace` e remove as versões anteriores: leitores que já
+as mapearam continuam válidos até soltarem a referência.
+
+Uso:
+    python -m src.data.compartilhado /workspace/data/movimentos_unidade_*_processado.parquet
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import sys
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.data.schema import aplicar_schema
+from src.data.storage import carregar_movimentos
+
+BASE_PATH_DATA = '/workspace/data'
+# Unidades servidas pelo dashboard e pelo serviço de consultas (`src.api`).
+DATASET_OPTIONS = {
+    'Unidade 1': f'{BASE_PATH_DATA}/movimentos_unidade_1_processado.parquet',
+    'Unidade 2': f'{BASE_PATH_DATA}/movimentos_unidade_2_processado.parquet'
+}
+
+VARIAVEL_DIRETORIO = 'ARMAZEM_COMPARTILHADO'
+DIRETORIO_PADRAO = '/workspace/data/compartilhado'
+EXTENSAO = '.arrow'
+
+
+def diretorio_armazem(diretorio: str | None = None) -> str:
+    """Diretório do armazém: o informado, o de `ARMAZEM_COMPARTILHADO` ou o padrão."""
+    return diretorio or os.environ.get(VARIAVEL_DIRETORIO, DIRETORIO_PADRAO)
+
+
+def caminho_mapeado(caminho_origem: str, diretorio: str | None = None) -> str:
+    """Caminho do arquivo Arrow publicado para a versão atual de um arquivo processado.
+
+    Raises:
+    ------
+        OSError: A origem não existe.
+
+    """
+    estado = os.stat(caminho_origem)
+    versao = hashlib.blake2b(f'{estado.st_mtime_ns}:{estado.st_size}'.encode(), digest_size=6).hexdigest()
+    return f'{_prefixo_mapeado(caminho_origem, diretorio)}{versao}{EXTENSAO}'
+
+
+def esta_atualizado(caminho_origem: str, diretorio: str | None = None) -> bool:
+    """True se a versão atual do arquivo de origem já foi publicada."""
+    try:
+        return os.path.exists(caminho_mapeado(caminho_origem, diretorio))
+    except OSError:
+        return False
+
+
+def publicar(caminho_origem: str, diretorio: str | None = None) -> str:
+    """Publica um arquivo processado (Parquet ou diretório de partes) no armazém.
+
+    Args:
+    ----
+        caminho_origem (str): Saída `*_processado.parquet` do pipeline.
+        diretorio (str): Diretório do armazém; None usa `diretorio_armazem()`.
+
+    Returns:
+    -------
+        str: Caminho do arquivo `.arrow` publicado.
+
+    """
+    destino = caminho_mapeado(caminho_origem, diretorio)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+    tabela = para_tabela_mapeavel(aplicar_schema(carregar_movimentos(caminho_origem)))
+    temporario = f'{destino}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with pa.OSFile(temporario, 'wb') as sink, pa.ipc.new_file(sink, tabela.schema) as writer:
+            writer.write_table(tabela)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+    for anterior in glob.glob(f'{glob.escape(_prefixo_mapeado(caminho_origem, diretorio))}*{EXTENSAO}'):
+        if anterior != destino:
+            try:
+                os.remove(anterior)
+            except OSError:
+                pass
+    return destino
+
+
+def _prefixo_mapeado(caminho_origem, diretorio):
+    """Início do nome publicado, comum a todas as versões da mesma origem."""
+    absoluto = os.path.realpath(caminho_origem)
+    nome = os.path.splitext(os.path.basename(absoluto))[0]
+    origem = hashlib.blake2b(absoluto.encode(), digest_size=8).hexdigest()
+    return os.path.join(diretorio_armazem(diretorio), f'{nome}.{origem}.')
+
+
+def para_tabela_mapeavel(df: pd.DataFrame) -> pa.Table:
+    """Tabela Arrow contígua cujas colunas o pandas consegue ler sem cópia.
+
+    Datas são gravadas em nanossegundos (a unidade do `datetime64[ns]`) e cada coluna
+    vira um único bloco, para que a leitura não precise concatenar pedaços.
+    """
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for indice, campo in enumerate(tabela.schema):
+        if pa.types.is_timestamp(campo.type) and campo.type.unit != 'ns':
+            tabela = tabela.set_column(
+                indice, campo.name, tabela.column(indice).cast(pa.timestamp('ns', campo.type.tz)),
+            )
+    return tabela.combine_chunks()
+
+
+def mapear_tabela(caminho: str) -> pa.Table:
+    """Abre um arquivo publicado como tabela Arrow apoiada no mapeamento (sem cópia)."""
+    return pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+
+
+def tabela_para_pandas(tabela: pa.Table) -> pd.DataFrame:
+    """Converte a tabela mapeada para pandas mantendo os buffers no mapeamento.
+
+    Texto vira `string[pyarrow]` (o mesmo tipo de `src.data.schema`), que reaproveita
+    os buffers Arrow; `split_blocks` evita que o pandas consolide as colunas numéricas
+    em blocos novos.
+    """
+    return tabela.to_pandas(split_blocks=True, types_mapper=_tipo_pandas)
+
+
+def _tipo_pandas(tipo):
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+class RegistroDatasets:
+    """Associa nomes de datasets (ex.: `DATASET_OPTIONS`) às tabelas mapeadas.
+
+    Cada processo mantém uma tabela mapeada por dataset, reaberta quando a origem
+    muda; a primeira consulta de um dataset desatualizado o publica.
+    """
+
+    def __init__(self, opcoes: dict, diretorio: str | None = None):
+        """Cria o registro.
+
+        Args:
+        ----
+            opcoes (dict): Nome do dataset -> arquivo processado.
+            diretorio (str): Diretório do armazém; None usa `diretorio_armazem()`.
+
+        """
+        self.opcoes = dict(opcoes)
+        self.diretorio = diretorio
+        self._tabelas = {}
+        self._trava = threading.Lock()
+
+    def nomes(self) -> list:
+        """Nomes dos datasets registrados."""
+        return list(self.opcoes)
+
+    def caminho(self, nome: str) -> str:
+        """Arquivo processado de origem do dataset."""
+        return self.opcoes[nome]
+
+    def publicar_todos(self, forcar: bool = False) -> list:
+        """Publica os datasets desatualizados (ou todos, com `forcar`) e retorna os caminhos."""
+        publicados = []
+        for origem in self.opcoes.values():
+            if forcar or not esta_atualizado(origem, self.diretorio):
+                publicados.append(publicar(origem, self.diretorio))
+        return publicados
+
+    def tabela(self, nome: str) -> pa.Table:
+        """Tabela Arrow mapeada do dataset, publicando-o antes se preciso."""
+        return self.tabela_do_arquivo(self.caminho(nome))
+
+    def dataframe(self, nome: str, colunas: list | None = None, filtros: list | None = None) -> pd.DataFrame:
+        """DataFrame somente leitura do dataset; ver `dataframe_do_arquivo`."""
+        return self.dataframe_do_arquivo(self.caminho(nome), colunas, filtros)
+
+    def tabela_do_arquivo(self, caminho_origem: str) -> pa.Table:
+        """Tabela mapeada de um arquivo processado (registrado ou não)."""
+        with self._trava:
+            destino = caminho_mapeado(caminho_origem, self.diretorio)
+            atual = self._tabelas.get(caminho_origem)
+            if atual is not None and atual[0] == destino:
+                return atual[1]
+
+            if not os.path.exists(destino):
+                destino = publicar(caminho_origem, self.diretorio)
+            tabela = mapear_tabela(destino)
+            self._tabelas[caminho_origem] = (destino, tabela)
+            return tabela
+
+    def dataframe_do_arquivo(
+        self,
+        caminho_origem: str,
+        colunas: list | None = None,
+        filtros: list | None = None,
+    ) -> pd.DataFrame:
+        """DataFrame somente leitura de um arquivo processado, lido do mapeamento.
+
+        Args:
+        ----
+            caminho_origem (str): Arquivo processado.
+            colunas (list): Projeção de colunas; None carrega todas.
+            filtros (list): Filtros no formato de `src.data.storage.carregar_movimentos`;
+                as linhas selecionadas são copiadas, o restante continua mapeado.
+
+        Returns:
+        -------
+            pd.DataFrame: Movimentos no schema compacto.
+
+        """
+        tabela = self.tabela_do_arquivo(caminho_origem)
+        if filtros:
+            tabela = tabela.filter(pq.filters_to_expression(filtros))
+        if colunas:
+            tabela = tabela.select(list(colunas))
+        return tabela_para_pandas(tabela)
+
+
+def main(argv: list | None = None) -> int:
+    """Publica no armazém os arquivos processados passados na linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivos', nargs='+', help='Saídas *_processado.parquet do pipeline.')
+    parser.add_argument('--diretorio', help=f'Diretório do armazém (padrão: ${VARIAVEL_DIRETORIO} ou {DIRETORIO_PADRAO}).')
+    parser.add_argument('--forcar', action='store_true', help='Republica mesmo os já atualizados.')
+    args = parser.parse_args(argv)
+
+    registro = RegistroDatasets({arquivo: arquivo for arquivo in args.arquivos}, args.diretorio)
+    for caminho in registro.publicar_todos(forcar=args.forcar):
+        print(f'publicado: {caminho}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""Conversão das colunas de data dos movimentos com formato detectado e cache de valores.
+
+`pd.to_datetime` sem formato infere um formato a partir do primeiro valor e, quando
+ele não serve para todos (ou não há como inferir), cai para o `dateutil` elemento a
+elemento, o que domina o tempo de carga de arquivos grandes. Aqui:
+
+- o formato é detectado uma vez, a partir de uma amostra dos valores, escolhendo o
+  candidato que converte mais valores; formatos ISO 8601 usam o parser em C do pandas;
+- fora do ISO, só os valores distintos são convertidos (movimentos compartilham
+  muitas datas, e o hash de um texto custa bem menos que o `strptime`) e o
+  resultado é espalhado pelos códigos;
+- conjuntos grandes em formatos não ISO (parser `strptime`, ~4 µs por valor) são
+  divididos entre processos;
+- os valores que falham no formato detectado são tentados mais uma vez com
+  `format='mixed'`; os que ainda assim falham viram NaT, mas são contados e
+  reportados (`RelatorioDatas` e um aviso), em vez de sumirem em silêncio.
+
+Textos com fuso horário mantêm a saída do `pd.to_datetime`: com um único fuso, a
+coluna sai com esse fuso (`datetime64[ns, <fuso>]`). Com fusos misturados, em que o
+`pd.to_datetime` devolvia uma coluna de objetos `Timestamp`, a coluna sai em UTC sem fuso.
+"""
+
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+COLUNAS_DATA = ['dataInicio', 'dataFinal']
+FORMATOS_CANDIDATOS = [
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+]
+# Formatos convertidos pelo parser ISO 8601 em C do pandas (`format='ISO8601'`).
+FORMATOS_ISO = {*FORMATOS_CANDIDATOS[:5], '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M'}
+TAMANHO_AMOSTRA = 2_000
+LIMIAR_PARALELO = 1_000_000
+MAX_EXEMPLOS = 5
+# Marca de fusos misturados (`RelatorioDatas.fuso`).
+FUSOS_MISTURADOS = 'misturados'
+
+
+class FalhaConversaoDatas(UserWarning):
+    """Valores de data que não puderam ser convertidos e viraram NaT."""
+
+
+@dataclass
+class RelatorioDatas:
+    """Resumo da conversão de uma coluna de datas."""
+
+    coluna: str
+    formato: str | None
+    linhas: int
+    nulos: int
+    falhas: int
+    valores_distintos: int | None = None
+    processos: int = 1
+    exemplos: list = field(default_factory=list)
+    fuso: str | None = None
+
+
+def detectar_formato(valores) -> str | None:
+    """Formato `strftime` que converte a maior parte de uma amostra dos valores.
+
+    Args:
+    ----
+        valores (array-like): Textos de data (nulos são ignorados).
+
+    Returns:
+    -------
+        str | None: O formato, ou None se nenhum candidato converter algum valor.
+
+    """
+    amostra = pd.Series(valores, dtype=object).dropna()
+    if len(amostra) > TAMANHO_AMOSTRA:
+        amostra = amostra.iloc[np.linspace(0, len(amostra) - 1, TAMANHO_AMOSTRA).astype(int)]
+    amostra = amostra.astype(str)
+    if amostra.empty:
+        return None
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        palpites = [guess_datetime_format(amostra.iloc[0], dayfirst=dayfirst) for dayfirst in (False, True)]
+    candidatos = list(dict.fromkeys([*palpites, *FORMATOS_CANDIDATOS]))
+    melhor, melhor_convertidos = None, 0
+    for formato in filter(None, candidatos):
+        with warnings.catch_warnings():
+            # Fusos misturados (`%z`): o aviso do pandas não muda a contagem.
+            warnings.simplefilter('ignore', FutureWarning)
+            convertidos = pd.to_datetime(amostra, format=formato, errors='coerce').notna().sum()
+        if convertidos > melhor_convertidos:
+            melhor, melhor_convertidos = formato, convertidos
+        if convertidos == len(amostra):
+            break
+    return melhor
+
+
+def e_iso8601(formato: str | None) -> bool:
+    """True para formatos ISO 8601 sem fuso (data `%Y-%m-%d`, separador 'T' ou espaço)."""
+    return formato in FORMATOS_ISO
+
+
+def converter_coluna(
+    serie: pd.Series,
+    formato: str | None = None,
+    workers: int | None = None,
+) -> tuple:
+    """Converte uma coluna de textos em `datetime64[ns]`.
+
+    Args:
+    ----
+        serie (pd.Series): Coluna a converter; colunas já datetime são devolvidas como estão.
+        formato (str): Formato `strftime`; None detecta a partir de uma amostra.
+        workers (int): Processos para conjuntos grandes em formato não ISO; None decide
+            pelo tamanho (e usa 1 dentro de um processo filho, como os workers do lote);
+            1 mantém a conversão no processo atual.
+
+    Returns:
+    -------
+        tuple: (pd.Series convertida, `RelatorioDatas`).
+
+    """
+    nome = str(serie.name)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie, RelatorioDatas(nome, None, len(serie), int(serie.isna().sum()), 0)
+
+    textos = serie.to_numpy(dtype=object)
+    formato = formato or detectar_formato(textos)
+
+    # O parser ISO em C é mais rápido que o hash dos textos: sem cache nesse caso.
+    distintos = not e_iso8601(formato)
+    if distintos:
+        codigos, valores = pd.factorize(textos)
+    else:
+        valores = textos
+
+    processos = _numero_processos(len(valores), formato, workers)
+    convertidos, fuso = _converter_em_partes(valores, formato, processos)
+
+    # `isna` em arrays de objetos é caro: só os NaT são conferidos.
+    vazios = np.flatnonzero(np.isnat(convertidos))
+    falhou = vazios[~pd.isna(valores[vazios])]
+    if distintos:
+        datas = pd.DatetimeIndex(convertidos).take(codigos, allow_fill=True, fill_value=pd.NaT)
+        nulos = int((codigos < 0).sum())
+        falhas = int(np.isin(codigos, falhou).sum()) if len(falhou) else 0
+    else:
+        datas = pd.DatetimeIndex(convertidos)
+        nulos = len(vazios) - len(falhou)
+        falhas = len(falhou)
+
+    relatorio = RelatorioDatas(
+        coluna=nome,
+        formato=formato,
+        linhas=len(serie),
+        nulos=nulos,
+        falhas=falhas,
+        valores_distintos=len(valores) if distintos else None,
+        processos=processos,
+        exemplos=pd.unique(valores[falhou])[:MAX_EXEMPLOS].tolist() if falhas else [],
+        fuso=None if fuso is None else str(fuso),
+    )
+    if fuso is not None and fuso != FUSOS_MISTURADOS:
+        datas = datas.tz_localize('UTC').tz_convert(fuso)
+    return pd.Series(datas, index=serie.index, name=serie.name), relatorio
+
+
+def converter_datas(df: pd.DataFrame, colunas: list | None = None, workers: int | None = None) -> dict:
+    """Converte as colunas de data de `df` (in place) e avisa sobre valores não convertidos.
+
+    Args:
+    ----
+        df (pd.DataFrame): Movimentos.
+        colunas (list): Colunas a converter; None usa `COLUNAS_DATA` presentes em `df`.
+        workers (int): Ver `converter_coluna` (1 mantém tudo no processo atual, como
+            no dashboard).
+
+    Returns:
+    -------
+        dict: Coluna -> `RelatorioDatas`.
+
+    """
+    relatorios = {}
+    for coluna in colunas or [coluna for coluna in COLUNAS_DATA if coluna in df.columns]:
+        df[coluna], relatorios[coluna] = converter_coluna(df[coluna], workers=workers)
+        relatorio = relatorios[coluna]
+        if relatorio.falhas:
+            warnings.warn(
+                f"{coluna}: {relatorio.falhas} de {relatorio.linhas} valores não convertidos "
+                f"(formato {relatorio.formato!r}), por exemplo {relatorio.exemplos}",
+                FalhaConversaoDatas,
+                stacklevel=2,
+            )
+    return relatorios
+
+
+def _numero_processos(quantidade, formato, workers):
+    if workers is not None:
+        return max(1, workers)
+    if quantidade < LIMIAR_PARALELO or e_iso8601(formato) or multiprocessing.parent_process() is not None:
+        return 1
+    return max(1, min(os.cpu_count() or 1, quantidade // (LIMIAR_PARALELO // 4)))
+
+
+def _converter_em_partes(valores, formato, processos):
+    """(datas em UTC sem fuso, fuso comum dos textos: None, um fuso ou `FUSOS_MISTURADOS`)."""
+    if processos <= 1 or len(valores) < 2:
+        return _converter(valores, formato)
+
+    partes = np.array_split(valores, processos)
+    # 'spawn', como no lote: evita herdar threads do Arrow/Polars em um fork.
+    with ProcessPoolExecutor(processos, mp_context=multiprocessing.get_context('spawn')) as pool:
+        datas, fusos = zip(*pool.map(_converter, partes, [formato] * len(partes)), strict=True)
+    fusos = set(fusos)
+    return np.concatenate(datas), fusos.pop() if len(fusos) == 1 else FUSOS_MISTURADOS
+
+
+def _converter(valores, formato):
+    """Converte com o formato fixo e tenta de novo, com `format='mixed'`, só os que falharam."""
+    textos = pd.Series(valores, dtype=object)
+    formato_pandas = 'ISO8601' if e_iso8601(formato) else formato
+    if formato_pandas:
+        datas, fuso = _sem_fuso(textos, format=formato_pandas)
+    else:
+        datas, fuso = pd.Series(pd.NaT, index=textos.index, dtype='datetime64[ns]'), None
+
+    vazios = np.flatnonzero(datas.isna().to_numpy())
+    falhas = pd.Series(False, index=textos.index)
+    falhas.iloc[vazios] = textos.iloc[vazios].notna().to_numpy()
+    if falhas.any():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            try:
+                novas, fuso_novas = _sem_fuso(textos[falhas], format='mixed')
+            except (TypeError, ValueError):
+                # Textos com e sem fuso misturados: ficam como falhas.
+                novas = None
+        if novas is not None:
+            datas[falhas] = novas
+            if novas.notna().any() and fuso_novas != fuso:
+                fuso = fuso_novas if datas.count() == novas.count() else FUSOS_MISTURADOS
+    return datas.to_numpy(dtype='datetime64[ns]'), fuso
+
+
+def _sem_fuso(textos, **kwargs):
+    """`pd.to_datetime` em UTC sem fuso, mais o fuso dos textos (ou `FUSOS_MISTURADOS`)."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        datas = pd.to_datetime(textos, errors='coerce', **kwargs)
+    if datas.dtype == object:
+        # Fusos misturados: o pandas devolve objetos `Timestamp`; aqui, tudo em UTC.
+        datas = pd.to_datetime(textos, errors='coerce', utc=True, **kwargs)
+        return datas.dt.tz_convert(None), FUSOS_MISTURADOS
+    if isinstance(datas.dtype, pd.DatetimeTZDtype):
+        return datas.dt.tz_convert(None), datas.dt.tz
+    return datas, None
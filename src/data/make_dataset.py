@@ -1,18 +1,26 @@
 """Módulo para carregar e pré-processar o dataset de movimentos processuais."""
 
-import json
+import sys
 
+import numpy as np
 import pandas as pd
+from src.data.datas import converter_datas
+from src.data.schema import aplicar_schema, mapear_com_padrao, preencher_na
+from src.data.storage import EscritorMovimentos
+from src.data.tpu_index import carregar_indice_tpu
+from src.pipeline.instrumentacao import medir_etapa
 
 
+@medir_etapa()
 def load_and_preprocess_data(file_path: pd) -> pd.DataFrame:
     """Carrega o dataset e realiza o pré-processamento inicial.
 
-    - Converte as colunas de datas para o formato datetime.
+    - Converte as colunas de datas para o formato datetime (formato detectado, ver `src.data.datas`).
     - Trata valores nulos em 'complemento' e 'documento'.
     - Remove movimentos insignificantes.
     - Agrupa movimentos conforme árvore CNJ.
     - Calcula duração dos movimentos quando possível.
+    - Aplica o schema de tipos compactos (ver `src.data.schema`).
 
     Args:
     ----
@@ -25,25 +33,190 @@ def load_and_preprocess_data(file_path: pd) -> pd.DataFrame:
     """
     dados = pd.read_csv(file_path)
 
-    dados['dataInicio'] = pd.to_datetime(dados['dataInicio'], errors='coerce')
-    dados['dataFinal'] = pd.to_datetime(dados['dataFinal'], errors='coerce')
+    cnj_grouping = get_cnj_grouping()
 
-    dados['complemento'] = dados['complemento'].fillna('N/A')
-    dados['documento'] = dados['documento'].fillna('N/A')
+    dados = preprocessar_chunk(dados, cnj_grouping)
 
-    cnj_grouping = get_cnj_grouping()
+    return aplicar_schema(dados.drop_duplicates(subset=['processoID', 'activity']))
+
+
+def preprocessar_chunk(dados: pd.DataFrame, cnj_grouping: dict) -> pd.DataFrame:
+    """Aplica as etapas de pré-processamento linha a linha, sem a deduplicação.
+
+    É o trecho comum entre `load_and_preprocess_data` e o modo em streaming
+    (`load_and_preprocess_data_em_chunks`), já que nenhuma dessas etapas depende
+    de outras linhas do arquivo.
+
+    Args:
+    ----
+        dados (pd.DataFrame): DataFrame (ou chunk) bruto lido do CSV.
+        cnj_grouping (dict): Dicionário de agrupamento CNJ.
+
+    Returns:
+    -------
+        pd.DataFrame: DataFrame pré-processado, ainda com duplicatas.
+
+    """
+    # Valores que não viram data continuam NaT, mas são contados e avisados.
+    converter_datas(dados, ['dataInicio', 'dataFinal'])
+
+    dados['complemento'] = preencher_na(dados['complemento'], 'N/A')
+    dados['documento'] = preencher_na(dados['documento'], 'N/A')
 
     dados = remover_insignificantes_movements(dados, cnj_grouping)
 
-    dados['activity_group'] = (
-        dados['activity'].map(get_cnj_grouping()).fillna(dados['activity'])
-    )
+    dados['activity_group'] = mapear_com_padrao(dados['activity'], cnj_grouping)
 
     dados['duration_calculated'] = calcular_duração(dados)
 
-    return dados.drop_duplicates(subset=['processoID', 'activity'])
+    return dados
+
+
+def load_and_preprocess_data_em_chunks(
+    file_path: str,
+    output_path: str,
+    chunksize: int = 500_000,
+) -> int:
+    """Pré-processa um CSV maior que a memória em blocos, gravando a saída incrementalmente.
 
+    Cada chunk passa por `preprocessar_chunk` e é anexado ao arquivo de saída
+    (Parquet ou CSV, conforme a extensão; ver `EscritorMovimentos`). A
+    deduplicação por ('processoID', 'activity') é feita entre chunks com um
+    conjunto de hashes de 64 bits das chaves já vistas (`ChavesVistas`), que ocupa
+    8 bytes por chave distinta em vez de manter os dados em memória. O resultado é
+    o mesmo de `load_and_preprocess_data` (mantém a primeira ocorrência, na ordem
+    do arquivo).
 
+    Args:
+    ----
+        file_path (str): Caminho para o arquivo CSV bruto.
+        output_path (str): Caminho do `.parquet` (ou `.csv`) pré-processado a ser gerado.
+        chunksize (int): Número de linhas lidas por bloco.
+
+    Returns:
+    -------
+        int: Número de linhas gravadas.
+
+    """
+    cnj_grouping = get_cnj_grouping()
+    chaves_vistas = ChavesVistas()
+
+    with (
+        pd.read_csv(file_path, chunksize=chunksize) as leitor,
+        EscritorMovimentos(output_path) as escritor,
+    ):
+        for chunk in leitor:
+            pre = preprocessar_chunk(chunk, cnj_grouping)
+            escritor.escrever(pre[chaves_vistas.marcar_novas(pre)])
+
+    return escritor.linhas
+
+
+def hash_chaves(chaves: pd.DataFrame) -> np.ndarray:
+    """Calcula um hash uint64 por linha das colunas de chave.
+
+    Colunas numéricas são normalizadas para inteiro anulável, de forma que um
+    mesmo `processoID` gere o mesmo hash mesmo que um bloco o leia como float
+    (por conter valores nulos) e outro como int.
+
+    Args:
+    ----
+        chaves (pd.DataFrame): Colunas que compõem a chave.
+
+    Returns:
+    -------
+        np.ndarray: Array uint64 com um hash por linha.
+
+    """
+    normalizadas = {}
+    for coluna, serie in chaves.items():
+        if pd.api.types.is_numeric_dtype(serie):
+            normalizadas[coluna] = serie.astype('Int64')
+        else:
+            normalizadas[coluna] = serie.astype(object)
+
+    return pd.util.hash_pandas_object(
+        pd.DataFrame(normalizadas), index=False,
+    ).to_numpy()
+
+
+class ChavesVistas:
+    """Conjunto de chaves ('processoID', 'activity') já vistas, guardadas como hashes uint64.
+
+    Os hashes ficam em poucos arrays NumPy ordenados (um por faixa de tamanho),
+    consultados com `np.searchsorted`. Cada bloco novo vira um array; dois arrays de
+    tamanho parecido são fundidos (como em uma árvore LSM), de modo que há no máximo
+    ~log2(blocos) arrays e cada hash é reordenado O(log(blocos)) vezes, em vez de o
+    conjunto inteiro ser reordenado a cada bloco. A probabilidade de colisão de
+    hashes de 64 bits é desprezível para os volumes de um tribunal, e o custo de
+    memória é de 8 bytes por chave distinta.
+    """
+
+    COLUNAS_CHAVE = ['processoID', 'activity']
+
+    def __init__(self, hashes: np.ndarray | None = None):
+        self._faixas = []
+        if hashes is not None and len(hashes):
+            self._faixas.append(np.unique(np.asarray(hashes, dtype=np.uint64)))
+
+    def __len__(self):
+        return sum(len(faixa) for faixa in self._faixas)
+
+    @property
+    def hashes(self) -> np.ndarray:
+        """Todos os hashes vistos, ordenados (para persistir o conjunto)."""
+        if not self._faixas:
+            return np.empty(0, dtype=np.uint64)
+        return np.sort(np.concatenate(self._faixas))
+
+    def contem(self, hashes: np.ndarray) -> np.ndarray:
+        """Máscara dos `hashes` que já estão no conjunto."""
+        # Consultas ordenadas percorrem cada faixa em sequência (muito menos faltas de
+        # cache que consultas em ordem aleatória).
+        ordem = np.argsort(hashes, kind='stable')
+        consultas = hashes[ordem]
+        vistos_ordenados = np.zeros(len(hashes), dtype=bool)
+        for faixa in self._faixas:
+            posicoes = np.searchsorted(faixa, consultas)
+            posicoes[posicoes == len(faixa)] = 0
+            vistos_ordenados |= faixa[posicoes] == consultas
+        vistos = np.empty_like(vistos_ordenados)
+        vistos[ordem] = vistos_ordenados
+        return vistos
+
+    def marcar_novas(self, df: pd.DataFrame) -> np.ndarray:
+        """Retorna a máscara das linhas cuja chave ainda não foi vista e as registra.
+
+        Dentro do próprio bloco, apenas a primeira ocorrência de cada chave é marcada.
+
+        Args:
+        ----
+            df (pd.DataFrame): Bloco com as colunas de chave.
+
+        Returns:
+        -------
+            np.ndarray: Máscara booleana alinhada às linhas de `df`.
+
+        """
+        hashes = hash_chaves(df[self.COLUNAS_CHAVE])
+
+        novas = ~pd.Series(hashes).duplicated().to_numpy()
+        if self._faixas:
+            novas &= ~self.contem(hashes)
+
+        self._adicionar(np.sort(hashes[novas]))
+        return novas
+
+    def _adicionar(self, faixa):
+        # As faixas são disjuntas (só entram hashes novos): fundir é concatenar e ordenar.
+        if not len(faixa):
+            return
+        while self._faixas and len(self._faixas[-1]) <= 2 * len(faixa):
+            faixa = np.sort(np.concatenate([self._faixas.pop(), faixa]), kind='stable')
+        self._faixas.append(faixa)
+
+
+@medir_etapa()
 def remover_insignificantes_movements(df: pd.DataFrame, cnj_grouping: dict) -> pd.DataFrame:
     """Remove movimentos insignificantes do DataFrame baseado na árvore CNJ.
 
@@ -92,41 +265,22 @@ def remover_insignificantes_movements(df: pd.DataFrame, cnj_grouping: dict) -> p
 
 #     return df
 
+@medir_etapa()
 def get_cnj_grouping():
     """Constrói um dicionário de agrupamento CNJ com base na estrutura da Tabela de Padronização de Unidades (TPU).
 
+    A árvore é lida e indexada uma única vez por processo (ver `src.data.tpu_index`);
+    chamadas seguintes apenas copiam o mapa já pronto.
+
     Returns
     -------
         dict: Dicionário onde as chaves são identificadores de movimentos e os valores são categorias ou grupos.
 
     """
-    with open('/workspace/data/cnj-movimentos-tree.json') as file:
-        cnj_tree = json.load(file)
-
-    cnj_grouping = {}
-
-    def preencher_grupo(node, current_group=None):
-        """Função recursiva para preencher o dicionário de agrupamento a partir da estrutura hierárquica da TPU.
-
-        Args:
-        ----
-            node (dict): O nó atual da árvore TPU.
-            current_group (str): O grupo atual ao qual o nó pertence.
-
-        """
-        for key, sub_node in node.items():
-            if not sub_node:
-                cnj_grouping[int(key)] = (
-                    current_group if current_group else 'Outro Movimento'
-                )
-            else:
-                preencher_grupo(sub_node, current_group or key)
-
-    preencher_grupo(cnj_tree)
-
-    return cnj_grouping
+    return dict(carregar_indice_tpu().folha_para_grupo)
 
 
+@medir_etapa()
 def calcular_duração(df):
     """Calcula a duração dos movimentos em segundos.
 
@@ -142,18 +296,8 @@ def calcular_duração(df):
     return (df['dataFinal'] - df['dataInicio']).dt.total_seconds()
 
 if __name__ == '__main__':
-    # Carregar o primeiro dataset e realizar o pré-processamento
-    dataset_path_1 = '/workspace/data/movimentos_unidade_1.csv'
-    df_preprocessed_1 = load_and_preprocess_data(dataset_path_1)
-    print(df_preprocessed_1.head())
-    df_preprocessed_1.to_csv(
-        '/workspace/data/movimentos_unidade_1_pre_processado.csv', index=False,
-    )
-
-    # Carregar o segundo dataset e realizar o pré-processamento
-    dataset_path_2 = '/workspace/data/movimentos_unidade_2.csv'
-    df_preprocessed_2 = load_and_preprocess_data(dataset_path_2)
-    print(df_preprocessed_2.head())
-    df_preprocessed_2.to_csv(
-        '/workspace/data/movimentos_unidade_2_pre_processado.csv', index=False,
-    )
\ No newline at end of file
+    # Executa só a etapa de pré-processamento para as unidades em /workspace/data (ou as
+    # passadas na linha de comando); ver `src.pipeline.batch` para as opções.
+    from src.pipeline.batch import main
+
+    sys.exit(main([*sys.argv[1:], '--etapas', 'pre_processamento']))
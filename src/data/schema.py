@@ -0,0 +1,166 @@
+"""Schema de tipos compactos para o DataFrame de movimentos.
+
+Colunas de texto com poucos valores distintos viram `category`, texto livre vira
+string com armazenamento Arrow (`string[pyarrow]`) e os identificadores inteiros são
+reduzidos ao menor inteiro que os comporta. É aplicado ao fim de cada etapa
+(`load_and_preprocess_data`, `especializar_movimentos`, `load_data`) e é idempotente.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CATEGORICAS = [
+    'activity',
+    'activity_group',
+    'grupo_movimento',
+    'movement_detail',
+    'complexity',
+    'classe',
+    'assunto',
+]
+# Categóricas quando a cardinalidade é baixa; texto livre (Arrow) caso contrário.
+COLUNAS_TEXTO = ['documento', 'complemento']
+COLUNAS_TEXTO_LIVRE = ['NPU']
+COLUNAS_INTEIRAS = ['processoID', 'movimentoID', 'duration']
+
+LIMIAR_CARDINALIDADE = 0.5
+TIPO_TEXTO_LIVRE = 'string[pyarrow]'
+
+
+def aplicar_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte as colunas conhecidas para os tipos compactos (in place).
+
+    Args:
+    ----
+        df (pd.DataFrame): DataFrame de movimentos em qualquer etapa.
+
+    Returns:
+    -------
+        pd.DataFrame: O mesmo DataFrame, com os tipos convertidos.
+
+    """
+    # As colunas são substituídas inteiras (não há atribuição encadeada); o aviso do
+    # pandas para DataFrames derivados de um filtro não se aplica aqui.
+    with pd.option_context('mode.chained_assignment', None):
+        for coluna in COLUNAS_CATEGORICAS:
+            if _e_texto(df, coluna):
+                df[coluna] = para_categoria(df[coluna])
+
+        for coluna in COLUNAS_TEXTO:
+            if _e_texto(df, coluna):
+                df[coluna] = _texto_compacto(df[coluna])
+
+        for coluna in COLUNAS_TEXTO_LIVRE:
+            if _e_texto(df, coluna) and df[coluna].dtype == object:
+                df[coluna] = df[coluna].astype(TIPO_TEXTO_LIVRE)
+
+        for coluna in COLUNAS_INTEIRAS:
+            if coluna in df.columns:
+                df[coluna] = reduzir_inteiro(df[coluna])
+
+    return df
+
+
+def para_categoria(serie: pd.Series) -> pd.Series:
+    """Converte para `category`, mantendo a série se já for categórica."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return serie.astype('category')
+
+
+def reduzir_inteiro(serie: pd.Series) -> pd.Series:
+    """Reduz a série ao menor tipo inteiro possível (anulável se houver nulos).
+
+    Séries com valores não inteiros (por exemplo, floats com casas decimais) são
+    devolvidas sem alteração.
+    """
+    if not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return serie
+
+    valores = serie.dropna()
+    if valores.empty or not np.array_equal(valores, np.floor(valores)):
+        return serie
+
+    reduzida = pd.to_numeric(valores.astype('int64'), downcast='integer')
+    if serie.isna().any():
+        return serie.astype(reduzida.dtype.name.capitalize())
+    return serie.astype(reduzida.dtype)
+
+
+def preencher_na(serie: pd.Series, valor: str) -> pd.Series:
+    """`fillna` que funciona também em categóricas, sem convertê-las para objeto."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        if valor not in serie.cat.categories:
+            serie = serie.cat.add_categories([valor])
+    return serie.fillna(valor)
+
+
+def mapear_com_padrao(serie: pd.Series, mapa: dict) -> pd.Series:
+    """Equivalente a `serie.map(mapa).fillna(serie)`.
+
+    Em séries categóricas o mapa é aplicado só às categorias e o resultado é montado
+    a partir dos códigos, sem materializar uma coluna de objetos.
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.map(mapa).fillna(serie)
+
+    novos = [mapa.get(categoria, categoria) for categoria in serie.cat.categories]
+    codigos_novos, categorias = pd.factorize(pd.Index(novos, dtype=object))
+    codigos = serie.cat.codes.to_numpy()
+    return pd.Series(
+        pd.Categorical.from_codes(
+            np.where(codigos >= 0, codigos_novos[codigos], -1), categories=categorias,
+        ),
+        index=serie.index,
+        name=serie.name,
+    )
+
+
+def uso_memoria(df: pd.DataFrame) -> pd.Series:
+    """Bytes ocupados por coluna (contando o conteúdo das strings)."""
+    return df.memory_usage(deep=True, index=False)
+
+
+def relatorio_memoria(antes: pd.DataFrame, depois: pd.DataFrame) -> pd.DataFrame:
+    """Compara uso de memória e tipos por coluna antes e depois de `aplicar_schema`.
+
+    Args:
+    ----
+        antes (pd.DataFrame): DataFrame original.
+        depois (pd.DataFrame): DataFrame com o schema compacto.
+
+    Returns:
+    -------
+        pd.DataFrame: Tipos, MiB antes/depois e redução por coluna, com uma linha 'TOTAL'.
+
+    """
+    relatorio = pd.DataFrame({
+        'tipo_antes': antes.dtypes.astype(str),
+        'tipo_depois': depois.dtypes.astype(str),
+        'mib_antes': uso_memoria(antes) / 2**20,
+        'mib_depois': uso_memoria(depois) / 2**20,
+    })
+    relatorio.loc['TOTAL', ['mib_antes', 'mib_depois']] = (
+        relatorio[['mib_antes', 'mib_depois']].sum()
+    )
+    relatorio['reducao'] = 1 - relatorio['mib_depois'] / relatorio['mib_antes']
+    return relatorio
+
+
+def _texto_compacto(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == TIPO_TEXTO_LIVRE:
+        return serie
+    distintos = serie.nunique(dropna=True)
+    if len(serie) and distintos / len(serie) <= LIMIAR_CARDINALIDADE:
+        return serie.astype('category')
+    return serie.astype(TIPO_TEXTO_LIVRE)
+
+
+def _e_texto(df, coluna):
+    if coluna not in df.columns:
+        return False
+    dtype = df[coluna].dtype
+    return (
+        dtype == object
+        or isinstance(dtype, pd.CategoricalDtype | pd.StringDtype)
+    )
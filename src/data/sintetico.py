@@ -0,0 +1,265 @@
+"""Gerador de movimentos sintéticos no formato dos CSVs brutos das unidades.
+
+Os dados são estruturados por processo: cada caso começa com 'Distribuição', segue
+uma cadeia de Markov entre as atividades, tem datas crescentes com intervalos de
+horas a semanas e um número geométrico de movimentos (média 12). `movimentoID` é sorteado
+entre as folhas reais da árvore TPU (grupo do magistrado para despachos/decisões,
+do serventuário para o resto) e `documento`/`complemento` vêm de vocabulários por
+atividade, incluindo os termos usados pelas regras de `movement_detail`.
+
+A geração é feita em blocos de casos, então 10M de linhas cabem em memória
+limitada; a saída é CSV ou Parquet conforme a extensão.
+
+Uso:
+    python -m src.data.sintetico data/movimentos_sinteticos_1m.csv --linhas 1m
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.data.tpu_index import CAMINHO_TPU, carregar_indice_tpu
+
+TAMANHOS = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+LINHAS_POR_BLOCO = 1_000_000
+MEDIA_MOVIMENTOS_POR_CASO = 12
+INICIO_PERIODO = np.datetime64('2019-01-01T00:00:00', 'ns')
+DURACAO_PERIODO_S = 5 * 365 * 86400
+PRIMEIRO_PROCESSO = 100_000_000
+
+COLUNAS = [
+    'NPU', 'processoID', 'activity', 'dataInicio', 'dataFinal', 'duration',
+    'classe', 'assunto', 'movimentoID', 'complemento', 'documento',
+]
+
+ATIVIDADES = [
+    'Distribuição',
+    'Conclusão',
+    'Despacho',
+    'Mero expediente',
+    'Expedição de documento',
+    'Publicação',
+    'Decurso de Prazo',
+    'Audiência',
+]
+# Linha = atividade atual, coluna = próxima (mesma ordem de ATIVIDADES).
+TRANSICOES = np.array([
+    [0.00, 0.55, 0.05, 0.05, 0.25, 0.05, 0.00, 0.05],
+    [0.00, 0.02, 0.45, 0.35, 0.05, 0.03, 0.00, 0.10],
+    [0.00, 0.05, 0.02, 0.05, 0.45, 0.35, 0.03, 0.05],
+    [0.00, 0.05, 0.05, 0.02, 0.45, 0.35, 0.03, 0.05],
+    [0.00, 0.10, 0.02, 0.02, 0.06, 0.40, 0.35, 0.05],
+    [0.00, 0.15, 0.02, 0.02, 0.06, 0.05, 0.65, 0.05],
+    [0.00, 0.70, 0.02, 0.03, 0.10, 0.05, 0.02, 0.08],
+    [0.00, 0.50, 0.05, 0.10, 0.15, 0.15, 0.02, 0.03],
+])
+# Intervalo médio (horas) até o próximo movimento e duração média do movimento.
+ESPERA_MEDIA_H = np.array([24, 240, 48, 48, 72, 120, 360, 480])
+DURACAO_MEDIA_H = np.array([2, 72, 24, 24, 12, 24, 1, 4])
+GRUPO_TPU = {'Despacho': '1', 'Mero expediente': '1', 'Conclusão': '1', 'Audiência': '1'}
+GRUPO_TPU_PADRAO = '14'
+
+DOCUMENTOS = {
+    'Distribuição': ['CERTIDÃO', None],
+    'Conclusão': [None, 'CERTIDÃO'],
+    'Despacho': ['DESPACHO', 'DECISÃO', 'SENTENÇA'],
+    'Mero expediente': ['DESPACHO', None],
+    'Expedição de documento': ['CERTIDÃO', 'OFÍCIO', 'MANDADO', 'CARTA', 'Outros documentos'],
+    'Publicação': ['DIÁRIO DE JUSTIÇA ELETRÔNICO', None],
+    'Decurso de Prazo': ['CERTIDÃO', None],
+    'Audiência': ['ATA DE AUDIÊNCIA', 'TERMO DE AUDIÊNCIA', None],
+}
+COMPLEMENTOS = {
+    'Distribuição': ['sorteio', 'dependência', 'prevenção'],
+    'Conclusão': ['para despacho', 'para decisão', 'para julgamento', 'para sentença'],
+    'Despacho': [None, 'urgente'],
+    'Mero expediente': [None, 'intimação da parte'],
+    'Expedição de documento': ['intimação eletrônica', 'citação', 'prazo de 15 dias', 'urgente', None],
+    'Publicação': ['intimação eletrônica', 'prazo', None],
+    'Decurso de Prazo': ['prazo', None],
+    'Audiência': ['designada', 'realizada', 'cancelada', 'redesignada', 'não realizada'],
+}
+CLASSES = ['Procedimento Comum Cível', 'Execução Fiscal', 'Procedimento do Juizado Especial Cível',
+           'Cumprimento de Sentença', 'Mandado de Segurança']
+ASSUNTOS = ['Indenização por Dano Moral', 'Dívida Ativa', 'Obrigação de Fazer / Não Fazer',
+            'Contratos Bancários', 'Benefícios em Espécie', 'Tributário']
+
+
+def gerar_bloco(n_linhas: int, rng: np.random.Generator, primeiro_processo: int, folhas: dict) -> pd.DataFrame:
+    """Gera ~`n_linhas` movimentos de casos completos, em ordem aleatória.
+
+    Args:
+    ----
+        n_linhas (int): Número de linhas (o último caso é truncado para fechar a conta).
+        rng (np.random.Generator): Gerador de números aleatórios.
+        primeiro_processo (int): processoID do primeiro caso do bloco.
+        folhas (dict): Grupo de topo da TPU -> array de movimentoIDs das folhas.
+
+    Returns:
+    -------
+        pd.DataFrame: Movimentos com as colunas de `COLUNAS`.
+
+    """
+    tamanhos = rng.geometric(1 / MEDIA_MOVIMENTOS_POR_CASO, size=n_linhas // 2 + 1)
+    limite = np.searchsorted(np.cumsum(tamanhos), n_linhas)
+    tamanhos = tamanhos[:limite + 1]
+    tamanhos[-1] -= tamanhos.sum() - n_linhas
+    n_casos = len(tamanhos)
+
+    caso = np.repeat(np.arange(n_casos), tamanhos)
+    primeira = np.r_[0, np.cumsum(tamanhos)[:-1]]
+    posicao = np.arange(n_linhas) - primeira[caso]
+
+    atividade = _cadeia_markov(posicao, primeira, tamanhos, rng)
+
+    # Datas: início do caso + soma acumulada das esperas dentro do caso.
+    espera_s = rng.exponential(ESPERA_MEDIA_H[atividade] * 3600)
+    espera_s[primeira] = 0
+    acumulado = np.cumsum(espera_s)
+    deslocamento = acumulado - acumulado[primeira][caso]
+    inicio_caso = rng.uniform(0, DURACAO_PERIODO_S, n_casos)[caso]
+    data_inicio = INICIO_PERIODO + ((inicio_caso + deslocamento) * 1e9).astype('timedelta64[ns]')
+    duracao_s = rng.exponential(DURACAO_MEDIA_H[atividade] * 3600)
+    data_final = data_inicio + (duracao_s * 1e9).astype('timedelta64[ns]')
+
+    processo = primeiro_processo + caso
+    nomes = np.array(ATIVIDADES, dtype=object)
+    df = pd.DataFrame({
+        'NPU': processo,
+        'processoID': processo,
+        'activity': nomes[atividade],
+        'dataInicio': data_inicio,
+        'dataFinal': data_final,
+        'duration': 0,
+        'classe': np.array(CLASSES, dtype=object)[rng.integers(0, len(CLASSES), n_casos)][caso],
+        'assunto': np.array(ASSUNTOS, dtype=object)[rng.integers(0, len(ASSUNTOS), n_casos)][caso],
+        'movimentoID': _sortear_movimentos(atividade, rng, folhas),
+        'complemento': _sortear_texto(atividade, COMPLEMENTOS, rng),
+        'documento': _sortear_texto(atividade, DOCUMENTOS, rng),
+    }, columns=COLUNAS)
+    return df.take(rng.permutation(n_linhas)).reset_index(drop=True)
+
+
+def gerar_movimentos(
+    saida: str,
+    n_linhas: int,
+    semente: int = 0,
+    caminho_tpu: str = CAMINHO_TPU,
+    linhas_por_bloco: int = LINHAS_POR_BLOCO,
+) -> int:
+    """Grava `n_linhas` movimentos sintéticos em `saida` (CSV ou Parquet).
+
+    Args:
+    ----
+        saida (str): Arquivo de saída; '.parquet' grava Parquet, o resto CSV.
+        n_linhas (int): Total de linhas.
+        semente (int): Semente do gerador (mesma semente, mesmo arquivo).
+        caminho_tpu (str): Árvore TPU de onde saem os movimentoIDs.
+        linhas_por_bloco (int): Linhas geradas e gravadas por vez.
+
+    Returns:
+    -------
+        int: Linhas gravadas.
+
+    """
+    folhas = _folhas_por_grupo(caminho_tpu)
+    rngs = np.random.default_rng(semente).spawn(-(-n_linhas // linhas_por_bloco))
+    parquet = saida.endswith('.parquet')
+    escritor = None
+    temporario = f'{saida}.tmp'
+
+    gravadas = 0
+    primeiro_processo = PRIMEIRO_PROCESSO
+    for rng in rngs:
+        bloco = gerar_bloco(min(linhas_por_bloco, n_linhas - gravadas), rng, primeiro_processo, folhas)
+        primeiro_processo = int(bloco['processoID'].max()) + 1
+
+        if parquet:
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            escritor = escritor or pq.ParquetWriter(temporario, tabela.schema, compression='zstd')
+            escritor.write_table(tabela)
+        else:
+            _formatar_datas(bloco).to_csv(temporario, mode='a' if gravadas else 'w', header=not gravadas, index=False)
+        gravadas += len(bloco)
+
+    if escritor is not None:
+        escritor.close()
+    os.replace(temporario, saida)
+    return gravadas
+
+
+def _cadeia_markov(posicao, primeira, tamanhos, rng):
+    """Sorteia as atividades passo a passo, vetorizado entre os casos."""
+    atividade = np.zeros(len(posicao), dtype=np.int8)
+    acumulada = np.cumsum(TRANSICOES, axis=1)
+    for passo in range(1, int(tamanhos.max())):
+        atuais = primeira[tamanhos > passo] + passo
+        anteriores = acumulada[atividade[atuais - 1]]
+        atividade[atuais] = (rng.random(len(atuais))[:, None] > anteriores).sum(axis=1)
+    return atividade
+
+
+def _sortear_movimentos(atividade, rng, folhas):
+    """movimentoID entre as folhas TPU do grupo da atividade (Zipf: poucos dominam)."""
+    movimentos = np.empty(len(atividade), dtype=np.int64)
+    for codigo, nome in enumerate(ATIVIDADES):
+        linhas = np.flatnonzero(atividade == codigo)
+        candidatos = folhas.get(GRUPO_TPU.get(nome, GRUPO_TPU_PADRAO))
+        if candidatos is None:
+            candidatos = np.concatenate(list(folhas.values()))
+        # Cada atividade usa um subconjunto fixo (pela posição da atividade) das folhas.
+        subconjunto = np.roll(candidatos, -codigo * 17)[:25]
+        indice = np.minimum(rng.zipf(1.6, len(linhas)) - 1, len(subconjunto) - 1)
+        movimentos[linhas] = subconjunto[indice]
+    return movimentos
+
+
+def _sortear_texto(atividade, vocabulario, rng):
+    texto = np.empty(len(atividade), dtype=object)
+    for codigo, nome in enumerate(ATIVIDADES):
+        linhas = np.flatnonzero(atividade == codigo)
+        opcoes = np.array(vocabulario[nome], dtype=object)
+        texto[linhas] = opcoes[rng.integers(0, len(opcoes), len(linhas))]
+    return texto
+
+
+def _folhas_por_grupo(caminho_tpu):
+    folha_para_grupo = carregar_indice_tpu(caminho_tpu).folha_para_grupo
+    grupos = {}
+    for folha, grupo in folha_para_grupo.items():
+        grupos.setdefault(grupo, []).append(folha)
+    return {grupo: np.array(sorted(folhas)) for grupo, folhas in grupos.items()}
+
+
+def _formatar_datas(df):
+    """Datas no mesmo formato dos CSVs brutos (ISO com nanossegundos)."""
+    for coluna in ('dataInicio', 'dataFinal'):
+        df[coluna] = np.datetime_as_string(df[coluna].to_numpy(), unit='ns')
+    return df
+
+
+def _linhas(valor):
+    return TAMANHOS.get(valor.lower()) or int(valor)
+
+
+def main(argv: list | None = None) -> None:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('saida', help='Arquivo .csv ou .parquet de saída.')
+    parser.add_argument(
+        '--linhas', type=_linhas, default=TAMANHOS['10k'],
+        help=f'Número de linhas ou um dos tamanhos {list(TAMANHOS)}.',
+    )
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--tpu', default=CAMINHO_TPU, help='Árvore TPU (cnj-movimentos-tree.json).')
+    args = parser.parse_args(argv)
+
+    linhas = gerar_movimentos(args.saida, args.linhas, args.semente, args.tpu)
+    print(f'{linhas} movimentos gravados em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
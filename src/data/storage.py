@@ -0,0 +1,195 @@
+"""Armazenamento colunar (Parquet/Arrow) dos movimentos entre as etapas do pipeline.
+
+Os arquivos intermediários (`*_pre_processado` e `*_processado`) são gravados em
+Parquet: as datas continuam tipadas como timestamp, as colunas de texto de baixa
+cardinalidade são gravadas como dicionário (e voltam como `category` no pandas) e
+a leitura aceita projeção de colunas e filtros empurrados para o leitor do
+Parquet. O CSV fica apenas como exportação opcional.
+"""
+
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+COLUNAS_DICIONARIO = [
+    'NPU',
+    'activity',
+    'activity_group',
+    'grupo_movimento',
+    'movement_detail',
+    'complexity',
+    'documento',
+    'complemento',
+    'classe',
+    'assunto',
+]
+COMPRESSAO = 'zstd'
+
+
+def para_tabela_arrow(df: pd.DataFrame, schema: pa.Schema | None = None) -> pa.Table:
+    """Converte o DataFrame em tabela Arrow, codificando as colunas de texto como dicionário.
+
+    Args:
+    ----
+        df (pd.DataFrame): DataFrame de movimentos.
+        schema (pa.Schema): Schema a ser imposto (usado para manter blocos consistentes).
+
+    Returns:
+    -------
+        pa.Table: Tabela pronta para ser gravada.
+
+    """
+    if schema is not None:
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    for indice, campo in enumerate(tabela.schema):
+        # Tipos dependentes do conteúdo do bloco são fixados, para que blocos e partes
+        # seguintes tenham o mesmo schema: colunas de texto inteiramente nulas chegam
+        # como `null`, e inteiros/categóricas reduzidos por `aplicar_schema` variam de
+        # largura. O schema compacto é reaplicado na leitura.
+        tipo = _tipo_estavel(campo.type)
+        if tipo != campo.type:
+            tabela = tabela.set_column(
+                indice, campo.name, tabela.column(indice).cast(tipo),
+            )
+    for coluna in COLUNAS_DICIONARIO:
+        if coluna not in tabela.column_names:
+            continue
+        indice = tabela.schema.get_field_index(coluna)
+        valores = tabela.column(indice)
+        if pa.types.is_string(valores.type) or pa.types.is_large_string(valores.type):
+            tabela = tabela.set_column(
+                indice, coluna, valores.dictionary_encode(),
+            )
+    return tabela
+
+
+def _tipo_estavel(tipo):
+    if pa.types.is_null(tipo):
+        return pa.string()
+    if pa.types.is_integer(tipo):
+        return pa.int64()
+    if pa.types.is_dictionary(tipo):
+        return pa.dictionary(pa.int32(), _tipo_estavel(tipo.value_type))
+    return tipo
+
+
+def salvar_movimentos(df: pd.DataFrame, caminho: str, exportar_csv: bool = False) -> None:
+    """Grava os movimentos em Parquet e, opcionalmente, exporta uma cópia em CSV.
+
+    Args:
+    ----
+        df (pd.DataFrame): DataFrame de movimentos.
+        caminho (str): Caminho do arquivo `.parquet`.
+        exportar_csv (bool): Se True, grava também um `.csv` com o mesmo nome.
+
+    """
+    if os.path.isdir(caminho):
+        # Saída anterior gerada em modo incremental (diretório de partes).
+        shutil.rmtree(caminho)
+    pq.write_table(para_tabela_arrow(df), caminho, compression=COMPRESSAO)
+
+    if exportar_csv:
+        df.to_csv(caminho_csv(caminho), index=False)
+
+
+def carregar_movimentos(
+    caminho: str,
+    colunas: list | None = None,
+    filtros: list | None = None,
+) -> pd.DataFrame:
+    """Carrega movimentos de um arquivo (ou diretório) Parquet.
+
+    Args:
+    ----
+        caminho (str): Caminho do `.parquet` ou de um diretório de partes `.parquet`.
+        colunas (list): Projeção de colunas; None carrega todas.
+        filtros (list): Filtros no formato do `pyarrow.parquet.read_table`, por exemplo
+            `[('complexity', 'in', ['Simples']), ('dataInicio', '>=', pd.Timestamp('2022-01-01'))]`.
+            São avaliados pelo leitor do Parquet, que descarta row groups pelas estatísticas.
+
+    Returns:
+    -------
+        pd.DataFrame: Movimentos com datas tipadas e textos como `category`.
+
+    """
+    tabela = pq.read_table(caminho, columns=colunas, filters=filtros)
+    return tabela.to_pandas()
+
+
+def caminho_csv(caminho: str) -> str:
+    """Retorna o caminho `.csv` equivalente a um caminho `.parquet`."""
+    return os.path.splitext(caminho)[0] + '.csv'
+
+
+class EscritorMovimentos:
+    """Grava movimentos bloco a bloco em `.parquet` ou `.csv`, conforme a extensão do destino.
+
+    Em Parquet, cada bloco vira um row group do mesmo arquivo; o schema do primeiro
+    bloco é imposto aos seguintes para que colunas inteiramente nulas em um bloco
+    não mudem de tipo.
+
+    Exemplo:
+        with EscritorMovimentos('saida.parquet') as escritor:
+            for chunk in chunks:
+                escritor.escrever(chunk)
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.parquet = caminho.endswith('.parquet')
+        self.linhas = 0
+        self._writer = None
+        self._schema = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def escrever(self, df: pd.DataFrame) -> None:
+        """Anexa um bloco ao arquivo de destino."""
+        if self.parquet:
+            if self._writer is None:
+                tabela = para_tabela_arrow(df)
+                self._schema = tabela.schema
+                self._writer = pq.ParquetWriter(
+                    self.caminho, self._schema, compression=COMPRESSAO,
+                )
+            else:
+                tabela = para_tabela_arrow(df, schema=self._schema)
+            self._writer.write_table(tabela)
+        else:
+            df.to_csv(
+                self.caminho,
+                mode='w' if self.linhas == 0 else 'a',
+                header=self.linhas == 0,
+                index=False,
+            )
+        self.linhas += len(df)
+
+    def fechar(self) -> None:
+        """Finaliza o arquivo Parquet (grava o rodapé)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def exportar_csv_em_blocos(caminho: str) -> int:
+    """Exporta um `.parquet` para o `.csv` equivalente, um row group por vez.
+
+    Returns
+    -------
+        int: Linhas exportadas.
+
+    """
+    arquivo = pq.ParquetFile(caminho)
+    with EscritorMovimentos(caminho_csv(caminho)) as escritor:
+        for indice in range(arquivo.num_row_groups):
+            escritor.escrever(arquivo.read_row_group(indice).to_pandas())
+    return escritor.linhas
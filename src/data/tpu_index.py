@@ -0,0 +1,128 @@
+"""Índice da árvore de movimentos da TPU do CNJ, carregado uma única vez por processo.
+
+A árvore `cnj-movimentos-tree.json` é percorrida uma só vez e dela são extraídos
+os mapas usados pelas etapas do pipeline (folha -> grupo de topo, nó -> pai,
+nó -> profundidade e nó -> caminho de ancestrais), de forma que toda consulta é
+uma busca em dicionário.
+
+O índice é memoizado em memória e também gravado em um arquivo pickle ao lado
+do JSON, ambos invalidados quando o mtime ou o tamanho do JSON mudam.
+"""
+
+import json
+import os
+import pickle
+from dataclasses import dataclass, field
+
+CAMINHO_TPU = '/workspace/data/cnj-movimentos-tree.json'
+SUFIXO_CACHE = '.idx.pkl'
+GRUPO_PADRAO = 'Outro Movimento'
+
+_indices_em_memoria = {}
+
+
+@dataclass
+class IndiceTPU:
+    """Mapas pré-computados da árvore TPU.
+
+    Attributes
+    ----------
+        folha_para_grupo (dict): movimentoID (int) das folhas -> chave do grupo de topo.
+        pai (dict): chave do nó -> chave do nó pai (None para a raiz).
+        profundidade (dict): chave do nó -> profundidade (0 para os grupos de topo).
+        caminho (dict): chave do nó -> tupla de ancestrais, do topo até o próprio nó.
+        classe_tpu (dict): chave do nó -> subárvore do nó, ou a própria chave se for folha.
+
+    """
+
+    folha_para_grupo: dict = field(default_factory=dict)
+    pai: dict = field(default_factory=dict)
+    profundidade: dict = field(default_factory=dict)
+    caminho: dict = field(default_factory=dict)
+    classe_tpu: dict = field(default_factory=dict)
+
+
+def construir_indice_tpu(cnj_tree: dict) -> IndiceTPU:
+    """Percorre a árvore TPU uma vez e monta o `IndiceTPU`.
+
+    Args:
+    ----
+        cnj_tree (dict): Árvore TPU carregada do JSON.
+
+    Returns:
+    -------
+        IndiceTPU: Índice com todos os mapas preenchidos.
+
+    """
+    indice = IndiceTPU()
+    pilha = [(cnj_tree, None, ())]
+
+    while pilha:
+        node, pai, caminho_pai = pilha.pop()
+        for key, sub_node in node.items():
+            caminho = (*caminho_pai, key)
+            indice.pai[key] = pai
+            indice.profundidade[key] = len(caminho_pai)
+            indice.caminho[key] = caminho
+            indice.classe_tpu[key] = sub_node if sub_node else key
+
+            if not sub_node:
+                indice.folha_para_grupo[int(key)] = (
+                    caminho[0] if len(caminho) > 1 else GRUPO_PADRAO
+                )
+            else:
+                pilha.append((sub_node, key, caminho))
+
+    return indice
+
+
+def carregar_indice_tpu(caminho: str = CAMINHO_TPU) -> IndiceTPU:
+    """Retorna o índice da TPU, reconstruindo-o apenas se o JSON mudou.
+
+    A ordem de busca é: memória do processo, arquivo de cache pickle ao lado do
+    JSON e, por fim, o próprio JSON (que então regrava o cache).
+
+    Args:
+    ----
+        caminho (str): Caminho para o `cnj-movimentos-tree.json`.
+
+    Returns:
+    -------
+        IndiceTPU: Índice compartilhado; não deve ser modificado pelos chamadores.
+
+    """
+    stat = os.stat(caminho)
+    versao = (stat.st_mtime_ns, stat.st_size)
+
+    em_memoria = _indices_em_memoria.get(caminho)
+    if em_memoria and em_memoria[0] == versao:
+        return em_memoria[1]
+
+    indice = _ler_cache(caminho, versao)
+    if indice is None:
+        with open(caminho) as file:
+            indice = construir_indice_tpu(json.load(file))
+        _gravar_cache(caminho, versao, indice)
+
+    _indices_em_memoria[caminho] = (versao, indice)
+    return indice
+
+
+def _ler_cache(caminho, versao):
+    try:
+        with open(caminho + SUFIXO_CACHE, 'rb') as file:
+            versao_cache, indice = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        return None
+    return indice if versao_cache == versao else None
+
+
+def _gravar_cache(caminho, versao, indice):
+    # O cache é só uma otimização: um diretório somente leitura não deve quebrar o pipeline.
+    temporario = f'{caminho}{SUFIXO_CACHE}.{os.getpid()}.tmp'
+    try:
+        with open(temporario, 'wb') as file:
+            pickle.dump((versao, indice), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho + SUFIXO_CACHE)
+    except OSError:
+        pass
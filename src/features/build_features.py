@@ -1,9 +1,19 @@
 """Módulo para carregar os datasets processar definitivamente os movimentos processuais."""
 
-import json
+import sys
 
+import numpy as np
 import pandas as pd
-from src.data.make_dataset import get_cnj_grouping
+from src.data.schema import aplicar_schema
+from src.data.tpu_index import carregar_indice_tpu
+from src.features.combinacoes import codigos_combinados
+from src.features.regras import (
+    DETALHE_PADRAO,
+    classificador_complemento,
+    classificador_documento,
+    classificador_movement_detail,
+)
+from src.pipeline.instrumentacao import medir_etapa
 
 
 def classificar_movement_detail(row, tpu_cnj):
@@ -18,32 +28,13 @@ def classificar_movement_detail(row, tpu_cnj):
         str: Detalhe especializado do movimento.
     """
     movimento_id = str(row['movimentoID'])
-    documento = row['documento'].lower() if isinstance(row['documento'], str) else 'N/A'
-    complemento = row['complemento'].lower() if isinstance(row['complemento'], str) else 'N/A'
-    
     categoria = tpu_cnj.get(movimento_id, 'Outros')
 
-    if 'sentença' in documento:
-        detalhe = 'Sentença'
-    elif 'despacho' in documento:
-        detalhe = 'Despacho'
-    elif 'decisão' in documento:
-        detalhe = 'Decisão'
-    elif 'urgente' in complemento:
-        detalhe = 'Urgente'
-    elif 'prazo' in complemento:
-        detalhe = 'Com Prazo'
-    elif 'intimação' in complemento:
-        detalhe = 'Intimação'
-    elif 'distribuição' in row['activity'].lower():
-        detalhe = 'Distribuição'
-    elif 'audiência' in row['activity'].lower():
-        detalhe = 'Audiência'
-    elif 'expedição de documento' in row['activity'].lower():
-        detalhe = 'Expedição de Documento'
-    else:
-        detalhe = 'Padrão'
-    
+    # Regras em `src.features.regras.REGRAS_MOVEMENT_DETAIL`.
+    detalhe = classificador_movement_detail().classificar(
+        row['documento'], row['complemento'], row['activity'],
+    )
+
     if 'fase' in row:
         if row['fase'] == 'inicial':
             detalhe += ' - Fase Inicial'
@@ -52,54 +43,133 @@ def classificar_movement_detail(row, tpu_cnj):
 
     return f"{categoria}: {detalhe}"
 
-def especializar_movimentos(df, tpu_cnj):
+def classificar_movement_detail_vetorizado(df, tpu_cnj):
     """
-    Especializa os movimentos processuais utilizando as colunas 'documento', 'complemento' e identificadores.
+    Versão vetorizada de `classificar_movement_detail`, com a mesma tabela de regras.
+
+    Cada campo é fatorado uma vez; cada regra vira um `str.contains` sobre os valores
+    distintos do seu campo, espalhado para as linhas pelos códigos, e `np.select`
+    escolhe em cada linha o rótulo da regra mais prioritária que casou.
 
     Args:
         df (pd.DataFrame): DataFrame pré-processado com os movimentos.
         tpu_cnj (dict): Dicionário que mapeia os identificadores de movimento para categorias da TPU do CNJ.
 
     Returns:
-        pd.DataFrame: DataFrame com novas features especializadas.
+        pd.Series: Detalhe especializado de cada movimento, alinhado ao índice de `df`.
     """
-    df['movement_detail'] = df.apply(lambda row: classificar_movement_detail(row, tpu_cnj), axis=1)
-    df['complexity'] = df['activity_group'].map(determinar_complexidade)
+    regras = classificador_movement_detail().regras
+    distintos = {}
+    for campo in dict.fromkeys(regra.campo for regra in regras):
+        codigos, valores = pd.factorize(df[campo], use_na_sentinel=False)
+        # Só textos casam (como em `ClassificadorRegras`); o resto vira NA.
+        textos = pd.Series(
+            [valor if isinstance(valor, str) else None for valor in np.asarray(valores, dtype=object)],
+            dtype='string',
+        )
+        distintos[campo] = (codigos, textos.str.lower())
+
+    condicoes = []
+    for regra in regras:
+        codigos, textos = distintos[regra.campo]
+        casa = textos.str.contains(regra.padrao.lower(), regex=False).fillna(False).to_numpy(dtype=bool)
+        condicoes.append(casa[codigos])
+    rotulos = np.array([*(regra.rotulo for regra in regras), DETALHE_PADRAO], dtype=object)
+    detalhe = pd.Series(
+        rotulos[np.select(condicoes, range(len(regras)), default=len(regras))],
+        index=df.index,
+    )
 
-    return df
+    if 'fase' in df.columns:
+        sufixo = np.select(
+            [df['fase'] == 'inicial', df['fase'] == 'contestação'],
+            [' - Fase Inicial', ' - Fase de Contestação'],
+            default='',
+        )
+        detalhe = detalhe + sufixo
 
-def determinar_complexidade(activity_group):
+    categoria = df['movimentoID'].astype(str).map(tpu_cnj).fillna('Outros')
+
+    return categoria.astype(str) + ': ' + detalhe
+
+def classificar_distintos(colunas, funcao):
     """
-    Determina a complexidade do movimento baseado no agrupamento de atividade.
+    Aplica `funcao` uma vez por combinação distinta de valores das colunas e espalha o resultado.
+
+    As linhas recebem um código por combinação (`codigos_combinados`), de modo que
+    `funcao` roda só sobre as combinações que de fato ocorrem (O(distintos)) e o
+    resultado volta para as linhas com uma única indexação pelos códigos. Nulos são
+    passados para `funcao` como estão.
 
     Args:
-        activity_group (str): Grupo de atividades do movimento.
+        colunas (list[pd.Series]): Colunas alinhadas (mesmo índice e tamanho).
+        funcao (callable): Recebe um valor de cada coluna, na ordem de `colunas`.
 
     Returns:
-        str: Nível de complexidade (simples, médio, complexo).
+        pd.Series: Resultado categórico (categorias ordenadas), alinhado ao índice das colunas.
     """
-    if activity_group in ['Início do Processo', 'Notificação']:
-        return 'Simples'
-    elif activity_group in ['Audiência', 'Sentença', 'Decisão']:
-        return 'Médio'
-    return 'Complexo'
+    codigos, argumentos = codigos_combinados(colunas)
+    rotulos = pd.Categorical([funcao(*valores) for valores in zip(*argumentos)])
+    return pd.Series(
+        pd.Categorical.from_codes(rotulos.codes[codigos], rotulos.categories),
+        index=colunas[0].index,
+    )
 
-def especializar_movimentos(df, tpu_cnj):
+def classificar_movement_detail_por_codigos(df, tpu_cnj):
     """
-    Especializa os movimentos processuais utilizando as colunas 'documento', 'complemento' e identificadores.
+    Versão de `classificar_movement_detail` que classifica cada combinação distinta uma vez.
+
+    Usa `classificar_distintos` sobre (documento, complemento, activity, fase,
+    movimentoID): em vez de uma consulta por linha, há uma por combinação observada,
+    e a saída já é a coluna categórica final.
 
     Args:
         df (pd.DataFrame): DataFrame pré-processado com os movimentos.
         tpu_cnj (dict): Dicionário que mapeia os identificadores de movimento para categorias da TPU do CNJ.
 
     Returns:
-        pd.DataFrame: DataFrame com novas features especializadas.
+        pd.Series: Detalhe especializado de cada movimento (categórico), alinhado ao índice de `df`.
+    """
+    classificar = classificador_movement_detail().classificar
+    sufixos = {'inicial': ' - Fase Inicial', 'contestação': ' - Fase de Contestação'}
+    fase = df['fase'] if 'fase' in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+    def rotulo(documento, complemento, activity, fase, movimento_id):
+        detalhe = classificar(documento, complemento, activity) + sufixos.get(fase, '')
+        return f"{tpu_cnj.get(str(movimento_id), 'Outros')}: {detalhe}"
+
+    return classificar_distintos(
+        [df['documento'], df['complemento'], df['activity'], fase, df['movimentoID']],
+        rotulo,
+    )
+
+@medir_etapa()
+def especializar_movimentos(df, tpu_cnj, vetorizado=True, por_codigos=True):
     """
-    df['movement_detail'] = df.apply(lambda row: classificar_movement_detail(row, tpu_cnj), axis=1)
-    df['complexity'] = df['activity_group'].map(determinar_complexidade)
+    Especializa os movimentos processuais utilizando as colunas 'documento', 'complemento' e identificadores.
 
-    return df
+    Args:
+        df (pd.DataFrame): DataFrame pré-processado com os movimentos.
+        tpu_cnj (dict): Dicionário que mapeia os identificadores de movimento para categorias da TPU do CNJ.
+        vetorizado (bool): Usa `classificar_movement_detail_vetorizado`; se False, aplica
+            `classificar_movement_detail` linha a linha (caminho de referência).
+        por_codigos (bool): Com `vetorizado`, classifica só os valores distintos
+            (`classificar_movement_detail_por_codigos`) e espalha o resultado pelos códigos.
 
+    Returns:
+        pd.DataFrame: DataFrame com novas features especializadas, no schema compacto de `src.data.schema`.
+    """
+    if vetorizado and por_codigos:
+        df['movement_detail'] = classificar_movement_detail_por_codigos(df, tpu_cnj)
+        df['complexity'] = classificar_distintos([df['activity_group']], determinar_complexidade)
+    elif vetorizado:
+        df['movement_detail'] = classificar_movement_detail_vetorizado(df, tpu_cnj)
+        df['complexity'] = df['activity_group'].map(determinar_complexidade)
+    else:
+        df['movement_detail'] = df.apply(lambda row: classificar_movement_detail(row, tpu_cnj), axis=1)
+        df['complexity'] = df['activity_group'].map(determinar_complexidade)
+
+    return aplicar_schema(df)
 
 def specialize_activity(row):
     """Especializa uma atividade específica com base em seu identificador `movimentoID`.
@@ -138,22 +208,7 @@ def mapear_para_tpu(activity):
         str: Categoria ou agrupamento correspondente na TPU, se encontrado.
 
     """
-    with open('/workspace/data/cnj-movimentos-tree.json') as file:
-        cnj_tree = json.load(file)
-
-    def buscar_classe_tpu(node, activity):
-        if activity in node:
-            return node[activity] if node[activity] else activity
-
-        for sub_node in node.values():
-            result = buscar_classe_tpu(sub_node, activity)
-            if result:
-                return result
-        return None
-
-    categoria_tpu = buscar_classe_tpu(cnj_tree, activity)
-
-    return categoria_tpu if categoria_tpu else 'Outro Movimento'
+    return carregar_indice_tpu().classe_tpu.get(activity, 'Outro Movimento')
 
 
 def classificar_por_documento(documento):
@@ -169,17 +224,7 @@ def classificar_por_documento(documento):
 
     """
     if isinstance(documento, str):
-        documento = documento.lower()
-        if 'sentença' in documento:
-            return 'Sentença'
-        elif 'despacho' in documento:
-            return 'Despacho'
-        elif 'decisão' in documento:
-            return 'Decisão'
-        elif 'ofício' in documento:
-            return 'Ofício'
-        else:
-            return 'Outro Movimento'
+        return classificador_documento().classificar(documento)
 
 
 def classificar_por_complemento(complemento):
@@ -195,15 +240,7 @@ def classificar_por_complemento(complemento):
 
     """
     if isinstance(complemento, str):
-        complemento = complemento.lower()
-        if 'urgente' in complemento:
-            return 'Urgente'
-        elif 'prazo' in complemento:
-            return 'Com Prazo'
-        elif 'intimação' in complemento:
-            return 'Intimação'
-        else:
-            return 'Padrão'
+        return classificador_complemento().classificar(complemento)
 
 
 def determinar_complexidade(activity_group):
@@ -230,27 +267,8 @@ def determinar_complexidade(activity_group):
 
 
 if __name__ == '__main__':
-    # Carregar o primeiro dataset pré-processado
-    dataset_path_1 = '/workspace/data/movimentos_unidade_1_pre_processado.csv'
-    df_1 = pd.read_csv(dataset_path_1)
-    
-    # Carregar o segundo dataset pré-processado
-    dataset_path_2 = '/workspace/data/movimentos_unidade_2_pre_processado.csv'
-    df_2 = pd.read_csv(dataset_path_2)
-    
-    # Gerar o dicionário de agrupamento CNJ a partir da TPU
-    cnj_grouping = get_cnj_grouping()
-    
-    # Especializar os movimentos usando o DataFrame e o agrupamento CNJ para o primeiro dataset
-    df_specialized_1 = especializar_movimentos(df_1, cnj_grouping)
-    print(df_specialized_1.head())
-    df_specialized_1.to_csv(
-        '/workspace/data/movimentos_unidade_1_processado.csv', index=False,
-    )
-    
-    # Especializar os movimentos usando o DataFrame e o agrupamento CNJ para o segundo dataset
-    df_specialized_2 = especializar_movimentos(df_2, cnj_grouping)
-    print(df_specialized_2.head())
-    df_specialized_2.to_csv(
-        '/workspace/data/movimentos_unidade_2_processado.csv', index=False,
-    )
\ No newline at end of file
+    # Executa só a etapa de especialização para as unidades em /workspace/data (ou as
+    # passadas na linha de comando); ver `src.pipeline.batch` para as opções.
+    from src.pipeline.batch import main
+
+    sys.exit(main([*sys.argv[1:], '--etapas', 'features']))
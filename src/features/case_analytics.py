@@ -0,0 +1,204 @@
+"""Métricas por processo (caso): lead time, esperas, variantes e gargalos.
+
+Tudo parte de uma única ordenação dos movimentos por `processoID`/`dataInicio`;
+dentro dela, as transições são pares de linhas vizinhas do mesmo caso e os
+agregados por caso saem de `np.add.reduceat`/`groupby` sobre os limites dos casos.
+
+A variante de um caso (sequência ordenada de atividades) é representada por um
+hash uint64 da sequência, convertido em um `variante_id` inteiro denso (0 = mais
+frequente); o texto da sequência só é montado para a tabela de variantes.
+
+O pipeline em lote grava as tabelas ao lado da saída processada
+(`*_processado_casos.parquet`, `*_variantes.parquet`, `*_gargalos.parquet`).
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+COLUNA_CASO = 'processoID'
+COLUNA_ATIVIDADE = 'activity'
+TABELAS = ('casos', 'variantes', 'gargalos')
+SEPARADOR_VARIANTE = ' -> '
+
+_MULTIPLICADOR = np.uint64(0x9E3779B97F4A7C15)
+
+
+@dataclass
+class AnaliseCasos:
+    """Tabelas pré-computadas para o dashboard."""
+
+    casos: pd.DataFrame
+    variantes: pd.DataFrame
+    gargalos: pd.DataFrame
+
+
+def ordem_por_caso(df: pd.DataFrame, coluna_caso: str = COLUNA_CASO, coluna_tempo: str = 'dataInicio'):
+    """Posições das linhas ordenadas por caso e data (datas ausentes no fim do caso).
+
+    Returns
+    -------
+        tuple: (ordem das linhas, códigos densos do caso já na ordem).
+
+    """
+    casos = pd.factorize(df[coluna_caso])[0]
+    tempo = df[coluna_tempo].to_numpy(dtype='datetime64[ns]').view('int64').copy()
+    tempo[pd.isna(df[coluna_tempo]).to_numpy()] = np.iinfo('int64').max
+    ordem = np.lexsort((tempo, casos))
+    return ordem, casos[ordem]
+
+
+def analisar_casos(df: pd.DataFrame, coluna_atividade: str = COLUNA_ATIVIDADE) -> AnaliseCasos:
+    """Calcula as métricas por caso sobre a saída de `load_and_preprocess_data`.
+
+    Args:
+    ----
+        df (pd.DataFrame): Movimentos com 'processoID', a atividade, 'dataInicio' e 'dataFinal'.
+        coluna_atividade (str): Coluna que define as variantes e as transições.
+
+    Returns:
+    -------
+        AnaliseCasos: Tabelas `casos` (uma linha por processo), `variantes` (frequência
+        de cada sequência) e `gargalos` (esperas por transição origem -> destino).
+
+    """
+    ordem, casos = ordem_por_caso(df)
+    atividades = df[coluna_atividade].astype(object).fillna('N/A').to_numpy()[ordem]
+    codigos, nomes = pd.factorize(atividades, sort=True)
+    nomes = np.asarray(nomes, dtype=object)
+    inicio = df['dataInicio'].to_numpy(dtype='datetime64[ns]')[ordem]
+    fim = df['dataFinal'].to_numpy(dtype='datetime64[ns]')[ordem]
+
+    # Sem linhas não há caso algum: `primeira` vazia deixa todas as tabelas vazias.
+    primeira = np.flatnonzero(np.r_[len(casos) > 0, casos[1:] != casos[:-1]])
+    tamanho = np.diff(np.r_[primeira, len(casos)])
+    posicao = np.arange(len(casos)) - np.repeat(primeira, tamanho)
+
+    # Espera entre movimentos consecutivos: início do próximo - fim do atual (>= 0).
+    mesmo_caso = casos[1:] == casos[:-1]
+    espera = _segundos(inicio[1:] - fim[:-1]).clip(min=0)
+    espera[~mesmo_caso] = np.nan
+
+    hashes = _hash_variantes(codigos, posicao, primeira, tamanho)
+    variante_id, variantes = _numerar_variantes(hashes, primeira, codigos, nomes)
+
+    casos_df = pd.DataFrame({
+        COLUNA_CASO: df[COLUNA_CASO].to_numpy()[ordem][primeira],
+        'inicio': _menor_data(inicio, primeira),
+        # NaT é o menor int64, então o máximo já o ignora.
+        'fim': np.maximum.reduceat(fim.view('int64'), primeira).view('datetime64[ns]'),
+        'n_movimentos': tamanho,
+        'espera_total': np.add.reduceat(np.r_[np.nan_to_num(espera), 0.0], primeira),
+        'variante_id': variante_id,
+    })
+    casos_df['lead_time'] = _segundos(
+        casos_df['fim'].to_numpy() - casos_df['inicio'].to_numpy(),
+    )
+
+    return AnaliseCasos(
+        casos=casos_df,
+        variantes=variantes,
+        gargalos=_gargalos(codigos, nomes, espera, mesmo_caso),
+    )
+
+
+def _hash_variantes(codigos, posicao, primeira, tamanho):
+    """Hash uint64 da sequência de atividades de cada caso (sensível à ordem)."""
+    with np.errstate(over='ignore'):
+        termos = _misturar(
+            (codigos.astype(np.uint64) + np.uint64(1)) * _MULTIPLICADOR
+            + posicao.astype(np.uint64),
+        )
+        return _misturar(np.add.reduceat(termos, primeira) ^ tamanho.astype(np.uint64))
+
+
+def _misturar(x):
+    """Finalizador do splitmix64, aplicado elemento a elemento."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _numerar_variantes(hashes, primeira, codigos, nomes):
+    """Converte os hashes em IDs densos (por frequência) e monta a tabela de variantes."""
+    unicos, exemplo, inverso, frequencia = np.unique(
+        hashes, return_index=True, return_inverse=True, return_counts=True,
+    )
+    ranking = np.argsort(-frequencia, kind='stable')
+    novo_id = np.empty_like(ranking)
+    novo_id[ranking] = np.arange(len(ranking))
+
+    fins = np.r_[primeira[1:], len(codigos)]
+    sequencias = [
+        SEPARADOR_VARIANTE.join(nomes[codigos[primeira[caso]:fins[caso]]])
+        for caso in exemplo[ranking]
+    ]
+    variantes = pd.DataFrame({
+        'variante_id': np.arange(len(ranking)),
+        'hash': unicos[ranking],
+        'frequencia': frequencia[ranking],
+        'n_atividades': (fins - primeira)[exemplo[ranking]],
+        'sequencia': np.array(sequencias, dtype=object),
+    })
+    variantes['proporcao'] = variantes['frequencia'] / len(hashes)
+    return novo_id[inverso.ravel()], variantes
+
+
+def _gargalos(codigos, nomes, espera, mesmo_caso):
+    """Estatísticas de espera por transição, da maior espera acumulada para a menor."""
+    transicoes = pd.DataFrame({
+        'origem': codigos[:-1][mesmo_caso],
+        'destino': codigos[1:][mesmo_caso],
+        'espera': espera[mesmo_caso],
+    })
+    agrupado = transicoes.groupby(['origem', 'destino'], sort=False)['espera']
+    gargalos = pd.DataFrame({
+        'n': agrupado.size(),
+        'espera_media': agrupado.mean(),
+        'espera_mediana': agrupado.median(),
+        'espera_p90': agrupado.quantile(0.9),
+        'espera_total': agrupado.sum(),
+    }).reset_index()
+    for coluna in ('origem', 'destino'):
+        gargalos[coluna] = nomes[gargalos[coluna].to_numpy()]
+    return gargalos.sort_values('espera_total', ascending=False, ignore_index=True)
+
+
+def _segundos(delta):
+    segundos = delta.astype('timedelta64[ns]').view('int64') / 1e9
+    segundos[np.isnat(delta)] = np.nan
+    return segundos
+
+
+def _menor_data(datas, primeira):
+    """Menor data de cada caso, ignorando NaT (NaT se o caso não tiver datas)."""
+    valores = datas.view('int64').copy()
+    ausente = np.isnat(datas)
+    valores[ausente] = np.iinfo('int64').max
+    menor = np.minimum.reduceat(valores, primeira)
+    menor[menor == np.iinfo('int64').max] = np.iinfo('int64').min
+    return menor.view('datetime64[ns]')
+
+
+def caminho_tabela(file_path: str, tabela: str) -> str:
+    """Caminho de uma tabela pré-computada que acompanha o arquivo processado da unidade."""
+    return file_path.removesuffix('.parquet').removesuffix('.csv') + f'_{tabela}.parquet'
+
+
+def salvar_analise_casos(analise: AnaliseCasos, file_path: str) -> None:
+    """Grava as tabelas ao lado do arquivo processado da unidade."""
+    for tabela in TABELAS:
+        getattr(analise, tabela).to_parquet(caminho_tabela(file_path, tabela), index=False)
+
+
+def carregar_analise_casos(file_path: str) -> AnaliseCasos | None:
+    """Lê as tabelas gravadas pelo pipeline, se existirem e forem mais novas que os dados."""
+    caminhos = {tabela: caminho_tabela(file_path, tabela) for tabela in TABELAS}
+    mtime = os.path.getmtime(file_path)
+    if any(not os.path.exists(c) or os.path.getmtime(c) < mtime for c in caminhos.values()):
+        return None
+    return AnaliseCasos(**{tabela: pd.read_parquet(c) for tabela, c in caminhos.items()})
@@ -0,0 +1,49 @@
+"""Códigos densos para combinações de valores de várias colunas.
+
+Base de `classificar_distintos` (classificação por combinação distinta) e das células
+dos sketches: cada coluna é fatorada em códigos inteiros e os códigos são combinados
+em um único código por linha, sem montar tuplas nem um `MultiIndex` linha a linha.
+"""
+
+import numpy as np
+import pandas as pd
+
+_MAXIMO_INT64 = np.iinfo(np.int64).max
+
+
+def codigos_combinados(colunas: list) -> tuple:
+    """Código denso de cada linha pela combinação de valores das colunas.
+
+    Os códigos de cada coluna são combinados em base mista (código * cardinalidade +
+    código). Se o produto das cardinalidades não couber em int64, o código parcial é
+    fatorado de novo antes de seguir, o que o limita ao número de linhas. Nulos são
+    valores como os outros.
+
+    Args:
+    ----
+        colunas (list[pd.Series]): Colunas alinhadas (mesmo índice e tamanho).
+
+    Returns:
+    -------
+        tuple: (códigos por linha, numerados na ordem da primeira ocorrência; lista com,
+            para cada coluna, o array de objetos com o valor de cada combinação).
+
+    """
+    combinado = np.zeros(len(colunas[0]), dtype=np.int64)
+    cardinalidade = 1
+    por_coluna = []
+    for coluna in colunas:
+        codigos, valores = pd.factorize(coluna, use_na_sentinel=False)
+        base = max(len(valores), 1)
+        if cardinalidade > _MAXIMO_INT64 // base:
+            combinado, unicos = pd.factorize(combinado)
+            cardinalidade = max(len(unicos), 1)
+        combinado = combinado * base + codigos
+        cardinalidade *= base
+        por_coluna.append((codigos, np.asarray(valores, dtype=object)))
+
+    codigos, unicos = pd.factorize(combinado)
+    # Primeira linha de cada combinação: a atribuição de trás para frente deixa a menor.
+    primeira = np.empty(len(unicos), dtype=np.int64)
+    primeira[codigos[::-1]] = np.arange(len(codigos) - 1, -1, -1)
+    return codigos, [valores[codigos_coluna[primeira]] for codigos_coluna, valores in por_coluna]
@@ -0,0 +1,115 @@
+"""Tabela declarativa das regras de classificação dos movimentos.
+
+Cada regra diz em qual campo procurar um trecho de texto (sem diferenciar
+maiúsculas) e qual rótulo atribuir; quando várias casam, vence a de menor
+`prioridade`. Uma tabela é compilada uma única vez em um `ClassificadorRegras`,
+que usa uma só expressão regular por campo (alternância dentro de um lookahead,
+que encontra todas as ocorrências, inclusive sobrepostas, em uma passada) e
+memoriza o resultado por combinação de valores, já que os textos se repetem muito.
+
+Novos rótulos entram como novas linhas da tabela, sem custo extra por linha.
+"""
+
+import functools
+import re
+from dataclasses import dataclass
+
+TAMANHO_CACHE = 65_536
+
+
+@dataclass(frozen=True)
+class Regra:
+    """Uma regra: se `padrao` ocorre em `campo`, o rótulo é `rotulo`."""
+
+    padrao: str
+    campo: str
+    rotulo: str
+    prioridade: int
+
+
+# Mesma ordem do if/elif original de `classificar_movement_detail`.
+REGRAS_MOVEMENT_DETAIL = (
+    Regra('sentença', 'documento', 'Sentença', 10),
+    Regra('despacho', 'documento', 'Despacho', 20),
+    Regra('decisão', 'documento', 'Decisão', 30),
+    Regra('urgente', 'complemento', 'Urgente', 40),
+    Regra('prazo', 'complemento', 'Com Prazo', 50),
+    Regra('intimação', 'complemento', 'Intimação', 60),
+    Regra('distribuição', 'activity', 'Distribuição', 70),
+    Regra('audiência', 'activity', 'Audiência', 80),
+    Regra('expedição de documento', 'activity', 'Expedição de Documento', 90),
+)
+DETALHE_PADRAO = 'Padrão'
+
+REGRAS_DOCUMENTO = (
+    Regra('sentença', 'documento', 'Sentença', 10),
+    Regra('despacho', 'documento', 'Despacho', 20),
+    Regra('decisão', 'documento', 'Decisão', 30),
+    Regra('ofício', 'documento', 'Ofício', 40),
+)
+DOCUMENTO_PADRAO = 'Outro Movimento'
+
+REGRAS_COMPLEMENTO = tuple(regra for regra in REGRAS_MOVEMENT_DETAIL if regra.campo == 'complemento')
+COMPLEMENTO_PADRAO = 'Padrão'
+
+
+class ClassificadorRegras:
+    """Tabela de regras compilada: um regex por campo e cache por combinação de valores."""
+
+    def __init__(self, regras, padrao: str, campos: tuple | None = None):
+        """Compila a tabela.
+
+        Args:
+        ----
+            regras (iterable): `Regra`s da tabela.
+            padrao (str): Rótulo quando nenhuma regra casa.
+            campos (tuple): Ordem dos valores em `classificar`; por padrão, a ordem em
+                que os campos aparecem na tabela (por prioridade).
+
+        """
+        self.regras = tuple(sorted(regras, key=lambda regra: regra.prioridade))
+        self.padrao = padrao
+        self.campos = campos or tuple(dict.fromkeys(regra.campo for regra in self.regras))
+
+        self._buscas = []
+        for campo in self.campos:
+            regras_campo = [regra for regra in self.regras if regra.campo == campo]
+            # Alternativas em ordem de prioridade: se duas começam na mesma posição,
+            # o lookahead reporta a mais prioritária.
+            alternativas = '|'.join(re.escape(regra.padrao.lower()) for regra in regras_campo)
+            prioridades = {}
+            for regra in regras_campo:
+                prioridades.setdefault(regra.padrao.lower(), regra)
+            self._buscas.append((re.compile(f'(?=({alternativas}))') if regras_campo else None, prioridades))
+
+        self.classificar = functools.lru_cache(maxsize=TAMANHO_CACHE)(self._classificar)
+
+    def _classificar(self, *valores) -> str:
+        """Rótulo da regra mais prioritária que casa com os valores (na ordem de `campos`)."""
+        melhor = None
+        for valor, (busca, regras) in zip(valores, self._buscas):
+            if busca is None or not isinstance(valor, str):
+                continue
+            for ocorrencia in busca.finditer(valor.lower()):
+                regra = regras[ocorrencia.group(1)]
+                if melhor is None or regra.prioridade < melhor.prioridade:
+                    melhor = regra
+        return self.padrao if melhor is None else melhor.rotulo
+
+
+@functools.cache
+def classificador_movement_detail() -> ClassificadorRegras:
+    """Classificador de `REGRAS_MOVEMENT_DETAIL` (campos: documento, complemento, activity)."""
+    return ClassificadorRegras(REGRAS_MOVEMENT_DETAIL, DETALHE_PADRAO)
+
+
+@functools.cache
+def classificador_documento() -> ClassificadorRegras:
+    """Classificador de `REGRAS_DOCUMENTO` (campo: documento)."""
+    return ClassificadorRegras(REGRAS_DOCUMENTO, DOCUMENTO_PADRAO)
+
+
+@functools.cache
+def classificador_complemento() -> ClassificadorRegras:
+    """Classificador de `REGRAS_COMPLEMENTO` (campo: complemento)."""
+    return ClassificadorRegras(REGRAS_COMPLEMENTO, COMPLEMENTO_PADRAO)
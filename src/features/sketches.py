@@ -0,0 +1,359 @@
+"""Sketches combináveis da duração e dos processos distintos de cada unidade.
+
+Para cada célula `movement_detail` x `complexity` (as mesmas do cubo) são guardados:
+
+- um t-digest de `duration_calculated` (centroides média/peso, com a função de escala
+  k2 de Dunning, logarítmica nas caudas): com `COMPRESSAO` = 500 (~200 centroides
+  por célula), o p99.9 de durações de cauda pesada fica a ~1% do exato;
+- um HyperLogLog de `processoID` (2^14 registradores, erro padrão de ~0,8%).
+
+Os dois se combinam sem voltar às linhas: dois t-digests viram um recomprimindo a
+união dos centroides, e dois HyperLogLogs, pelo máximo registrador a registrador.
+Assim, recortes do dashboard, comparações entre unidades, lotes incrementais e
+consolidações do tribunal inteiro são combinações de sketches, não releituras.
+
+O pipeline grava os sketches ao lado da saída processada (`*_processado_sketches.parquet`).
+
+Uso (consolidação de várias unidades):
+    python -m src.features.sketches /workspace/data/movimentos_unidade_*_processado.parquet
+"""
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from src.data.make_dataset import hash_chaves
+from src.features.combinacoes import codigos_combinados
+
+DIMENSOES = ['movement_detail', 'complexity']
+COLUNA_DURACAO = 'duration_calculated'
+COLUNA_PROCESSO = 'processoID'
+COMPRESSAO = 500
+PRECISAO_HLL = 14
+
+
+@dataclass
+class TDigest:
+    """t-digest já comprimido: centroides em ordem crescente de média."""
+
+    medias: np.ndarray
+    pesos: np.ndarray
+    minimo: float = np.nan
+    maximo: float = np.nan
+
+    @classmethod
+    def vazio(cls) -> 'TDigest':
+        """Digest sem valores."""
+        return cls(np.empty(0), np.empty(0))
+
+    @classmethod
+    def de_valores(cls, valores, compressao: int = COMPRESSAO) -> 'TDigest':
+        """Digest dos valores finitos de `valores`."""
+        valores = np.asarray(valores, dtype=float)
+        valores = np.sort(valores[np.isfinite(valores)])
+        if valores.size == 0:
+            return cls.vazio()
+        return cls._comprimir(valores, np.ones(valores.size), valores[0], valores[-1], compressao)
+
+    @classmethod
+    def _comprimir(cls, medias, pesos, minimo, maximo, compressao):
+        """Agrupa centroides ordenados em faixas de largura < 1 na escala k2.
+
+        k2(q) = compressao / Z * log(q / (1 - q)), com Z = 4 log(n / compressao) + 24: a
+        largura de cada faixa em q é proporcional a q(1 - q), então os centroides das
+        caudas resumem pouquíssimos valores (na k1, a proporção é sqrt(q(1 - q)) e o
+        p99.9 de caudas pesadas errava 10-20%).
+        """
+        total = pesos.sum()
+        esquerda = (np.cumsum(pesos) - pesos) / total
+        normalizacao = 4 * np.log(max(total / compressao, 1.0)) + 24
+        with np.errstate(divide='ignore'):
+            # q = 0 (o primeiro centroide) vai a -inf: sempre uma faixa própria.
+            escala = np.floor(compressao / normalizacao * np.log(esquerda / (1 - esquerda)))
+        inicios = np.flatnonzero(np.r_[True, escala[1:] != escala[:-1]])
+        novos_pesos = np.add.reduceat(pesos, inicios)
+        novas_medias = np.add.reduceat(medias * pesos, inicios) / novos_pesos
+        return cls(novas_medias, novos_pesos, float(minimo), float(maximo))
+
+    @property
+    def n(self) -> float:
+        """Número de valores resumidos."""
+        return float(self.pesos.sum())
+
+    def combinar(self, outro: 'TDigest', compressao: int = COMPRESSAO) -> 'TDigest':
+        """Digest da união dos dois conjuntos de valores."""
+        if outro.n == 0:
+            return self
+        if self.n == 0:
+            return outro
+        medias = np.concatenate([self.medias, outro.medias])
+        ordem = np.argsort(medias, kind='stable')
+        pesos = np.concatenate([self.pesos, outro.pesos])[ordem]
+        return self._comprimir(
+            medias[ordem], pesos,
+            min(self.minimo, outro.minimo), max(self.maximo, outro.maximo), compressao,
+        )
+
+    def quantil(self, q):
+        """Quantil(is) aproximado(s), interpolando entre os centros dos centroides."""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        centros = np.cumsum(self.pesos) - self.pesos / 2
+        return np.interp(
+            np.asarray(q, dtype=float) * self.n,
+            np.r_[0.0, centros, self.n],
+            np.r_[self.minimo, self.medias, self.maximo],
+        )
+
+
+@dataclass
+class HyperLogLog:
+    """HyperLogLog com 2^`precisao` registradores de 8 bits."""
+
+    registradores: np.ndarray
+
+    @classmethod
+    def vazio(cls, precisao: int = PRECISAO_HLL) -> 'HyperLogLog':
+        """Sketch sem valores."""
+        return cls(np.zeros(2**precisao, dtype=np.uint8))
+
+    @classmethod
+    def de_valores(cls, valores, precisao: int = PRECISAO_HLL) -> 'HyperLogLog':
+        """HyperLogLog dos valores não nulos."""
+        return cls(registradores_por_grupo(valores, np.zeros(len(valores), dtype=np.int64), 1, precisao)[0])
+
+    @property
+    def precisao(self) -> int:
+        """Bits do hash usados para escolher o registrador."""
+        return int(np.log2(self.registradores.size))
+
+    def combinar(self, outro: 'HyperLogLog') -> 'HyperLogLog':
+        """Sketch da união dos dois conjuntos."""
+        return HyperLogLog(np.maximum(self.registradores, outro.registradores))
+
+    def estimativa(self) -> float:
+        """Número estimado de valores distintos (com a correção de faixa pequena)."""
+        m = self.registradores.size
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.ldexp(1.0, -self.registradores.astype(np.int64)).sum()
+        zeros = int((self.registradores == 0).sum())
+        if estimativa <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return float(estimativa)
+
+
+def registradores_por_grupo(valores, grupos, n_grupos: int, precisao: int = PRECISAO_HLL) -> np.ndarray:
+    """Registradores do HyperLogLog de cada grupo, em uma passada.
+
+    Args:
+    ----
+        valores (array-like): Valores a contar; nulos são ignorados e números são
+            normalizados (ver `hash_chaves`), então o mesmo ID gera o mesmo hash
+            seja ele `int64`, `Int64` ou float.
+        grupos (np.ndarray): Código do grupo de cada valor (0 .. n_grupos - 1).
+        n_grupos (int): Número de grupos.
+        precisao (int): Bits do hash usados para escolher o registrador.
+
+    Returns:
+    -------
+        np.ndarray: Matriz uint8 (n_grupos x 2^precisao).
+
+    """
+    registradores = np.zeros((n_grupos, 2**precisao), dtype=np.uint8)
+    serie = pd.Series(valores)
+    presentes = serie.notna().to_numpy()
+    serie = serie[presentes]
+    if serie.empty:
+        return registradores
+    if serie.dtype == object and pd.api.types.infer_dtype(serie) in ('integer', 'floating', 'mixed-integer-float'):
+        serie = pd.to_numeric(serie)
+
+    hashes = hash_chaves(serie.to_frame())
+    grupos = np.asarray(grupos, dtype=np.int64)[presentes]
+    resto_bits = 64 - precisao
+    indice = (hashes >> np.uint64(resto_bits)).astype(np.int64)
+    resto = hashes & np.uint64((1 << resto_bits) - 1)
+    # Posição do primeiro bit 1 do resto: bit_length exato em duas metades (< 2^26
+    # cada, representáveis sem erro em float).
+    alta = (resto >> np.uint64(26)).astype(np.float64)
+    baixa = (resto & np.uint64((1 << 26) - 1)).astype(np.float64)
+    comprimento = np.where(alta > 0, np.frexp(alta)[1] + 26, np.frexp(baixa)[1])
+    posto = (resto_bits - comprimento + 1).astype(np.uint8)
+
+    np.maximum.at(registradores.reshape(-1), grupos * 2**precisao + indice, posto)
+    return registradores
+
+
+def construir_sketches(df: pd.DataFrame) -> pd.DataFrame:
+    """Sketches por célula `movement_detail` x `complexity`.
+
+    Args:
+    ----
+        df (pd.DataFrame): Movimentos processados.
+
+    Returns:
+    -------
+        pd.DataFrame: Uma linha por célula, com 'tdigest' (`TDigest`) e 'hll' (`HyperLogLog`).
+
+    """
+    codigos, valores = _codigos_celulas(df)
+    duracao = pd.to_numeric(df[COLUNA_DURACAO], errors='coerce').to_numpy(dtype=float)
+    hll = registradores_por_grupo(df[COLUNA_PROCESSO], codigos, len(valores))
+
+    ordem = np.lexsort((duracao, codigos))
+    codigos_ordenados = codigos[ordem]
+    limites = np.searchsorted(codigos_ordenados, np.arange(len(valores) + 1))
+    duracao_ordenada = duracao[ordem]
+
+    linhas = []
+    for codigo, celula in enumerate(valores):
+        trecho = duracao_ordenada[limites[codigo]:limites[codigo + 1]]
+        linhas.append({
+            **dict(zip(DIMENSOES, celula, strict=True)),
+            'contagem': limites[codigo + 1] - limites[codigo],
+            'tdigest': TDigest.de_valores(trecho),
+            'hll': HyperLogLog(hll[codigo]),
+        })
+    return pd.DataFrame(linhas, columns=[*DIMENSOES, 'contagem', 'tdigest', 'hll'])
+
+
+def _codigos_celulas(df):
+    """Código denso de cada linha por célula (nulos incluídos) e os valores de cada célula."""
+    codigos, valores = codigos_combinados([df[dimensao] for dimensao in DIMENSOES])
+    return codigos, list(zip(*valores, strict=True))
+
+
+def combinar_sketches(lista: list, por: list | None = None) -> pd.DataFrame:
+    """Combina tabelas de sketches (unidades, lotes ou recortes) agrupando por `por`.
+
+    Args:
+    ----
+        lista (list): Tabelas de `construir_sketches`/`carregar_sketches`.
+        por (list): Colunas do resultado; None mantém as células (`DIMENSOES`) e []
+            consolida tudo em uma linha.
+
+    Returns:
+    -------
+        pd.DataFrame: Uma linha por grupo, com os sketches combinados.
+
+    """
+    por = DIMENSOES if por is None else list(por)
+    tabelas = [tabela for tabela in lista if tabela is not None and len(tabela)]
+    if not tabelas:
+        return pd.DataFrame(columns=[*por, 'contagem', 'tdigest', 'hll'])
+    todas = pd.concat(tabelas, ignore_index=True)
+
+    chaves = todas[por].astype(object).apply(tuple, axis=1) if por else pd.Series([()] * len(todas))
+    linhas = []
+    for chave, indices in chaves.groupby(chaves, sort=False).groups.items():
+        grupo = todas.loc[indices]
+        tdigest, hll = TDigest.vazio(), None
+        for digest, contagem in zip(grupo['tdigest'], grupo['hll'], strict=True):
+            tdigest = tdigest.combinar(digest)
+            hll = contagem if hll is None else hll.combinar(contagem)
+        linhas.append({
+            **dict(zip(por, chave, strict=True)),
+            'contagem': grupo['contagem'].sum(),
+            'tdigest': tdigest,
+            'hll': hll,
+        })
+    return pd.DataFrame(linhas, columns=[*por, 'contagem', 'tdigest', 'hll'])
+
+
+def quantis_duracao(sketches: pd.DataFrame, dimensao: str | None, quantis=(0.5, 0.9)) -> pd.DataFrame:
+    """Quantis aproximados da duração por `dimensao` (None: a tabela inteira).
+
+    Returns:
+    -------
+        pd.DataFrame: Uma coluna por quantil (`p50`, `p90`, ...), indexada pela dimensão.
+
+    """
+    combinado = combinar_sketches([sketches], por=[dimensao] if dimensao else [])
+    valores = np.vstack([digest.quantil(quantis) for digest in combinado['tdigest']]) if len(combinado) else \
+        np.empty((0, len(quantis)))
+    return pd.DataFrame(
+        valores,
+        index=combinado[dimensao] if dimensao else pd.Index(['total'] * len(combinado)),
+        columns=[f'p{round(q * 100):g}' for q in quantis],
+    )
+
+
+def processos_distintos(sketches: pd.DataFrame, dimensao: str | None = None) -> pd.Series:
+    """Número estimado de processos distintos por `dimensao` (None: a tabela inteira)."""
+    combinado = combinar_sketches([sketches], por=[dimensao] if dimensao else [])
+    return pd.Series(
+        [hll.estimativa() for hll in combinado['hll']],
+        index=combinado[dimensao] if dimensao else pd.Index(['total'] * len(combinado)),
+        dtype=float,
+    )
+
+
+def caminho_sketches(file_path: str) -> str:
+    """Caminho dos sketches que acompanham o arquivo processado da unidade."""
+    return file_path.removesuffix('.parquet').removesuffix('.csv') + '_sketches.parquet'
+
+
+def salvar_sketches(sketches: pd.DataFrame, file_path: str) -> None:
+    """Grava os sketches ao lado do arquivo processado da unidade."""
+    pd.DataFrame({
+        **{dimensao: sketches[dimensao].astype(object) for dimensao in DIMENSOES},
+        'contagem': sketches['contagem'].astype('int64'),
+        'medias': [digest.medias for digest in sketches['tdigest']],
+        'pesos': [digest.pesos for digest in sketches['tdigest']],
+        'minimo': [digest.minimo for digest in sketches['tdigest']],
+        'maximo': [digest.maximo for digest in sketches['tdigest']],
+        'hll': [hll.registradores.tobytes() for hll in sketches['hll']],
+    }).to_parquet(caminho_sketches(file_path), index=False)
+
+
+def carregar_sketches(file_path: str, verificar_data: bool = True) -> pd.DataFrame | None:
+    """Lê os sketches gravados pelo pipeline, se existirem e forem mais novos que os dados.
+
+    Com `verificar_data=False` a data não é conferida (o modo incremental confere a
+    consistência pelas contagens).
+    """
+    caminho = caminho_sketches(file_path)
+    if not os.path.exists(caminho) or (
+        verificar_data and os.path.getmtime(caminho) < os.path.getmtime(file_path)
+    ):
+        return None
+    tabela = pd.read_parquet(caminho)
+    return pd.DataFrame({
+        **{dimensao: tabela[dimensao] for dimensao in DIMENSOES},
+        'contagem': tabela['contagem'],
+        'tdigest': [
+            TDigest(np.asarray(medias, dtype=float), np.asarray(pesos, dtype=float), minimo, maximo)
+            for medias, pesos, minimo, maximo in zip(
+                tabela['medias'], tabela['pesos'], tabela['minimo'], tabela['maximo'], strict=True,
+            )
+        ],
+        'hll': [HyperLogLog(np.frombuffer(registradores, dtype=np.uint8).copy()) for registradores in tabela['hll']],
+    })
+
+
+def main(argv: list | None = None) -> int:
+    """Consolida os sketches de várias unidades e imprime quantis e processos distintos."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('arquivos', nargs='+', help='Saídas *_processado.parquet com sketches gravados.')
+    parser.add_argument('--dimensao', choices=DIMENSOES, default='complexity')
+    args = parser.parse_args(argv)
+
+    tabelas = [carregar_sketches(arquivo) for arquivo in args.arquivos]
+    faltando = [arquivo for arquivo, tabela in zip(args.arquivos, tabelas, strict=True) if tabela is None]
+    for arquivo in faltando:
+        print(f'sem sketches atualizados: {arquivo}', file=sys.stderr)
+
+    consolidado = combinar_sketches(tabelas)
+    resultado = quantis_duracao(consolidado, args.dimensao).assign(
+        processos=processos_distintos(consolidado, args.dimensao).round(),
+    )
+    print(resultado.to_string(float_format='{:.1f}'.format))
+    print(f'processos distintos (total): {processos_distintos(consolidado).iloc[0]:.0f}')
+    return int(bool(faltando))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,32 +1,305 @@
-from pm4py.algo.discovery.heuristics import algorithm as heuristics_miner
-from pm4py.visualization.heuristics_net import visualizer as hn_visualizer
-from pm4py.objects.log.util import dataframe_utils
-from pm4py.objects.conversion.log import converter as log_converter
-import streamlit as st
+"""Mineração de processos: grafo de sucessão direta (DFG) vetorizado + Heuristics Miner.
+
+O DFG é contado direto no DataFrame (ordenação por caso/data, deslocamento dentro de
+cada caso e contagem dos pares), sem converter os movimentos em um `EventLog` do
+pm4py. O Heuristics Miner recebe apenas as contagens (`apply_heu_dfg` da variante
+clássica, que aceita também as contagens usadas na detecção de laços curtos).
+
+A rede é desenhada em memória (`graphviz.Digraph.pipe`), depois de podar nós e
+arestas pouco frequentes, e o SVG fica em cache por hash do modelo podado + escala.
+
+pm4py, graphviz e Streamlit são importados só nas funções que os usam: contar o DFG
+(inclusive nos workers do pipeline e nos carregadores do dashboard) não paga a
+importação do pm4py, que leva perto de 1s.
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from src.features.case_analytics import ordem_por_caso
+
+COLUNA_CASO = 'processoID'
+COLUNA_ATIVIDADE = 'activity'
+COLUNA_TEMPO = 'dataInicio'
+
+LIMIAR_ARESTAS = 0.01
+LIMIAR_NOS = 0.01
+MAX_ARESTAS = 150
+MAX_SVGS_EM_CACHE = 32
+
+_cache_svg = OrderedDict()
+# O dashboard atende cada sessão em uma thread: leitura e escrita do LRU sob a trava.
+_trava_svg = threading.Lock()
+
+
+@dataclass
+class GrafoDFG:
+    """Contagens de um log de eventos usadas pelo Heuristics Miner."""
+
+    arestas: pd.DataFrame
+    janela_2: pd.DataFrame
+    lacos_curtos: pd.DataFrame
+    atividades: pd.Series
+    inicio: pd.Series
+    fim: pd.Series
+    n_casos: int
+
+    def para_pm4py(self) -> dict:
+        """Argumentos de `heuristics_miner.apply_heu_dfg` (dicionários do pm4py)."""
+        return {
+            'dfg': _para_dicionario(self.arestas),
+            'activities': self.atividades.index.tolist(),
+            'activities_occurrences': self.atividades.to_dict(),
+            'start_activities': self.inicio.to_dict(),
+            'end_activities': self.fim.to_dict(),
+            'dfg_window_2': _para_dicionario(self.janela_2),
+            'freq_triples': _para_dicionario(self.lacos_curtos),
+        }
+
+
+def construir_dfg(
+    df: pd.DataFrame,
+    coluna_caso: str = COLUNA_CASO,
+    coluna_atividade: str = COLUNA_ATIVIDADE,
+    coluna_tempo: str = COLUNA_TEMPO,
+) -> GrafoDFG:
+    """Conta as sucessões diretas de atividades dentro de cada caso.
+
+    Args:
+    ----
+        df (pd.DataFrame): Movimentos (um evento por linha).
+        coluna_caso (str): Identificador do caso (processo).
+        coluna_atividade (str): Atividade do evento.
+        coluna_tempo (str): Data do evento, usada para ordenar cada caso.
+
+    Returns:
+    -------
+        GrafoDFG: Pares a->b, pares a distância 2, laços a->b->a, ocorrências por
+        atividade e atividades de início/fim de caso.
+
+    """
+    codigos, nomes = pd.factorize(df[coluna_atividade], sort=True)
+    nomes = np.asarray(nomes, dtype=object)
+    # Mesma ordem do pm4py: por caso e data, datas ausentes no fim de cada caso.
+    ordem, casos = ordem_por_caso(df, coluna_caso, coluna_tempo)
+    codigos = codigos[ordem]
+
+    validos = codigos >= 0
+    mesmo_caso_1 = casos[1:] == casos[:-1]
+    mesmo_caso_2 = mesmo_caso_1[1:] & mesmo_caso_1[:-1]
+    inicio_caso = np.r_[True, ~mesmo_caso_1]
+    fim_caso = np.r_[~mesmo_caso_1, True]
+
+    arestas = _contar(
+        nomes, mesmo_caso_1 & validos[:-1] & validos[1:], codigos[:-1], codigos[1:],
+    )
+    janela_2 = _contar(
+        nomes, mesmo_caso_2 & validos[:-2] & validos[2:], codigos[:-2], codigos[2:],
+    )
+    # O Heuristics Miner só usa as triplas a->b->a (com a != b) para laços de tamanho 2.
+    lacos = mesmo_caso_2 & validos[:-2] & (codigos[:-2] == codigos[2:]) & (codigos[:-2] != codigos[1:-1])
+    lacos_curtos = _contar(nomes, lacos, codigos[:-2], codigos[1:-1], codigos[2:])
+
+    return GrafoDFG(
+        arestas=arestas,
+        janela_2=janela_2,
+        lacos_curtos=lacos_curtos,
+        atividades=_ocorrencias(nomes, codigos[validos]),
+        inicio=_ocorrencias(nomes, codigos[inicio_caso & validos]),
+        fim=_ocorrencias(nomes, codigos[fim_caso & validos]),
+        n_casos=int(inicio_caso.sum()),
+    )
+
+
+def medidas_dependencia(arestas: pd.DataFrame) -> pd.DataFrame:
+    """Medida de dependência do Heuristics Miner para cada aresta do DFG.
+
+    a => b = (|a>b| - |b>a|) / (|a>b| + |b>a| + 1) e, para laços, |a>a| / (|a>a| + 1).
+    """
+    reverso = arestas.rename(
+        columns={'origem': 'destino', 'destino': 'origem', 'frequencia': 'frequencia_reversa'},
+    )
+    medidas = arestas.merge(reverso, on=['origem', 'destino'], how='left')
+    ida = medidas['frequencia']
+    volta = medidas['frequencia_reversa'].fillna(0)
+    medidas['dependencia'] = np.where(
+        medidas['origem'] == medidas['destino'],
+        ida / (ida + 1),
+        (ida - volta) / (ida + volta + 1),
+    )
+    return medidas.drop(columns='frequencia_reversa')
+
+
+def heuristics_net_from_dfg(grafo: GrafoDFG, parameters=None):
+    """Executa o Heuristics Miner sobre as contagens do DFG."""
+    from pm4py.algo.discovery.heuristics.variants import classic as heuristics_miner
+
+    return heuristics_miner.apply_heu_dfg(**grafo.para_pm4py(), parameters=parameters)
+
 
 def discover_process_model(df):
     """Descobre o modelo de processo utilizando Heuristics Miner."""
     try:
-        df.rename(columns={
-            "processoID": "case:concept:name",
-            "activity": "concept:name",
-            "dataInicio": "time:timestamp"
-        }, inplace=True)
-        df = dataframe_utils.convert_timestamp_columns_in_df(df)
-        event_log = log_converter.apply(df)
-        heu_net = heuristics_miner.apply_heu(event_log)
-        return heu_net
+        return heuristics_net_from_dfg(construir_dfg(df))
     except Exception as e:
+        import streamlit as st
+
         st.error(f"Erro na descoberta do modelo de processo: {e}")
         return None
-    
-def visualize_process_model(heu_net, scale=0.1):
-    """Visualiza o modelo de processo como SVG."""
+
+
+def visualize_process_model(heu_net, scale=1.0):
+    """Visualiza o modelo de processo como SVG.
+
+    `scale` multiplica o tamanho natural do desenho (1.0, o padrão, é o tamanho natural).
+    O padrão anterior, 0.1, era repassado ao visualizador do pm4py, que o ignorava e
+    sempre desenhava no tamanho natural: o 1.0 mantém a mesma saída.
+    """
     try:
-        gviz = hn_visualizer.apply(heu_net, parameters={"format": "svg", "scale": scale})
-        hn_visualizer.save(gviz, "heuristics_net.svg")
-        with open("heuristics_net.svg", "r") as f:
-            return f.read()
+        return render_process_model_svg(heu_net, scale=scale).decode('utf-8')
     except Exception as e:
+        import streamlit as st
+
         st.error(f"Erro na visualização do modelo de processo: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def render_process_model_svg(
+    heu_net,
+    scale: float = 1.0,
+    limiar_arestas: float = LIMIAR_ARESTAS,
+    limiar_nos: float = LIMIAR_NOS,
+    max_arestas: int = MAX_ARESTAS,
+) -> bytes:
+    """Desenha a Heuristics Net como SVG, sem arquivos intermediários.
+
+    Args:
+    ----
+        heu_net: Rede do Heuristics Miner.
+        scale (float): Fator sobre o tamanho natural do desenho.
+        limiar_arestas (float): Arestas com frequência abaixo desta fração da maior
+            frequência são descartadas antes do layout.
+        limiar_nos (float): Idem para as ocorrências das atividades.
+        max_arestas (int): Limite de arestas desenhadas (as mais frequentes).
+
+    Returns:
+    -------
+        bytes: Documento SVG.
+
+    """
+    nos, arestas, inicio, fim = podar_modelo(heu_net, limiar_arestas, limiar_nos, max_arestas)
+    chave = hashlib.sha256(repr((nos, arestas, inicio, fim, scale)).encode()).hexdigest()
+
+    with _trava_svg:
+        if chave in _cache_svg:
+            _cache_svg.move_to_end(chave)
+            return _cache_svg[chave]
+
+    # Desenhado fora da trava; se duas sessões desenharem o mesmo modelo, o SVG é o mesmo.
+    svg = _desenhar(nos, arestas, inicio, fim, scale).pipe(format='svg')
+    with _trava_svg:
+        _cache_svg[chave] = svg
+        _cache_svg.move_to_end(chave)
+        if len(_cache_svg) > MAX_SVGS_EM_CACHE:
+            _cache_svg.popitem(last=False)
+    return svg
+
+
+def podar_modelo(heu_net, limiar_arestas=LIMIAR_ARESTAS, limiar_nos=LIMIAR_NOS, max_arestas=MAX_ARESTAS):
+    """Extrai nós e arestas da rede, descartando os pouco frequentes.
+
+    Returns
+    -------
+        tuple: (nós [(nome, ocorrências)], arestas [(origem, destino, frequência)],
+        atividades de início {nome: n}, atividades de fim {nome: n}), em ordem estável.
+
+    """
+    ocorrencias = {nome: no.node_occ for nome, no in heu_net.nodes.items()}
+    minimo_nos = limiar_nos * max(ocorrencias.values(), default=0)
+    mantidos = {nome for nome, occ in ocorrencias.items() if occ >= minimo_nos}
+
+    arestas = [
+        (origem, destino.node_name, aresta.repr_value)
+        for origem, no in heu_net.nodes.items()
+        for destino, lista in no.output_connections.items()
+        for aresta in lista
+        if origem in mantidos and destino.node_name in mantidos
+    ]
+    minimo_arestas = limiar_arestas * max((freq for *_, freq in arestas), default=0)
+    arestas = sorted(
+        (aresta for aresta in arestas if aresta[2] >= minimo_arestas),
+        key=lambda aresta: (-aresta[2], aresta[0], aresta[1]),
+    )[:max_arestas]
+
+    inicio = _extremos(heu_net.start_activities, mantidos, heu_net.min_dfg_occurrences)
+    fim = _extremos(heu_net.end_activities, mantidos, heu_net.min_dfg_occurrences)
+    conectados = {nome for origem, destino, _ in arestas for nome in (origem, destino)}
+    conectados |= set(inicio) | set(fim)
+    nos = sorted((nome, ocorrencias[nome]) for nome in conectados)
+
+    return nos, arestas, inicio, fim
+
+
+def _extremos(listas, mantidos, minimo):
+    extremos = {}
+    for contagens in listas:
+        for nome, occ in contagens.items():
+            if nome in mantidos and occ >= minimo:
+                extremos[nome] = extremos.get(nome, 0) + occ
+    return dict(sorted(extremos.items()))
+
+
+def _desenhar(nos, arestas, inicio, fim, scale):
+    """Monta o grafo no estilo do visualizador de Heuristics Net do pm4py."""
+    import graphviz
+
+    grafo = graphviz.Digraph(
+        strict=True,
+        graph_attr={'bgcolor': 'white', 'dpi': str(72 * scale)},
+        node_attr={'shape': 'box', 'style': 'filled'},
+    )
+    ids = {nome: f'n{i}' for i, (nome, _) in enumerate(nos)}
+    for nome, occ in nos:
+        cinza = int(max(255 - math.log(max(occ, 1)) * 9, 0))
+        grafo.node(ids[nome], label=f'{nome} ({occ})', fillcolor=f'#{cinza:02X}{cinza:02X}FF')
+
+    for origem, destino, freq in arestas:
+        grafo.edge(ids[origem], ids[destino], label=str(freq), penwidth=_espessura(freq))
+
+    for nome_extremo, extremos, cor in (('start', inicio, '#32CD32'), ('end', fim, '#FFA500')):
+        if not extremos:
+            continue
+        grafo.node(nome_extremo, label='@@' + nome_extremo[0].upper(), fillcolor=cor, color=cor, fontsize='8')
+        for nome, occ in extremos.items():
+            par = (nome_extremo, ids[nome]) if nome_extremo == 'start' else (ids[nome], nome_extremo)
+            grafo.edge(*par, label=str(occ), penwidth=_espessura(occ), color=cor)
+    return grafo
+
+
+def _espessura(freq):
+    return f'{1.0 + math.log(1 + freq) / 11.0:.3f}'
+
+
+def _contar(nomes, mascara, *colunas):
+    """Conta as combinações de códigos selecionadas por `mascara`."""
+    rotulos = ['origem', 'destino'] if len(colunas) == 2 else ['origem', 'meio', 'destino']
+    pares = pd.DataFrame({rotulo: coluna[mascara] for rotulo, coluna in zip(rotulos, colunas)})
+    contagem = pares.groupby(rotulos, sort=False).size().rename('frequencia').reset_index()
+    for rotulo in rotulos:
+        contagem[rotulo] = nomes[contagem[rotulo].to_numpy()]
+    return contagem
+
+
+def _ocorrencias(nomes, codigos):
+    contagem = np.bincount(codigos, minlength=len(nomes))
+    return pd.Series(contagem, index=nomes)[lambda s: s > 0]
+
+
+def _para_dicionario(contagem):
+    chaves = contagem.drop(columns='frequencia').itertuples(index=False, name=None)
+    return dict(zip(chaves, contagem['frequencia'].tolist()))
@@ -0,0 +1,381 @@
+"""Execução em lote do pipeline (pré-processamento -> features) para várias unidades.
+
+Cada unidade é um CSV bruto de movimentos (`movimentos_unidade_N.csv`); as saídas
+são gravadas ao lado dele como `*_pre_processado.parquet` e `*_processado.parquet`.
+As unidades rodam em um pool de processos, cada worker carrega o agrupamento CNJ
+uma única vez e unidades cujas saídas já são mais novas que as entradas são puladas.
+
+Uso:
+    python -m src.pipeline.batch 'data/movimentos_unidade_*.csv' --workers 4
+    python -m src.pipeline.batch --manifest unidades.txt --engine polars
+    python -m src.pipeline.batch --metricas metricas.prom --perfil perfis/
+    python -m src.pipeline.batch 'data/movimentos_unidade_*.csv' --chunksize 500000
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from src.data.make_dataset import (
+    get_cnj_grouping,
+    load_and_preprocess_data,
+    load_and_preprocess_data_em_chunks,
+)
+from src.data.storage import carregar_movimentos, exportar_csv_em_blocos, salvar_movimentos
+from src.data.tpu_index import CAMINHO_TPU
+from src.features.build_features import especializar_movimentos
+from src.features.case_analytics import analisar_casos, salvar_analise_casos
+from src.features.sketches import construir_sketches, salvar_sketches
+from src.pipeline.engines import ENGINES
+from src.pipeline.incremental import atualizar_unidade
+from src.pipeline.instrumentacao import (
+    VARIAVEL_PERFIL,
+    etapa,
+    limpar_registros,
+    pico_rss_mb,
+    registros,
+    reiniciar_pico_rss,
+    resumo,
+    salvar_metricas,
+)
+from src.visualization.cube import construir_cubo, salvar_cubo
+
+ENTRADAS_PADRAO = ['/workspace/data/movimentos_unidade_*.csv']
+ETAPAS = ('pre_processamento', 'features')
+SUFIXO_PRE_PROCESSADO = '_pre_processado'
+SUFIXO_PROCESSADO = '_processado'
+
+_cnj_grouping = None
+
+
+@dataclass
+class ResultadoUnidade:
+    """Resumo da execução de uma unidade."""
+
+    unidade: str
+    status: str
+    linhas: int = 0
+    segundos: float = 0.0
+    pico_rss_mb: float = 0.0
+    # 'unidade': pico medido só durante a unidade; 'worker': pico do processo inteiro
+    # (quando o pico não pode ser zerado, ver `reiniciar_pico_rss`).
+    escopo_pico: str = 'unidade'
+    erro: str = ''
+    metricas: list = field(default_factory=list)
+
+
+def caminhos_unidade(file_path: str) -> dict:
+    """Deriva os caminhos de saída de cada etapa a partir do CSV bruto da unidade.
+
+    Args:
+    ----
+        file_path (str): Caminho do CSV bruto.
+
+    Returns:
+    -------
+        dict: {'entrada', 'pre_processamento', 'features'} -> caminho.
+
+    """
+    base = os.path.splitext(file_path)[0]
+    return {
+        'entrada': file_path,
+        'pre_processamento': f'{base}{SUFIXO_PRE_PROCESSADO}.parquet',
+        'features': f'{base}{SUFIXO_PROCESSADO}.parquet',
+    }
+
+
+def listar_unidades(entradas: list, manifest: str | None = None) -> list:
+    """Expande globs e/ou manifest em uma lista ordenada de CSVs brutos.
+
+    Arquivos que já são saídas do pipeline (`*_pre_processado.csv`, `*_processado.csv`)
+    são ignorados, para que um glob amplo não os trate como unidades.
+
+    Args:
+    ----
+        entradas (list): Caminhos ou padrões glob.
+        manifest (str): Arquivo texto com um caminho (ou glob) por linha; '#' comenta.
+
+    Returns:
+    -------
+        list: Caminhos das unidades, sem repetição.
+
+    """
+    padroes = list(entradas)
+    if manifest:
+        with open(manifest) as file:
+            padroes += [
+                linha.strip() for linha in file
+                if linha.strip() and not linha.lstrip().startswith('#')
+            ]
+
+    unidades = []
+    for padrao in padroes:
+        for caminho in sorted(glob.glob(padrao)) or [padrao]:
+            base = os.path.splitext(caminho)[0]
+            if base.endswith((SUFIXO_PRE_PROCESSADO, SUFIXO_PROCESSADO)):
+                continue
+            if caminho not in unidades:
+                unidades.append(caminho)
+    return unidades
+
+
+def esta_atualizada(saida: str, entradas: list) -> bool:
+    """Indica se `saida` existe e é mais nova que todas as `entradas`.
+
+    Uma entrada ausente conta como desatualizada: a unidade é processada e a falha
+    fica registrada no resultado dela, sem interromper o lote.
+    """
+    try:
+        mtime_saida = os.path.getmtime(saida)
+        return all(os.path.getmtime(entrada) <= mtime_saida for entrada in entradas)
+    except OSError:
+        return False
+
+
+def _inicializar_worker():
+    """Carrega o agrupamento CNJ uma vez por processo do pool."""
+    global _cnj_grouping
+    _cnj_grouping = get_cnj_grouping()
+
+
+def processar_unidade(
+    file_path: str,
+    etapas: tuple = ETAPAS,
+    engine: str = 'pandas',
+    forcar: bool = False,
+    exportar_csv: bool = False,
+    incremental: bool = False,
+    chunksize: int | None = None,
+) -> ResultadoUnidade:
+    """Executa as etapas pedidas para uma unidade, pulando as que estão atualizadas.
+
+    Args:
+    ----
+        file_path (str): CSV bruto da unidade.
+        etapas (tuple): Subconjunto ordenado de `ETAPAS`.
+        engine (str): 'pandas' ou 'polars' (ver `src.pipeline.engines`).
+        forcar (bool): Reprocessa mesmo com saídas atualizadas.
+        exportar_csv (bool): Exporta também um CSV de cada saída.
+        incremental (bool): Processa só as linhas anexadas desde a última execução
+            (ver `src.pipeline.incremental`); ignora `etapas`, `engine` e `forcar`.
+        chunksize (int): Pré-processa o CSV em blocos desse número de linhas, com memória
+            limitada (`load_and_preprocess_data_em_chunks`); só com a engine pandas.
+
+    Returns:
+    -------
+        ResultadoUnidade: Status, linhas geradas, tempo e pico de memória da unidade.
+
+    """
+    if _cnj_grouping is None:
+        _inicializar_worker()
+
+    limpar_registros()
+    escopo_pico = 'unidade' if reiniciar_pico_rss() else 'worker'
+    caminhos = caminhos_unidade(file_path)
+    if incremental:
+        resultado = _processar_incremental(file_path, caminhos['features'])
+        resultado.escopo_pico = escopo_pico
+        resultado.metricas = registros()
+        return resultado
+
+    ultima = caminhos[etapas[-1]]
+    dependencias = [file_path, CAMINHO_TPU]
+    if etapas == ('features',):
+        dependencias = [caminhos['pre_processamento'], CAMINHO_TPU]
+    if not forcar and esta_atualizada(ultima, dependencias):
+        return ResultadoUnidade(file_path, 'pulada')
+
+    inicio = time.perf_counter()
+    try:
+        with etapa('unidade') as medicao:
+            linhas = _executar_etapas(caminhos, etapas, engine, exportar_csv, chunksize)
+            medicao.linhas_saida = linhas
+    except Exception as e:
+        return ResultadoUnidade(file_path, 'erro', erro=str(e), metricas=registros())
+
+    return ResultadoUnidade(
+        file_path,
+        'ok',
+        linhas=linhas,
+        segundos=time.perf_counter() - inicio,
+        pico_rss_mb=pico_rss_mb(),
+        escopo_pico=escopo_pico,
+        metricas=registros(),
+    )
+
+
+def _processar_incremental(file_path, saida):
+    inicio = time.perf_counter()
+    try:
+        with etapa('unidade_incremental') as medicao:
+            resultado = atualizar_unidade(file_path, saida, _cnj_grouping)
+            medicao.linhas_saida = resultado.linhas_gravadas
+    except Exception as e:
+        return ResultadoUnidade(file_path, 'erro', erro=str(e))
+
+    return ResultadoUnidade(
+        file_path,
+        'ok' if resultado.linhas_lidas or resultado.reconstruida else 'pulada',
+        linhas=resultado.linhas_gravadas,
+        segundos=time.perf_counter() - inicio,
+        pico_rss_mb=pico_rss_mb(),
+    )
+
+
+def _executar_etapas(caminhos, etapas, engine, exportar_csv, chunksize=None):
+    """Executa as etapas da unidade e retorna o número de linhas da última saída."""
+    if engine == 'polars' and etapas == ETAPAS:
+        from src.pipeline.polars_engine import executar_pipeline_polars
+
+        df = executar_pipeline_polars(caminhos['entrada'], _cnj_grouping).to_pandas()
+        salvar_movimentos(df, caminhos['features'], exportar_csv=exportar_csv)
+        _salvar_agregados(df, caminhos['features'])
+        return len(df)
+
+    if 'pre_processamento' in etapas and chunksize:
+        # O CSV nunca é carregado inteiro: os blocos vão direto para o Parquet.
+        linhas = load_and_preprocess_data_em_chunks(caminhos['entrada'], caminhos['pre_processamento'], chunksize)
+        if exportar_csv:
+            exportar_csv_em_blocos(caminhos['pre_processamento'])
+        if 'features' not in etapas:
+            return linhas
+        df = carregar_movimentos(caminhos['pre_processamento'])
+    elif 'pre_processamento' in etapas:
+        df = load_and_preprocess_data(caminhos['entrada'])
+        salvar_movimentos(df, caminhos['pre_processamento'], exportar_csv=exportar_csv)
+    else:
+        df = carregar_movimentos(caminhos['pre_processamento'])
+
+    if 'features' in etapas:
+        df = especializar_movimentos(df, _cnj_grouping)
+        salvar_movimentos(df, caminhos['features'], exportar_csv=exportar_csv)
+        _salvar_agregados(df, caminhos['features'])
+
+    return len(df)
+
+
+def _salvar_agregados(df, saida):
+    """Grava as tabelas pré-computadas do dashboard (cubo, análise por processo e sketches)."""
+    salvar_cubo(construir_cubo(df), saida)
+    salvar_analise_casos(analisar_casos(df), saida)
+    salvar_sketches(construir_sketches(df), saida)
+
+
+def executar_lote(unidades: list, workers: int | None = None, **kwargs) -> list:
+    """Processa as unidades em um pool de processos.
+
+    Args:
+    ----
+        unidades (list): CSVs brutos das unidades.
+        workers (int): Tamanho do pool; None usa o número de CPUs.
+        **kwargs: Repassados para `processar_unidade`.
+
+    Returns:
+    -------
+        list: `ResultadoUnidade` de cada unidade, na ordem de `unidades`.
+
+    """
+    # 'spawn' evita herdar threads do Polars/Arrow em um fork.
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=contexto, initializer=_inicializar_worker,
+    ) as pool:
+        futuros = {
+            pool.submit(processar_unidade, unidade, **kwargs): unidade
+            for unidade in unidades
+        }
+        resultados = {}
+        for futuro in as_completed(futuros):
+            resultado = futuro.result()
+            resultados[futuros[futuro]] = resultado
+            imprimir_resultado(resultado)
+
+    return [resultados[unidade] for unidade in unidades]
+
+
+def imprimir_resultado(resultado: ResultadoUnidade) -> None:
+    """Imprime uma linha de resumo para a unidade."""
+    linha = (
+        f'[{resultado.status:>6}] {resultado.unidade}: {resultado.linhas} linhas, '
+        f'{resultado.segundos:.2f}s, pico RSS {resultado.pico_rss_mb:.0f} MiB'
+    )
+    if resultado.escopo_pico != 'unidade':
+        linha += f' (do {resultado.escopo_pico})'
+    if resultado.erro:
+        linha += f' -> {resultado.erro}'
+    print(linha, flush=True)
+
+
+def main(argv: list | None = None) -> int:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('entradas', nargs='*', help='CSVs brutos ou padrões glob das unidades.')
+    parser.add_argument('--manifest', help='Arquivo com um caminho (ou glob) de unidade por linha.')
+    parser.add_argument('--workers', type=int, default=None, help='Processos no pool (padrão: nº de CPUs).')
+    parser.add_argument(
+        '--engine', choices=ENGINES, default='pandas',
+        help='Engine do pipeline completo; polars exige todas as etapas e não aceita --chunksize.',
+    )
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=list(ETAPAS))
+    parser.add_argument('--forcar', action='store_true', help='Reprocessa unidades já atualizadas.')
+    parser.add_argument('--csv', action='store_true', help='Exporta também as saídas em CSV.')
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='Processa apenas os movimentos anexados desde a última execução.',
+    )
+    parser.add_argument(
+        '--chunksize', type=int, default=None,
+        help='Pré-processa cada CSV em blocos desse número de linhas (memória limitada; engine pandas).',
+    )
+    parser.add_argument(
+        '--metricas', help='Grava as métricas por etapa em JSON ou, com extensão .prom, no formato do Prometheus.',
+    )
+    parser.add_argument(
+        '--perfil', help='Diretório para os dumps de cProfile e tracemalloc de cada unidade.',
+    )
+    args = parser.parse_args(argv)
+    if args.engine == 'polars' and not args.incremental:
+        # A engine polars só existe para o pipeline inteiro e lê o CSV de uma vez.
+        if set(args.etapas) != set(ETAPAS):
+            parser.error('--engine polars executa todas as etapas; use --engine pandas com --etapas.')
+        if args.chunksize:
+            parser.error('--chunksize só vale com --engine pandas.')
+
+    entradas = args.entradas or ([] if args.manifest else ENTRADAS_PADRAO)
+    unidades = listar_unidades(entradas, args.manifest)
+    if not unidades:
+        print('Nenhuma unidade encontrada.')
+        return 1
+
+    if args.perfil:
+        # Os workers ('spawn') herdam o ambiente do processo principal.
+        os.environ[VARIAVEL_PERFIL] = os.path.abspath(args.perfil)
+
+    inicio = time.perf_counter()
+    resultados = executar_lote(
+        unidades,
+        workers=args.workers,
+        etapas=tuple(etapa for etapa in ETAPAS if etapa in args.etapas),
+        engine=args.engine,
+        forcar=args.forcar,
+        exportar_csv=args.csv,
+        incremental=args.incremental,
+        chunksize=args.chunksize,
+    )
+    print(f'{len(unidades)} unidade(s) em {time.perf_counter() - inicio:.2f}s')
+
+    if args.metricas:
+        metricas = [registro for resultado in resultados for registro in resultado.metricas]
+        salvar_metricas(args.metricas, metricas)
+        print(resumo(metricas).to_string(float_format='{:.2f}'.format))
+
+    return int(any(resultado.status == 'erro' for resultado in resultados))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Seleção da engine de execução do pipeline (pandas ou Polars) e comparação entre elas."""
+
+import sys
+import time
+
+import pandas as pd
+from src.data.make_dataset import get_cnj_grouping, load_and_preprocess_data
+from src.features.build_features import especializar_movimentos
+
+ENGINES = ('pandas', 'polars')
+
+
+def executar_pipeline(file_path: str, engine: str = 'pandas', cnj_grouping: dict | None = None) -> pd.DataFrame:
+    """Executa pré-processamento + especialização com a engine escolhida.
+
+    Args:
+    ----
+        file_path (str): Caminho para o arquivo bruto de movimentos.
+        engine (str): 'pandas' (caminho original) ou 'polars' (lazy, multi-thread).
+        cnj_grouping (dict): Agrupamento CNJ; se None, usa `get_cnj_grouping()`.
+
+    Returns:
+    -------
+        pd.DataFrame: Movimentos processados.
+
+    """
+    if engine not in ENGINES:
+        raise ValueError(f'Engine desconhecida: {engine!r}. Opções: {ENGINES}')
+
+    if cnj_grouping is None:
+        cnj_grouping = get_cnj_grouping()
+
+    if engine == 'polars':
+        # Importado aqui para que o caminho pandas não dependa do Polars.
+        from src.pipeline.polars_engine import executar_pipeline_polars
+
+        return executar_pipeline_polars(file_path, cnj_grouping).to_pandas()
+
+    df = load_and_preprocess_data(file_path)
+    return especializar_movimentos(df, cnj_grouping)
+
+
+def normalizar_resultado(df: pd.DataFrame) -> pd.DataFrame:
+    """Deixa o resultado de qualquer engine com índice e dtypes comparáveis.
+
+    Colunas categóricas/de texto viram `object` e o índice é reiniciado, já que as
+    engines divergem apenas na representação e não no conteúdo.
+    """
+    df = df.reset_index(drop=True)
+    for coluna in df.columns:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(df[coluna]):
+            df[coluna] = df[coluna].astype(object)
+    return df
+
+
+def comparar_engines(file_path: str) -> dict:
+    """Executa as duas engines sobre o mesmo arquivo, confere a igualdade e mede o tempo.
+
+    Args:
+    ----
+        file_path (str): Caminho para o arquivo bruto de movimentos.
+
+    Returns:
+    -------
+        dict: Tempo em segundos de cada engine.
+
+    Raises:
+    ------
+        AssertionError: Se os resultados divergirem.
+
+    """
+    cnj_grouping = get_cnj_grouping()
+    tempos, resultados = {}, {}
+
+    for engine in ENGINES:
+        inicio = time.perf_counter()
+        resultados[engine] = normalizar_resultado(
+            executar_pipeline(file_path, engine, cnj_grouping),
+        )
+        tempos[engine] = time.perf_counter() - inicio
+
+    pd.testing.assert_frame_equal(
+        resultados['pandas'], resultados['polars'], check_dtype=False,
+    )
+    return tempos
+
+
+if __name__ == '__main__':
+    for engine, segundos in comparar_engines(sys.argv[1]).items():
+        print(f'{engine}: {segundos:.3f}s')
@@ -0,0 +1,331 @@
+"""Atualização incremental de uma unidade: processa apenas os movimentos anexados ao CSV.
+
+O CSV bruto de cada unidade só cresce (movimentos novos são anexados ao final). Este
+módulo guarda, ao lado da saída processada, um estado com:
+
+- o offset em bytes até onde o CSV já foi processado e hashes do cabeçalho e do
+  trecho imediatamente anterior ao offset (para detectar que o arquivo foi
+  reescrito, e não apenas anexado, o que força uma reconstrução completa);
+- a marca d'água (maior `dataInicio` já vista), para acompanhamento;
+- o índice persistido das chaves ('processoID', 'activity') já gravadas
+  (`ChavesVistas` em um `.npy`), que mantém a deduplicação correta entre execuções.
+  Cada execução grava um `.npy` novo e o estado aponta para ele: como o estado é
+  trocado por último (`os.replace`), uma interrupção no meio deixa o estado e as
+  chaves anteriores intactos e o trecho é apenas reprocessado, nunca perdido.
+
+A saída é um diretório Parquet (`*_processado.parquet/part-NNNNN.parquet`) que
+`carregar_movimentos` lê como um único conjunto; cada execução acrescenta partes.
+O custo de uma atualização é proporcional ao volume novo, não ao histórico: os
+sketches da unidade (`src.features.sketches`) são atualizados combinando os de cada
+bloco novo com os já gravados.
+
+A exceção são as outras tabelas do dashboard, o cubo (`src.visualization.cube`) e a
+análise por processo (`src.features.case_analytics`): elas não se combinam por blocos
+(os quantis do cubo são exatos; as variantes e esperas de um processo dependem de todos
+os seus movimentos, inclusive os que chegam depois). Quando há linhas novas, são refeitas
+na mesma execução a partir da saída inteira, lendo só as colunas que usam; esse passo
+custa proporcional ao histórico da unidade.
+"""
+
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import uuid
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from src.data.make_dataset import ChavesVistas, get_cnj_grouping, preprocessar_chunk
+from src.data.storage import COMPRESSAO, carregar_movimentos, para_tabela_arrow
+from src.features.build_features import especializar_movimentos
+from src.features.case_analytics import COLUNA_ATIVIDADE, COLUNA_CASO, analisar_casos, salvar_analise_casos
+from src.features.sketches import carregar_sketches, combinar_sketches, construir_sketches, salvar_sketches
+from src.visualization.cube import COLUNA_DURACAO, DIMENSOES, construir_cubo, salvar_cubo
+
+TAMANHO_AMOSTRA_HASH = 64 * 1024
+CHUNKSIZE_PADRAO = 500_000
+COLUNAS_CASOS = [COLUNA_CASO, COLUNA_ATIVIDADE, 'dataInicio', 'dataFinal']
+
+
+@dataclass
+class EstadoIncremental:
+    """Estado persistido entre execuções incrementais de uma unidade."""
+
+    offset: int = 0
+    colunas: list = field(default_factory=list)
+    hash_cabecalho: str = ''
+    hash_cauda: str = ''
+    marca_dagua: str | None = None
+    linhas_gravadas: int = 0
+    partes: list = field(default_factory=list)
+    arquivo_chaves: str = ''
+
+
+@dataclass
+class ResultadoIncremental:
+    """Resumo de uma atualização incremental."""
+
+    linhas_lidas: int
+    linhas_gravadas: int
+    bytes_processados: int
+    reconstruida: bool
+
+
+def caminhos_estado(saida: str) -> tuple:
+    """Retorna os caminhos (estado .json, prefixo dos índices de chaves .npy) associados à saída."""
+    base = saida.removesuffix('.parquet')
+    return f'{base}.estado.json', f'{base}.chaves'
+
+
+def atualizar_unidade(
+    file_path: str,
+    saida: str,
+    cnj_grouping: dict | None = None,
+    chunksize: int = CHUNKSIZE_PADRAO,
+) -> ResultadoIncremental:
+    """Processa as linhas anexadas a `file_path` desde a última execução e as anexa à `saida`.
+
+    Se não houver estado, ou se o início do CSV mudou, a unidade é reconstruída do zero
+    (o que equivale a uma primeira execução incremental).
+
+    Os sketches da unidade são combinados com os do trecho novo; o cubo e a análise por
+    processo, que não se combinam por blocos, são refeitos a partir da saída inteira
+    (custo proporcional ao histórico) sempre que há linhas gravadas.
+
+    Args:
+    ----
+        file_path (str): CSV bruto da unidade.
+        saida (str): Diretório Parquet de saída (`*_processado.parquet`).
+        cnj_grouping (dict): Agrupamento CNJ; se None, usa `get_cnj_grouping()`.
+        chunksize (int): Linhas por bloco ao ler o trecho novo.
+
+    Returns:
+    -------
+        ResultadoIncremental: Linhas lidas/gravadas e bytes consumidos nesta execução.
+
+    """
+    if cnj_grouping is None:
+        cnj_grouping = get_cnj_grouping()
+
+    caminho_estado, caminho_chaves = caminhos_estado(saida)
+    estado = _ler_estado(caminho_estado)
+    reconstruida = (
+        estado is None
+        or not os.path.isdir(saida)
+        or not _prefixo_inalterado(file_path, estado)
+    )
+
+    if reconstruida:
+        estado = _estado_inicial(file_path)
+        chaves = ChavesVistas()
+        _preparar_saida(saida, manter=[])
+        sketches = None
+    else:
+        chaves = ChavesVistas(np.load(_arquivo_chaves(caminho_chaves, estado)))
+        _preparar_saida(saida, manter=estado.partes)
+        sketches = _sketches_anteriores(saida, estado)
+
+    fim = _fim_ultima_linha_completa(file_path)
+    if fim <= estado.offset and not reconstruida:
+        return ResultadoIncremental(0, 0, 0, reconstruida)
+
+    offset_inicial = estado.offset
+    linhas_lidas = linhas_gravadas = 0
+    lotes_sketches = []
+    if fim > estado.offset:
+        linhas_lidas, linhas_gravadas = _processar_trecho(
+            file_path, fim, saida, estado, chaves, cnj_grouping, chunksize, lotes_sketches,
+        )
+    salvar_sketches(combinar_sketches([sketches, *lotes_sketches]), saida)
+    if linhas_gravadas:
+        _refazer_agregados(saida)
+
+    estado.offset = max(fim, estado.offset)
+    estado.hash_cauda = _hash_trecho(
+        file_path, estado.offset - TAMANHO_AMOSTRA_HASH, estado.offset,
+    )
+    estado.linhas_gravadas += linhas_gravadas
+    _gravar_estado(caminho_estado, caminho_chaves, estado, chaves)
+
+    return ResultadoIncremental(
+        linhas_lidas, linhas_gravadas, estado.offset - offset_inicial, reconstruida,
+    )
+
+
+def _processar_trecho(file_path, fim, saida, estado, chaves, cnj_grouping, chunksize, lotes_sketches):
+    """Lê o CSV de `estado.offset` até `fim` em blocos e grava uma parte por bloco.
+
+    Os sketches de cada bloco gravado são acrescentados a `lotes_sketches`.
+    """
+    linhas_lidas = linhas_gravadas = 0
+    schema = pq.read_schema(os.path.join(saida, estado.partes[0])) if estado.partes else None
+
+    with open(file_path, 'rb') as arquivo:
+        arquivo.seek(estado.offset)
+        janela = io.BufferedReader(_JanelaArquivo(arquivo, fim - estado.offset))
+        leitor = pd.read_csv(
+            janela, header=None, names=estado.colunas, chunksize=chunksize,
+        )
+        for bruto in leitor:
+            linhas_lidas += len(bruto)
+            pre = preprocessar_chunk(bruto, cnj_grouping)
+            novos = pre[chaves.marcar_novas(pre)]
+            if novos.empty:
+                continue
+
+            chunk = especializar_movimentos(novos, cnj_grouping)
+            tabela = para_tabela_arrow(chunk, schema=schema)
+            schema = tabela.schema
+
+            parte = f'part-{len(estado.partes):05d}.parquet'
+            pq.write_table(tabela, os.path.join(saida, parte), compression=COMPRESSAO)
+            estado.partes.append(parte)
+            linhas_gravadas += len(chunk)
+            lotes_sketches.append(construir_sketches(chunk))
+
+            maximo = chunk['dataInicio'].max()
+            if pd.notna(maximo) and (
+                estado.marca_dagua is None or maximo > pd.Timestamp(estado.marca_dagua)
+            ):
+                estado.marca_dagua = maximo.isoformat()
+
+    return linhas_lidas, linhas_gravadas
+
+
+def _refazer_agregados(saida):
+    """Refaz o cubo e a análise por processo a partir da saída inteira (ver o módulo)."""
+    salvar_cubo(construir_cubo(carregar_movimentos(saida, colunas=[*DIMENSOES, COLUNA_DURACAO])), saida)
+    salvar_analise_casos(analisar_casos(carregar_movimentos(saida, colunas=COLUNAS_CASOS)), saida)
+
+
+def _sketches_anteriores(saida, estado):
+    """Sketches das partes já gravadas; refeitos a partir delas se faltarem ou divergirem.
+
+    Os sketches e o estado são arquivos separados: se uma execução parar entre as
+    duas gravações, a contagem dos sketches deixa de bater com `linhas_gravadas`.
+    """
+    sketches = carregar_sketches(saida, verificar_data=False)
+    if sketches is not None and sketches['contagem'].sum() == estado.linhas_gravadas:
+        return sketches
+    if not estado.partes:
+        return None
+    sketches = construir_sketches(carregar_movimentos(saida))
+    salvar_sketches(sketches, saida)
+    return sketches
+
+
+def _estado_inicial(file_path):
+    with open(file_path, 'rb') as arquivo:
+        cabecalho = arquivo.readline()
+    colunas = pd.read_csv(io.BytesIO(cabecalho), nrows=0).columns.tolist()
+    return EstadoIncremental(
+        offset=len(cabecalho),
+        colunas=colunas,
+        hash_cabecalho=_hash_trecho(file_path, 0, TAMANHO_AMOSTRA_HASH),
+    )
+
+
+def _prefixo_inalterado(file_path, estado):
+    """Confere, por amostragem, que os bytes já processados não mudaram."""
+    if os.path.getsize(file_path) < estado.offset:
+        return False
+    tamanho_cabecalho = int(estado.hash_cabecalho.split(':')[0])
+    return (
+        _hash_trecho(file_path, 0, tamanho_cabecalho) == estado.hash_cabecalho
+        and _hash_trecho(file_path, estado.offset - TAMANHO_AMOSTRA_HASH, estado.offset)
+        == estado.hash_cauda
+    )
+
+
+def _hash_trecho(file_path, inicio, fim):
+    inicio = max(inicio, 0)
+    with open(file_path, 'rb') as arquivo:
+        arquivo.seek(inicio)
+        dados = arquivo.read(max(fim - inicio, 0))
+    return f'{len(dados)}:{hashlib.sha256(dados).hexdigest()}'
+
+
+def _fim_ultima_linha_completa(file_path):
+    """Offset logo após o último '\\n'; uma linha ainda sendo escrita fica para a próxima."""
+    tamanho = os.path.getsize(file_path)
+    with open(file_path, 'rb') as arquivo:
+        posicao = tamanho
+        while posicao > 0:
+            inicio = max(posicao - TAMANHO_AMOSTRA_HASH, 0)
+            arquivo.seek(inicio)
+            bloco = arquivo.read(posicao - inicio)
+            indice = bloco.rfind(b'\n')
+            if indice >= 0:
+                return inicio + indice + 1
+            posicao = inicio
+    return 0
+
+
+def _preparar_saida(saida, manter):
+    """Garante o diretório de saída, removendo partes órfãs de execuções interrompidas."""
+    if os.path.isfile(saida):
+        os.remove(saida)
+    if not manter and os.path.isdir(saida):
+        shutil.rmtree(saida)
+    os.makedirs(saida, exist_ok=True)
+    for nome in os.listdir(saida):
+        if nome not in manter:
+            os.remove(os.path.join(saida, nome))
+
+
+def _ler_estado(caminho_estado):
+    try:
+        with open(caminho_estado) as file:
+            return EstadoIncremental(**json.load(file))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _arquivo_chaves(caminho_chaves, estado):
+    # Estados anteriores ao `arquivo_chaves` usavam um único `<base>.chaves.npy`.
+    if not estado.arquivo_chaves:
+        return f'{caminho_chaves}.npy'
+    return os.path.join(os.path.dirname(caminho_chaves), estado.arquivo_chaves)
+
+
+def _gravar_estado(caminho_estado, caminho_chaves, estado, chaves):
+    # As chaves vão para um arquivo novo e o estado, que aponta para ele, é trocado por
+    # último: até o `os.replace` do estado, valem o estado e as chaves anteriores (que
+    # não listam as partes novas, descartadas na próxima execução), e o trecho é
+    # reprocessado. Só depois os índices antigos (ou órfãos de uma interrupção) saem.
+    novo = f'{caminho_chaves}.{uuid.uuid4().hex}.npy'
+    with open(novo + '.tmp', 'wb') as file:
+        np.save(file, chaves.hashes)
+    os.replace(novo + '.tmp', novo)
+
+    estado.arquivo_chaves = os.path.basename(novo)
+    with open(caminho_estado + '.tmp', 'w') as file:
+        json.dump(asdict(estado), file, indent=2)
+    os.replace(caminho_estado + '.tmp', caminho_estado)
+
+    for antigo in glob.glob(f'{glob.escape(caminho_chaves)}.*npy*'):
+        if antigo != novo:
+            os.remove(antigo)
+
+
+class _JanelaArquivo(io.RawIOBase):
+    """Expõe apenas os próximos `tamanho` bytes de um arquivo já posicionado."""
+
+    def __init__(self, arquivo, tamanho):
+        self.arquivo = arquivo
+        self.restante = tamanho
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.restante <= 0:
+            return 0
+        dados = self.arquivo.read(min(len(buffer), self.restante))
+        buffer[:len(dados)] = dados
+        self.restante -= len(dados)
+        return len(dados)
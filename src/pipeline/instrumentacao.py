@@ -0,0 +1,365 @@
+"""Instrumentação das etapas do pipeline e dos carregadores do dashboard.
+
+`medir_etapa` (decorador) e `etapa` (context manager) registram, para cada
+execução: duração, RSS no início/fim, pico de RSS (`pico_rss_mb`), linhas de entrada e
+de saída e linhas por segundo. Os registros ficam em memória (`registros()`) e podem
+ser exportados como JSON ou no formato texto do Prometheus (`salvar_metricas`).
+
+Variáveis de ambiente (herdadas pelos workers do pool):
+
+- `INSTRUMENTACAO_SAIDA`: arquivo JSON Lines ao qual cada etapa acrescenta o seu
+  registro (útil no dashboard, que não tem um fim de execução; leia com
+  `ler_registros`), ou `.prom`, gravado uma vez, ao fim do processo;
+- `INSTRUMENTACAO_PERFIL`: diretório onde cada etapa externa grava um `.prof`
+  (cProfile) e o top de alocações do tracemalloc (`.tracemalloc.txt`). Os dois valem
+  para o processo inteiro: com threads (dashboard), só uma etapa é perfilada por vez
+  e as que começam enquanto isso seguem sem perfil.
+
+A profundidade de aninhamento das etapas é por thread.
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+VARIAVEL_SAIDA = 'INSTRUMENTACAO_SAIDA'
+VARIAVEL_PERFIL = 'INSTRUMENTACAO_PERFIL'
+MAX_REGISTROS = 10_000
+TOP_ALOCACOES = 25
+PREFIXO_PROMETHEUS = 'pipeline_etapa'
+
+_registros = deque(maxlen=MAX_REGISTROS)
+_saidas_no_fim = set()
+_estado = threading.local()
+# O cProfile e o tracemalloc valem para o processo: uma etapa perfilada por vez.
+_trava_perfil = threading.Lock()
+
+
+@dataclass
+class RegistroEtapa:
+    """Medidas de uma execução de etapa."""
+
+    etapa: str
+    inicio: float
+    segundos: float
+    linhas_entrada: int | None
+    linhas_saida: int | None
+    linhas_por_segundo: float | None
+    rss_inicio_mb: float
+    rss_fim_mb: float
+    pico_rss_mb: float
+    pid: int
+    erro: str = ''
+
+
+class _Medicao:
+    """Objeto entregue pelo context manager `etapa`; `saida` pode ser ajustado no bloco."""
+
+    def __init__(self, linhas_entrada):
+        self.linhas_entrada = linhas_entrada
+        self.linhas_saida = None
+
+    def saida(self, resultado):
+        self.linhas_saida = contar_linhas(resultado)
+        return resultado
+
+
+@contextmanager
+def etapa(nome: str, entrada=None):
+    """Mede o bloco como a etapa `nome`.
+
+    Args:
+    ----
+        nome (str): Nome da etapa nos registros.
+        entrada: Objeto de entrada (DataFrame, Series, dict) ou número de linhas.
+
+    Yields:
+    ------
+        _Medicao: Chame `medicao.saida(resultado)` para registrar as linhas de saída.
+
+    """
+    medicao = _Medicao(entrada if isinstance(entrada, int) else contar_linhas(entrada))
+    profundidade = getattr(_estado, 'profundidade', 0)
+    perfil = os.environ.get(VARIAVEL_PERFIL) if profundidade == 0 else None
+    profiler = _iniciar_perfil(perfil)
+
+    erro = ''
+    rss_inicio = rss_atual_mb()
+    inicio = time.time()
+    relogio = time.perf_counter()
+    _estado.profundidade = profundidade + 1
+    try:
+        yield medicao
+    except Exception as e:
+        erro = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        _estado.profundidade = profundidade
+        segundos = time.perf_counter() - relogio
+        _finalizar_perfil(profiler, perfil, nome)
+
+        linhas = medicao.linhas_saida if medicao.linhas_saida is not None else medicao.linhas_entrada
+        _registrar(RegistroEtapa(
+            etapa=nome,
+            inicio=inicio,
+            segundos=segundos,
+            linhas_entrada=medicao.linhas_entrada,
+            linhas_saida=medicao.linhas_saida,
+            linhas_por_segundo=linhas / segundos if linhas is not None and segundos > 0 else None,
+            rss_inicio_mb=rss_inicio,
+            rss_fim_mb=rss_atual_mb(),
+            pico_rss_mb=pico_rss_mb(),
+            pid=os.getpid(),
+            erro=erro,
+        ))
+
+
+def medir_etapa(nome: str | None = None):
+    """Decorador que mede cada chamada da função com `etapa`.
+
+    As linhas de entrada vêm do primeiro argumento e as de saída, do retorno.
+    """
+    def decorador(func):
+        rotulo = nome or func.__name__
+
+        @functools.wraps(func)
+        def envoltorio(*args, **kwargs):
+            with etapa(rotulo, args[0] if args else None) as medicao:
+                return medicao.saida(func(*args, **kwargs))
+
+        return envoltorio
+
+    return decorador
+
+
+def contar_linhas(objeto) -> int | None:
+    """Número de linhas de DataFrames/Series/dicts; None para outros objetos."""
+    if isinstance(objeto, (pd.DataFrame, pd.Series, dict)):
+        return len(objeto)
+    return None
+
+
+def rss_atual_mb() -> float:
+    """RSS atual do processo em MiB (pico do processo fora do Linux)."""
+    try:
+        with open('/proc/self/statm') as file:
+            paginas = int(file.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return _pico_processo_mb()
+
+
+def pico_rss_mb() -> float:
+    """Pico de RSS em MiB desde o último `reiniciar_pico_rss` (ou desde o início do processo)."""
+    try:
+        with open('/proc/self/status') as file:
+            for linha in file:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return _pico_processo_mb()
+
+
+def reiniciar_pico_rss() -> bool:
+    """Zera o pico de RSS do processo (Linux: `/proc/self/clear_refs`).
+
+    Permite medir o pico de cada unidade em um worker que processa várias. Retorna
+    False quando não é possível; aí `pico_rss_mb` continua sendo o pico do processo.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def registros() -> list:
+    """Registros deste processo, do mais antigo para o mais recente."""
+    return list(_registros)
+
+
+def limpar_registros() -> None:
+    """Descarta os registros acumulados neste processo."""
+    _registros.clear()
+
+
+def resumo(lista: list | None = None) -> pd.DataFrame:
+    """Agrega os registros por etapa (chamadas, tempos, linhas e memória).
+
+    Args:
+    ----
+        lista (list): `RegistroEtapa`s ou dicts; None usa os deste processo.
+
+    Returns:
+    -------
+        pd.DataFrame: Uma linha por etapa, da mais demorada para a mais rápida.
+
+    """
+    df = _para_dataframe(lista)
+    if df.empty:
+        return df
+    agrupado = df.groupby('etapa')
+    tabela = pd.DataFrame({
+        'chamadas': agrupado.size(),
+        'erros': agrupado['erro'].apply(lambda e: int((e != '').sum())),
+        'segundos': agrupado['segundos'].sum(),
+        'segundos_max': agrupado['segundos'].max(),
+        'linhas_entrada': agrupado['linhas_entrada'].sum(min_count=1),
+        'linhas_saida': agrupado['linhas_saida'].sum(min_count=1),
+        'pico_rss_mb': agrupado['pico_rss_mb'].max(),
+        'delta_rss_mb': (df['rss_fim_mb'] - df['rss_inicio_mb']).groupby(df['etapa']).max(),
+    })
+    linhas = tabela['linhas_saida'].fillna(tabela['linhas_entrada'])
+    tabela['linhas_por_segundo'] = linhas / tabela['segundos']
+    return tabela.sort_values('segundos', ascending=False)
+
+
+def salvar_metricas(caminho: str, lista: list | None = None) -> None:
+    """Grava os registros em JSON (registros + resumo) ou texto do Prometheus (`.prom`).
+
+    Args:
+    ----
+        caminho (str): Arquivo de saída; o formato é escolhido pela extensão.
+        lista (list): `RegistroEtapa`s ou dicts; None usa os deste processo.
+
+    """
+    lista = registros() if lista is None else lista
+    if caminho.endswith('.prom'):
+        conteudo = formatar_prometheus(lista)
+    else:
+        tabela = resumo(lista)
+        conteudo = json.dumps({
+            'registros': [_para_dict(registro) for registro in lista],
+            'resumo': json.loads(tabela.reset_index().to_json(orient='records')),
+        }, indent=2, ensure_ascii=False)
+
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'w') as file:
+        file.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def anexar_registro(caminho: str, registro) -> None:
+    """Acrescenta o registro como uma linha JSON ao arquivo (JSON Lines)."""
+    linha = json.dumps(_para_dict(registro), ensure_ascii=False) + '\n'
+    # Uma única escrita em modo append: workers do pool podem anexar ao mesmo arquivo.
+    with open(caminho, 'a') as file:
+        file.write(linha)
+
+
+def ler_registros(caminho: str) -> list:
+    """Registros (dicts) de um arquivo JSON Lines gravado por `anexar_registro`."""
+    with open(caminho) as file:
+        return [json.loads(linha) for linha in file if linha.strip()]
+
+
+def formatar_prometheus(lista: list | None = None) -> str:
+    """Resumo por etapa no formato de exposição texto do Prometheus."""
+    tabela = resumo(lista)
+    metricas = [
+        ('chamadas_total', 'counter', 'chamadas', 'Execuções da etapa.'),
+        ('erros_total', 'counter', 'erros', 'Execuções que terminaram com exceção.'),
+        ('segundos_total', 'counter', 'segundos', 'Tempo acumulado na etapa.'),
+        ('segundos_max', 'gauge', 'segundos_max', 'Execução mais longa da etapa.'),
+        ('linhas_entrada_total', 'counter', 'linhas_entrada', 'Linhas recebidas pela etapa.'),
+        ('linhas_saida_total', 'counter', 'linhas_saida', 'Linhas produzidas pela etapa.'),
+        ('linhas_por_segundo', 'gauge', 'linhas_por_segundo', 'Vazão média da etapa.'),
+        ('pico_rss_mb', 'gauge', 'pico_rss_mb', 'Pico de RSS ao fim da etapa (desde o início da unidade no lote).'),
+        ('delta_rss_mb', 'gauge', 'delta_rss_mb', 'Maior crescimento de RSS durante a etapa.'),
+    ]
+    linhas = []
+    for sufixo, tipo, coluna, ajuda in metricas:
+        nome = f'{PREFIXO_PROMETHEUS}_{sufixo}'
+        linhas += [f'# HELP {nome} {ajuda}', f'# TYPE {nome} {tipo}']
+        for nome_etapa, valor in tabela.get(coluna, pd.Series(dtype=float)).items():
+            if pd.notna(valor):
+                linhas.append(f'{nome}{{etapa="{nome_etapa}"}} {float(valor):.6g}')
+    return '\n'.join(linhas) + '\n'
+
+
+def _registrar(registro):
+    _registros.append(registro)
+    saida = os.environ.get(VARIAVEL_SAIDA)
+    if not saida:
+        return
+    if saida.endswith('.prom'):
+        # O resumo do Prometheus não se compõe por linhas: sai uma vez, ao fim do processo.
+        if saida not in _saidas_no_fim:
+            _saidas_no_fim.add(saida)
+            atexit.register(_salvar_no_fim, saida)
+        return
+    try:
+        anexar_registro(saida, registro)
+    except OSError:
+        pass
+
+
+def _salvar_no_fim(saida):
+    try:
+        salvar_metricas(saida)
+    except OSError:
+        pass
+
+
+def _iniciar_perfil(perfil):
+    # Com outra etapa já perfilada (outra thread, ex.: sessões do dashboard), segue sem perfil.
+    if not perfil or not _trava_perfil.acquire(blocking=False):
+        return None
+    try:
+        os.makedirs(perfil, exist_ok=True)
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    except BaseException:
+        tracemalloc.stop()
+        _trava_perfil.release()
+        raise
+    return profiler
+
+
+def _finalizar_perfil(profiler, perfil, nome):
+    if profiler is None:
+        return
+    try:
+        profiler.disable()
+        base = os.path.join(perfil, f'{nome}-{os.getpid()}-{time.time_ns()}')
+        profiler.dump_stats(f'{base}.prof')
+
+        atual, pico = tracemalloc.get_traced_memory()
+        alocacoes = tracemalloc.take_snapshot().statistics('lineno')[:TOP_ALOCACOES]
+        tracemalloc.stop()
+        with open(f'{base}.tracemalloc.txt', 'w') as file:
+            file.write(f'atual: {atual / 2**20:.1f} MiB, pico: {pico / 2**20:.1f} MiB\n')
+            file.writelines(f'{estatistica}\n' for estatistica in alocacoes)
+    finally:
+        tracemalloc.stop()
+        _trava_perfil.release()
+
+
+def _pico_processo_mb():
+    # `ru_maxrss` vem em KiB no Linux e em bytes no macOS.
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == 'darwin' else pico / 1024
+
+
+def _para_dict(registro):
+    return registro if isinstance(registro, dict) else asdict(registro)
+
+
+def _para_dataframe(lista):
+    lista = registros() if lista is None else lista
+    return pd.DataFrame([_para_dict(registro) for registro in lista], columns=list(RegistroEtapa.__annotations__))
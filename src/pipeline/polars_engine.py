@@ -0,0 +1,176 @@
+"""Engine Polars (lazy) para o pré-processamento e a especialização dos movimentos.
+
+Reproduz `load_and_preprocess_data` e `especializar_movimentos` sobre `LazyFrame`s:
+a leitura é feita com `scan_csv`/`scan_parquet`, a classificação usa `str.contains`
+em expressões (executadas em paralelo pelo Polars) e o resultado é coletado em
+modo streaming.
+
+Os lookups na TPU usam `replace_strict`, que o Polars executa como um join contra
+a tabela de mapeamento mas preserva a ordem das linhas, da qual a deduplicação
+(`keep='first'`) depende.
+"""
+
+import polars as pl
+from src.data.make_dataset import get_cnj_grouping
+from src.features import regras
+
+CATEGORIAS_INSIGNIFICANTES = ['publicação', 'decurso de prazo', 'conclusão', 'mero expediente']
+
+# Mesma tabela do caminho pandas (`src.features.regras`), em ordem de prioridade:
+# (coluna, padrão, rótulo).
+REGRAS_MOVEMENT_DETAIL = [
+    (regra.campo, regra.padrao, regra.rotulo)
+    for regra in sorted(regras.REGRAS_MOVEMENT_DETAIL, key=lambda regra: regra.prioridade)
+]
+
+COMPLEXIDADE_MAP = {
+    'Início do Processo': 'Simples',
+    'Notificação': 'Simples',
+    'Audiência': 'Médio',
+    'Sentença': 'Médio',
+    'Decisão': 'Médio',
+}
+
+
+def scan_movimentos(file_path: str) -> pl.LazyFrame:
+    """Abre o arquivo de movimentos como `LazyFrame` (Parquet ou CSV).
+
+    Args:
+    ----
+        file_path (str): Caminho para o `.parquet` ou `.csv`.
+
+    Returns:
+    -------
+        pl.LazyFrame: Plano de leitura, ainda não executado.
+
+    """
+    if file_path.endswith('.parquet'):
+        return pl.scan_parquet(file_path)
+    return pl.scan_csv(file_path, infer_schema_length=10_000)
+
+
+def preprocessar_lazy(lf: pl.LazyFrame, cnj_grouping: dict) -> pl.LazyFrame:
+    """Equivalente lazy de `load_and_preprocess_data` (sem a leitura do arquivo).
+
+    Args:
+    ----
+        lf (pl.LazyFrame): Movimentos brutos.
+        cnj_grouping (dict): Dicionário de agrupamento CNJ (movimentoID -> grupo).
+
+    Returns:
+    -------
+        pl.LazyFrame: Plano com o pré-processamento aplicado.
+
+    """
+    schema = lf.collect_schema()
+    chaves, grupos = _lookup_numerico(cnj_grouping)
+
+    lf = lf.with_columns(
+        _para_datetime('dataInicio', schema),
+        _para_datetime('dataFinal', schema),
+        pl.col('complemento').fill_null('N/A'),
+        pl.col('documento').fill_null('N/A'),
+        pl.col('movimentoID')
+        .replace_strict(chaves, grupos, default='Outros', return_dtype=pl.String)
+        .alias('grupo_movimento'),
+    ).filter(
+        ~pl.col('grupo_movimento').str.to_lowercase().is_in(CATEGORIAS_INSIGNIFICANTES),
+    )
+
+    # Como no pandas, o mapa de agrupamento é indexado por movimentoID numérico: uma
+    # coluna 'activity' textual não encontra correspondência e é mantida como está.
+    if schema['activity'].is_integer():
+        activity_group = pl.col('activity').replace_strict(
+            chaves, grupos, default=pl.col('activity').cast(pl.String), return_dtype=pl.String,
+        )
+    else:
+        activity_group = pl.col('activity')
+    lf = lf.with_columns(activity_group.alias('activity_group'))
+
+    lf = lf.with_columns(
+        ((pl.col('dataFinal') - pl.col('dataInicio')).dt.total_nanoseconds() / 1e9)
+        .alias('duration_calculated'),
+    )
+
+    return lf.unique(subset=['processoID', 'activity'], keep='first', maintain_order=True)
+
+
+def especializar_lazy(lf: pl.LazyFrame, tpu_cnj: dict) -> pl.LazyFrame:
+    """Equivalente lazy de `especializar_movimentos`.
+
+    Args:
+    ----
+        lf (pl.LazyFrame): Movimentos pré-processados.
+        tpu_cnj (dict): Dicionário que mapeia os identificadores de movimento para categorias da TPU do CNJ.
+
+    Returns:
+    -------
+        pl.LazyFrame: Plano com 'movement_detail' e 'complexity'.
+
+    """
+    schema = lf.collect_schema()
+
+    detalhe = pl.lit(regras.DETALHE_PADRAO)
+    for coluna, padrao, rotulo in reversed(REGRAS_MOVEMENT_DETAIL):
+        detalhe = (
+            pl.when(pl.col(coluna).str.to_lowercase().str.contains(padrao, literal=True))
+            .then(pl.lit(rotulo))
+            .otherwise(detalhe)
+        )
+
+    if 'fase' in schema:
+        detalhe = detalhe + (
+            pl.when(pl.col('fase') == 'inicial').then(pl.lit(' - Fase Inicial'))
+            .when(pl.col('fase') == 'contestação').then(pl.lit(' - Fase de Contestação'))
+            .otherwise(pl.lit(''))
+        )
+
+    # `classificar_movement_detail` consulta o dicionário com str(movimentoID).
+    categorias = {k: str(v) for k, v in tpu_cnj.items() if isinstance(k, str)}
+    categoria = pl.col('movimentoID').cast(pl.String).replace_strict(
+        list(categorias), list(categorias.values()), default='Outros', return_dtype=pl.String,
+    )
+
+    grupo = pl.col('activity_group').cast(pl.String).str.strip_chars()
+    grupo_capitalizado = (
+        grupo.str.slice(0, 1).str.to_uppercase() + grupo.str.slice(1).str.to_lowercase()
+    )
+
+    return lf.with_columns(
+        (categoria + pl.lit(': ') + detalhe).alias('movement_detail'),
+        grupo_capitalizado.replace_strict(
+            COMPLEXIDADE_MAP, default='Complexo', return_dtype=pl.String,
+        ).alias('complexity'),
+    )
+
+
+def executar_pipeline_polars(file_path: str, cnj_grouping: dict | None = None) -> pl.DataFrame:
+    """Executa pré-processamento e especialização com Polars, coletando em streaming.
+
+    Args:
+    ----
+        file_path (str): Caminho para o arquivo bruto (`.csv` ou `.parquet`).
+        cnj_grouping (dict): Agrupamento CNJ; se None, usa `get_cnj_grouping()`.
+
+    Returns:
+    -------
+        pl.DataFrame: Movimentos processados.
+
+    """
+    if cnj_grouping is None:
+        cnj_grouping = get_cnj_grouping()
+
+    lf = preprocessar_lazy(scan_movimentos(file_path), cnj_grouping)
+    lf = especializar_lazy(lf, cnj_grouping)
+    return lf.collect(streaming=True)
+
+
+def _para_datetime(coluna, schema):
+    if schema[coluna] == pl.String:
+        return pl.col(coluna).str.to_datetime(time_unit='ns', strict=False)
+    return pl.col(coluna).cast(pl.Datetime('ns'))
+
+
+def _lookup_numerico(mapa):
+    chaves = [k for k in mapa if isinstance(k, int)]
+    return chaves, [str(mapa[k]) for k in chaves]
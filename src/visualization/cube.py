@@ -0,0 +1,136 @@
+"""Cubo de agregados por unidade para os gráficos do dashboard.
+
+O cubo tem uma linha por combinação `movement_detail` x `complexity` com a contagem
+de movimentos e as estatísticas de `duration_calculated` (n, soma, soma dos
+quadrados, mínimo, máximo e uma grade de quantis). Contagens, médias e desvios de
+qualquer recorte pelos filtros do dashboard saem de somas sobre poucas linhas do
+cubo, sem voltar às linhas brutas.
+
+O pipeline em lote grava o cubo de cada unidade (`*_processado_cubo.parquet`); o
+dashboard o reconstrói apenas se ele estiver ausente ou desatualizado.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES = ['movement_detail', 'complexity']
+COLUNA_DURACAO = 'duration_calculated'
+QUANTIS = np.round(np.linspace(0, 1, 21), 2)
+
+
+def colunas_quantis() -> list:
+    """Nomes das colunas de quantis do cubo (q0.00 ... q1.00)."""
+    return [f'q{q:.2f}' for q in QUANTIS]
+
+
+def construir_cubo(df: pd.DataFrame) -> pd.DataFrame:
+    """Agrega os movimentos por `DIMENSOES`.
+
+    Args:
+    ----
+        df (pd.DataFrame): Movimentos processados.
+
+    Returns:
+    -------
+        pd.DataFrame: Uma linha por célula, com as dimensões como colunas.
+
+    """
+    duracao = df[COLUNA_DURACAO]
+    base = df[DIMENSOES].assign(
+        _duracao=duracao,
+        _quadrado=duracao ** 2,
+    )
+    agrupado = base.groupby(DIMENSOES, observed=True, sort=False)
+
+    cubo = pd.DataFrame({
+        'contagem': agrupado.size(),
+        'n_duracao': agrupado['_duracao'].count(),
+        'soma': agrupado['_duracao'].sum(),
+        'soma_quadrados': agrupado['_quadrado'].sum(),
+        'minimo': agrupado['_duracao'].min(),
+        'maximo': agrupado['_duracao'].max(),
+    })
+
+    # Pelos rótulos: com `df` vazio, o `unstack` não gera nenhuma coluna de quantil.
+    quantis = agrupado['_duracao'].quantile(QUANTIS).unstack().reindex(columns=QUANTIS)
+    quantis.columns = colunas_quantis()
+
+    return cubo.join(quantis).reset_index()
+
+
+def filtrar_cubo(cubo: pd.DataFrame, movement_filter=None, complexity_filter=None) -> pd.DataFrame:
+    """Recorta o cubo com os mesmos filtros de `apply_filters`.
+
+    Args:
+    ----
+        cubo (pd.DataFrame): Cubo de `construir_cubo`.
+        movement_filter (list): Valores de 'movement_detail' (vazio = todos).
+        complexity_filter (list): Valores de 'complexity' (vazio = todos).
+
+    Returns:
+    -------
+        pd.DataFrame: Células selecionadas.
+
+    """
+    mascara = np.ones(len(cubo), dtype=bool)
+    if movement_filter:
+        mascara &= cubo['movement_detail'].isin(movement_filter).to_numpy()
+    if complexity_filter:
+        mascara &= cubo['complexity'].isin(complexity_filter).to_numpy()
+    return cubo[mascara]
+
+
+def contagens(cubo: pd.DataFrame, dimensao: str) -> pd.Series:
+    """Número de movimentos por valor de `dimensao` (equivale a `value_counts`)."""
+    return (
+        cubo.groupby(dimensao, observed=True)['contagem'].sum()
+        .loc[lambda c: c > 0]
+        .sort_values(ascending=False)
+    )
+
+
+def estatisticas_duracao(cubo: pd.DataFrame, dimensao: str) -> pd.DataFrame:
+    """Média, desvio padrão amostral, mínimo e máximo da duração por `dimensao`.
+
+    Combina as células somando n, soma e soma dos quadrados, o que dá o mesmo
+    resultado de um `groupby(...).mean()/std()` sobre as linhas brutas.
+    """
+    agrupado = cubo.groupby(dimensao, observed=True)
+    somas = agrupado[['n_duracao', 'soma', 'soma_quadrados']].sum()
+    n = somas['n_duracao']
+
+    media = somas['soma'] / n
+    variancia = (somas['soma_quadrados'] - n * media**2) / (n - 1)
+
+    return pd.DataFrame({
+        'n': n,
+        'media': media,
+        'desvio': np.sqrt(variancia.clip(lower=0)),
+        'minimo': agrupado['minimo'].min(),
+        'maximo': agrupado['maximo'].max(),
+    })
+
+
+def media_duracao(cubo: pd.DataFrame, dimensao: str) -> pd.Series:
+    """Duração média por `dimensao` (equivale a `groupby(dimensao)[duração].mean()`)."""
+    return estatisticas_duracao(cubo, dimensao)['media']
+
+
+def caminho_cubo(file_path: str) -> str:
+    """Caminho do cubo pré-computado que acompanha o arquivo processado da unidade."""
+    return file_path.removesuffix('.parquet').removesuffix('.csv') + '_cubo.parquet'
+
+
+def salvar_cubo(cubo: pd.DataFrame, file_path: str) -> None:
+    """Grava o cubo ao lado do arquivo processado da unidade."""
+    cubo.to_parquet(caminho_cubo(file_path), index=False)
+
+
+def carregar_cubo_pre_computado(file_path: str) -> pd.DataFrame | None:
+    """Lê o cubo gravado pelo pipeline, se existir e for mais novo que os dados."""
+    caminho = caminho_cubo(file_path)
+    if not os.path.exists(caminho) or os.path.getmtime(caminho) < os.path.getmtime(file_path):
+        return None
+    return pd.read_parquet(caminho)
@@ -0,0 +1,129 @@
+"""Índice de filtros do dashboard: bitmaps por valor e ordenação por data.
+
+O índice é construído uma vez por dataset. Cada dimensão categórica guarda um bitmap
+compactado (`np.packbits`) por valor; dimensões de intervalo (datas) guardam a
+ordem das linhas pelo valor, consultada com `searchsorted`. Uma seleção combina os
+bitmaps com OR dentro de uma dimensão e AND entre dimensões, operando sobre n/8
+bytes, e só as linhas selecionadas são copiadas do DataFrame.
+
+Novas dimensões (unidade, prefixo do processoID, etc.) entram com `add_dimension`
+e `add_range_dimension`.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DIMENSIONS = ['movement_detail', 'complexity', 'activity_group']
+DEFAULT_RANGE_DIMENSIONS = ['dataInicio']
+
+
+class FilterIndex:
+    """Índice de bitmaps sobre as linhas de um DataFrame."""
+
+    def __init__(self, df, dimensions=None, range_dimensions=None):
+        self.n_rows = len(df)
+        self._n_bytes = (self.n_rows + 7) // 8
+        self._bitmaps = {}
+        self._ranges = {}
+
+        for column in DEFAULT_DIMENSIONS if dimensions is None else dimensions:
+            if column in df.columns:
+                self.add_dimension(column, df[column])
+        for column in DEFAULT_RANGE_DIMENSIONS if range_dimensions is None else range_dimensions:
+            if column in df.columns:
+                self.add_range_dimension(column, df[column])
+
+    def add_dimension(self, name, values):
+        """Indexa uma dimensão categórica (um bitmap por valor distinto, nulos excluídos)."""
+        codes, uniques = pd.factorize(pd.Series(values), sort=False)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+        bitmaps = {}
+        for code, value in enumerate(uniques):
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[order[bounds[code]:bounds[code + 1]]] = True
+            bitmaps[value] = np.packbits(mask)
+        self._bitmaps[name] = bitmaps
+
+    def add_range_dimension(self, name, values):
+        """Indexa uma dimensão ordenável (datas, números) para consultas por intervalo."""
+        values = pd.Series(values).to_numpy()
+        valid = ~pd.isna(values)
+        positions = np.flatnonzero(valid)
+        order = positions[np.argsort(values[valid], kind='stable')]
+        self._ranges[name] = (values[order], order)
+
+    @property
+    def dimensions(self):
+        """Nomes das dimensões categóricas e de intervalo indexadas."""
+        return list(self._bitmaps) + list(self._ranges)
+
+    def values(self, name):
+        """Valores distintos de uma dimensão categórica."""
+        return list(self._bitmaps[name])
+
+    def bitmap(self, selections=None, ranges=None):
+        """Bitmap compactado das linhas que atendem a todas as seleções.
+
+        Args:
+        ----
+            selections (dict): dimensão -> valores aceitos (OR); listas vazias são ignoradas.
+            ranges (dict): dimensão -> (início, fim), inclusivo; None em um lado deixa-o aberto.
+
+        Returns:
+        -------
+            np.ndarray | None: Bitmap (uint8) ou None se nenhuma seleção estiver ativa.
+
+        """
+        result = None
+        for name, accepted in (selections or {}).items():
+            if accepted is None or len(accepted) == 0:
+                continue
+            result = _and(result, self.bitmap_or(name, accepted))
+        for name, (start, end) in (ranges or {}).items():
+            if start is None and end is None:
+                continue
+            result = _and(result, self.bitmap_range(name, start, end))
+        return result
+
+    def bitmap_or(self, name, accepted):
+        """OR dos bitmaps dos valores aceitos em uma dimensão."""
+        bitmaps = self._bitmaps[name]
+        result = np.zeros(self._n_bytes, dtype=np.uint8)
+        for value in accepted:
+            if value in bitmaps:
+                np.bitwise_or(result, bitmaps[value], out=result)
+        return result
+
+    def bitmap_range(self, name, start=None, end=None):
+        """Bitmap das linhas com valor em [start, end] em uma dimensão de intervalo."""
+        sorted_values, order = self._ranges[name]
+        lo = 0 if start is None else np.searchsorted(sorted_values, _like(start, sorted_values), 'left')
+        hi = len(order) if end is None else np.searchsorted(sorted_values, _like(end, sorted_values), 'right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[order[lo:hi]] = True
+        return np.packbits(mask)
+
+    def positions(self, selections=None, ranges=None):
+        """Posições (ordenadas) das linhas selecionadas; None se não houver filtro ativo."""
+        bitmap = self.bitmap(selections, ranges)
+        if bitmap is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows))
+
+    def apply(self, df, selections=None, ranges=None):
+        """Retorna as linhas de `df` selecionadas (o próprio `df` se não houver filtro)."""
+        positions = self.positions(selections, ranges)
+        return df if positions is None else df.take(positions)
+
+
+def _and(current, bitmap):
+    return bitmap if current is None else np.bitwise_and(current, bitmap, out=current)
+
+
+def _like(value, sorted_values):
+    if np.issubdtype(sorted_values.dtype, np.datetime64):
+        # `np.datetime64(Timestamp)` passa por `datetime` e perde os nanossegundos.
+        return pd.Timestamp(value).to_datetime64().astype(sorted_values.dtype)
+    return value
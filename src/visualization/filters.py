@@ -1,7 +1,31 @@
 # Filter Data
-def apply_filters(df, movement_filter, complexity_filter):
+def apply_filters(df, movement_filter, complexity_filter, index=None, activity_filter=None, date_range=None):
+    """Aplica os filtros do dashboard.
+
+    Com `index` (um `FilterIndex` do mesmo `df`), a seleção sai dos bitmaps do índice
+    e só as linhas selecionadas são copiadas; sem ele, usa `isin` coluna a coluna.
+    """
+    if index is not None:
+        return index.apply(
+            df,
+            selections={
+                'movement_detail': movement_filter,
+                'complexity': complexity_filter,
+                'activity_group': activity_filter,
+            },
+            ranges={'dataInicio': date_range} if date_range else None,
+        )
+
     if movement_filter:
         df = df[df['movement_detail'].isin(movement_filter)]
     if complexity_filter:
         df = df[df['complexity'].isin(complexity_filter)]
-    return df
\ No newline at end of file
+    if activity_filter:
+        df = df[df['activity_group'].isin(activity_filter)]
+    if date_range:
+        start, end = date_range
+        if start is not None:
+            df = df[df['dataInicio'] >= start]
+        if end is not None:
+            df = df[df['dataInicio'] <= end]
+    return df
@@ -1,26 +1,76 @@
+import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+from src.visualization.cube import contagens, media_duracao
+from src.visualization.resumo_graficos import (
+    LINHAS_POR_PAGINA,
+    bins_histograma,
+    estatisticas_boxplot,
+    n_paginas,
+    pagina,
+)
+
+# O matplotlib é importado dentro das funções que desenham com ele: custa perto de 1s
+# e atrasaria a partida do dashboard mesmo sem nenhum gráfico. Os gráficos recebem
+# resumos de tamanho limitado (`src.visualization.resumo_graficos`), não as linhas.
 
 
 def plot_histogram(df, column, bins=30):
+    import matplotlib.pyplot as plt
+
+    contagens_bins, bordas = bins_histograma(df[column], bins=bins)
     fig, ax = plt.subplots()
-    ax.hist(df[column].dropna(), bins=bins, color='skyblue', edgecolor='black')
+    ax.bar(bordas[:-1], contagens_bins, width=bordas[1:] - bordas[:-1], align='edge', color='skyblue', edgecolor='black')
     ax.set_xlabel('Duração (segundos)')
     ax.set_ylabel('Frequência')
     ax.set_title(f'Histograma da {column}')
     st.pyplot(fig)
 
 def plot_boxplot(df, x, y):
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
-    sns.boxplot(x=x, y=y, data=df, ax=ax)
+    ax.bxp(estatisticas_boxplot(df, x, y), patch_artist=True, boxprops={'facecolor': 'skyblue'})
     ax.set_xlabel(x)
     ax.set_ylabel(y)
     ax.set_title(f'Box Plot de {y} por {x}')
     st.pyplot(fig)
 
 def plot_bar_chart(df, column):
-    st.bar_chart(df[column].value_counts())
+    counts = df[column].value_counts()
+    # Colunas categóricas (Parquet) listam também as categorias sem ocorrências
+    st.bar_chart(counts[counts > 0])
 
 def plot_line_chart(df, group_by_col, calc_col):
-    st.line_chart(df.groupby(group_by_col)[calc_col].mean())
\ No newline at end of file
+    st.line_chart(df.groupby(group_by_col, observed=True)[calc_col].mean())
+
+def plot_bar_chart_from_cube(cube, column):
+    st.bar_chart(contagens(cube, column))
+
+def plot_line_chart_from_cube(cube, group_by_col):
+    st.line_chart(media_duracao(cube, group_by_col))
+
+def plot_case_metrics(case_analysis, top=10):
+    dias = 86400
+    lead_time = case_analysis.casos['lead_time'] / dias
+    col1, col2, col3 = st.columns(3)
+    col1.metric('Processos', f'{len(lead_time)}')
+    col2.metric('Lead time médio (dias)', f'{lead_time.mean():.1f}')
+    col3.metric('Lead time mediano (dias)', f'{lead_time.median():.1f}')
+
+    st.write(f'### {top} Variantes Mais Frequentes')
+    st.dataframe(case_analysis.variantes.head(top)[['variante_id', 'frequencia', 'proporcao', 'n_atividades', 'sequencia']])
+
+    st.write('### Gargalos: Espera Média por Transição (dias)')
+    gargalos = case_analysis.gargalos.head(top)
+    st.bar_chart(pd.Series(
+        gargalos['espera_media'].to_numpy() / dias,
+        index=gargalos['origem'] + ' -> ' + gargalos['destino'],
+    ))
+
+def show_paginated_table(df, key, page_size=LINHAS_POR_PAGINA):
+    """Mostra `df` uma página por vez: o navegador recebe no máximo `page_size` linhas."""
+    total = n_paginas(df, page_size)
+    numero = st.number_input(
+        f'Página (de {total}, {len(df)} linhas):', min_value=1, max_value=total, value=1, key=key,
+    )
+    st.dataframe(pagina(df, numero, page_size))
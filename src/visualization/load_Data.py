@@ -1,25 +1,154 @@
+import os
+
 import pandas as pd
 import streamlit as st
+from src.data.compartilhado import DATASET_OPTIONS, RegistroDatasets
+from src.data.datas import converter_datas
+from src.data.schema import aplicar_schema
+from src.data.storage import carregar_movimentos
+from src.features.case_analytics import analisar_casos, carregar_analise_casos
+from src.features.sketches import carregar_sketches, construir_sketches
+from src.models.model import construir_dfg, heuristics_net_from_dfg
+from src.pipeline.instrumentacao import medir_etapa
+from src.visualization.cube import carregar_cubo_pre_computado, construir_cubo
+from src.visualization.filter_index import FilterIndex
+
+# Unidades servidas a partir do armazém mapeado em memória (`src.data.compartilhado`),
+# compartilhado por todas as sessões e processos do dashboard.
+REGISTRO_DATASETS = RegistroDatasets(DATASET_OPTIONS)
+
+
+def file_version(file_path):
+    """Versão do arquivo para as chaves de cache (mtime; None se não existir)."""
+    try:
+        return os.path.getmtime(file_path)
+    except OSError:
+        return None
 
 
-BASE_PATH_DATA = '/workspace/data'
-DATASET_OPTIONS = {
-    'Unidade 1': f'{BASE_PATH_DATA}/movimentos_unidade_1_processado.csv',
-    'Unidade 2': f'{BASE_PATH_DATA}/movimentos_unidade_2_processado.csv'
-}
+def load_data(file_path, columns=None, filters=None):
+    """Carrega os dados processados, reaproveitando a carga entre reruns e sessões.
 
+    O DataFrame é compartilhado pelo cache (`st.cache_resource`) e, para arquivos
+    Parquet, lido do armazém mapeado em memória: é somente leitura.
+    """
+    return _load_data_cached(
+        file_path,
+        file_version(file_path),
+        tuple(columns) if columns else None,
+        tuple(filters) if filters else None,
+    )
 
-def load_data(file_path):
-    """Carrega os dados do arquivo CSV."""
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+@medir_etapa('load_data')
+def _load_data_cached(file_path, version, columns, filters):
+    """Carrega os dados processados (Parquet mapeado no armazém, ou CSV exportado).
+
+    `version` só entra na chave do cache, para invalidá-lo quando o arquivo muda.
+    """
     try:
-        df = pd.read_csv(file_path)
-        if 'dataInicio' in df.columns and 'dataFinal' in df.columns:
-            df['dataInicio'] = pd.to_datetime(df['dataInicio'])
-            df['dataFinal'] = pd.to_datetime(df['dataFinal'])
+        columns = list(columns) if columns else None
+        if file_path.endswith('.csv'):
+            df = pd.read_csv(file_path, usecols=columns)
+            # No processo do Streamlit: sem pool de processos para converter as datas.
+            converter_datas(df, workers=1)
         else:
+            filters = list(filters) if filters else None
+            try:
+                # Já publicado no schema compacto; `aplicar_schema` copiaria as colunas.
+                df = REGISTRO_DATASETS.dataframe_do_arquivo(file_path, columns, filters)
+            except OSError:
+                # Armazém indisponível (ex.: sem permissão de escrita): cópia privada.
+                df = aplicar_schema(carregar_movimentos(file_path, colunas=columns, filtros=filters))
+        if 'dataInicio' not in df.columns or 'dataFinal' not in df.columns:
             st.error("O DataFrame deve conter as colunas 'dataInicio' e 'dataFinal'.")
             return None
-        return df
+        return aplicar_schema(df) if file_path.endswith('.csv') else df
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def load_cube(file_path):
+    """Cubo de agregados da unidade: o pré-computado pelo pipeline ou construído uma vez."""
+    return _load_cube_cached(file_path, file_version(file_path))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+@medir_etapa('load_cube')
+def _load_cube_cached(file_path, version):
+    cubo = carregar_cubo_pre_computado(file_path)
+    if cubo is not None:
+        return cubo
+
+    df = load_data(file_path)
+    return None if df is None else construir_cubo(df)
+
+
+def load_filter_index(file_path):
+    """Índice de filtros da unidade, construído uma vez por versão do arquivo."""
+    return _load_filter_index_cached(file_path, file_version(file_path))
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+@medir_etapa('load_filter_index')
+def _load_filter_index_cached(file_path, version):
+    df = load_data(file_path)
+    return None if df is None else FilterIndex(df)
+
+
+def load_dfg(file_path):
+    """Grafo de sucessão direta da unidade, contado uma vez por versão do arquivo."""
+    return _load_dfg_cached(file_path, file_version(file_path))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+@medir_etapa('load_dfg')
+def _load_dfg_cached(file_path, version):
+    df = load_data(file_path)
+    return None if df is None else construir_dfg(df)
+
+
+def load_heuristics_net(file_path):
+    """Heuristics Net da unidade, descoberta uma vez por versão do arquivo a partir do DFG."""
+    return _load_heuristics_net_cached(file_path, file_version(file_path))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+@medir_etapa('load_heuristics_net')
+def _load_heuristics_net_cached(file_path, version):
+    dfg = load_dfg(file_path)
+    return None if dfg is None else heuristics_net_from_dfg(dfg)
+
+
+def load_case_analysis(file_path):
+    """Tabelas por processo (casos, variantes, gargalos): as do pipeline ou calculadas uma vez."""
+    return _load_case_analysis_cached(file_path, file_version(file_path))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+@medir_etapa('load_case_analysis')
+def _load_case_analysis_cached(file_path, version):
+    analise = carregar_analise_casos(file_path)
+    if analise is not None:
+        return analise
+
+    df = load_data(file_path)
+    return None if df is None else analisar_casos(df)
+
+
+def load_sketches(file_path):
+    """Sketches de duração e processos da unidade: os do pipeline ou calculados uma vez."""
+    return _load_sketches_cached(file_path, file_version(file_path))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+@medir_etapa('load_sketches')
+def _load_sketches_cached(file_path, version):
+    sketches = carregar_sketches(file_path)
+    if sketches is not None:
+        return sketches
+
+    df = load_data(file_path)
+    return None if df is None else construir_sketches(df)
@@ -0,0 +1,110 @@
+"""Resumos de tamanho limitado para os gráficos e tabelas do dashboard.
+
+Em vez de entregar milhões de pontos ao matplotlib ou ao navegador, os gráficos
+recebem resumos cujo tamanho não depende do número de linhas:
+
+- histograma: contagens por faixa calculadas com `np.histogram` (`bins` valores);
+- box plot: quartis, bigodes (1,5 x IQR, como no matplotlib/seaborn) e uma amostra
+  limitada dos outliers por grupo, no formato de `Axes.bxp`;
+- tabela: uma página de linhas por vez.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+BINS_PADRAO = 30
+MAX_OUTLIERS = 200
+LINHAS_POR_PAGINA = 500
+WHIS = 1.5
+
+
+def bins_histograma(valores, bins: int = BINS_PADRAO) -> tuple:
+    """Contagens do histograma de `valores` (nulos e infinitos descartados).
+
+    Args:
+    ----
+        valores (pd.Series | np.ndarray): Valores numéricos.
+        bins (int): Número de faixas.
+
+    Returns:
+    -------
+        tuple: (contagens, bordas), como em `np.histogram`; `bordas` tem `bins + 1` valores.
+
+    """
+    valores = np.asarray(pd.to_numeric(pd.Series(valores), errors='coerce'), dtype=float)
+    valores = valores[np.isfinite(valores)]
+    if valores.size == 0:
+        return np.zeros(bins, dtype=np.int64), np.linspace(0.0, 1.0, bins + 1)
+    return np.histogram(valores, bins=bins)
+
+
+def estatisticas_boxplot(df: pd.DataFrame, x: str, y: str, max_outliers: int = MAX_OUTLIERS) -> list:
+    """Estatísticas do box plot de `y` por grupo de `x`, prontas para `Axes.bxp`.
+
+    Os quartis saem de um `groupby().quantile`; cada bigode vai até o valor mais
+    extremo dentro de 1,5 x IQR do quartil. Dos outliers, no máximo `max_outliers`
+    por grupo são mantidos, espaçados uniformemente na ordem dos valores (incluindo
+    sempre o menor e o maior).
+
+    Args:
+    ----
+        df (pd.DataFrame): Dados.
+        x (str): Coluna de agrupamento.
+        y (str): Coluna numérica.
+        max_outliers (int): Limite de outliers devolvidos por grupo.
+
+    Returns:
+    -------
+        list: Um dict por grupo com 'label', 'q1', 'med', 'q3', 'whislo', 'whishi',
+            'mean' e 'fliers'.
+
+    """
+    dados = pd.DataFrame({'grupo': df[x], 'valor': pd.to_numeric(df[y], errors='coerce')}).dropna()
+    if dados.empty:
+        return []
+    grupos = dados.groupby('grupo', observed=True)['valor']
+
+    quartis = grupos.quantile([0.25, 0.5, 0.75]).unstack()
+    quartis.columns = ['q1', 'med', 'q3']
+    iqr = quartis['q3'] - quartis['q1']
+    limite_inferior = (quartis['q1'] - WHIS * iqr).reindex(dados['grupo']).to_numpy()
+    limite_superior = (quartis['q3'] + WHIS * iqr).reindex(dados['grupo']).to_numpy()
+
+    valores = dados['valor'].to_numpy()
+    dentro = (valores >= limite_inferior) & (valores <= limite_superior)
+    bigodes = dados[dentro].groupby('grupo', observed=True)['valor'].agg(['min', 'max'])
+    outliers = dados[~dentro].groupby('grupo', observed=True)['valor']
+    medias = grupos.mean()
+
+    estatisticas = []
+    for grupo, linha in quartis.iterrows():
+        fliers = np.sort(outliers.get_group(grupo).to_numpy()) if grupo in outliers.groups else np.array([])
+        if len(fliers) > max_outliers:
+            fliers = fliers[np.linspace(0, len(fliers) - 1, max_outliers).round().astype(int)]
+        estatisticas.append({
+            'label': str(grupo),
+            'q1': linha['q1'],
+            'med': linha['med'],
+            'q3': linha['q3'],
+            # Sem valores dentro dos limites (só acontece com IQR degenerado), o bigode
+            # fica colado ao quartil.
+            'whislo': bigodes['min'].get(grupo, linha['q1']),
+            'whishi': bigodes['max'].get(grupo, linha['q3']),
+            'mean': medias[grupo],
+            'fliers': fliers,
+        })
+    return estatisticas
+
+
+def n_paginas(df: pd.DataFrame, linhas_por_pagina: int = LINHAS_POR_PAGINA) -> int:
+    """Número de páginas da tabela (ao menos 1)."""
+    return max(1, math.ceil(len(df) / linhas_por_pagina))
+
+
+def pagina(df: pd.DataFrame, numero: int, linhas_por_pagina: int = LINHAS_POR_PAGINA) -> pd.DataFrame:
+    """Linhas da página `numero` (a partir de 1), limitada ao intervalo válido."""
+    numero = min(max(int(numero), 1), n_paginas(df, linhas_por_pagina))
+    inicio = (numero - 1) * linhas_por_pagina
+    return df.iloc[inicio:inicio + linhas_por_pagina]
@@ -1,10 +1,27 @@
 import pandas as pd
 import streamlit as st
 
-# from src.models.model import discover_process_model, visualize_process_model
+from src.features.sketches import combinar_sketches, construir_sketches, processos_distintos, quantis_duracao
+from src.models.model import visualize_process_model
+from src.visualization.cube import construir_cubo, contagens, filtrar_cubo, media_duracao
 from src.visualization.filters import apply_filters
-from src.visualization.graphs import plot_bar_chart, plot_boxplot, plot_histogram, plot_line_chart
-from src.visualization.load_Data import DATASET_OPTIONS, load_data
+from src.visualization.graphs import (
+    plot_bar_chart_from_cube,
+    plot_boxplot,
+    plot_case_metrics,
+    plot_histogram,
+    plot_line_chart_from_cube,
+    show_paginated_table,
+)
+from src.visualization.load_Data import (
+    DATASET_OPTIONS,
+    load_case_analysis,
+    load_cube,
+    load_data,
+    load_heuristics_net,
+    load_filter_index,
+    load_sketches,
+)
 
 def main():
     st.title("Análise de Movimentos Judiciais Especializados")
@@ -12,28 +29,26 @@ def main():
 
     dataset_selection = st.sidebar.selectbox('Selecione o Dataset:', options=list(DATASET_OPTIONS.keys()))
     df = load_data(DATASET_OPTIONS[dataset_selection])
-    if df is None:
+    cube = load_cube(DATASET_OPTIONS[dataset_selection])
+    if df is None or cube is None:
         return
 
     st.write(f'## Visualização dos Dados - {dataset_selection}')
     st.dataframe(df.head())
 
 
-    # FIXME: processo incorreto precisaria de mais tempo para criar
-    # st.write("## Descoberta de Modelos de Processo")
-    # heu_net = discover_process_model(df)
-    # if heu_net is None:
-    #     return
+    st.write("## Descoberta de Modelos de Processo")
+    heu_net = load_heuristics_net(DATASET_OPTIONS[dataset_selection])
 
-    # st.write("Modelo de Processo Descoberto:")
-    # process_model_svg = visualize_process_model(heu_net)
-    # if process_model_svg:
-    #     st.markdown(f'<div style="text-align:center">{process_model_svg}</div>', unsafe_allow_html=True)
+    st.write("Modelo de Processo Descoberto:")
+    process_model_svg = visualize_process_model(heu_net)
+    if process_model_svg:
+        st.markdown(f'<div style="text-align:center">{process_model_svg}</div>', unsafe_allow_html=True)
 
     st.write("## Análise Estatística")
-    plot_bar_chart(df, 'movement_detail')
-    plot_bar_chart(df, 'complexity')
-    plot_line_chart(df, 'movement_detail', 'duration_calculated')
+    plot_bar_chart_from_cube(cube, 'movement_detail')
+    plot_bar_chart_from_cube(cube, 'complexity')
+    plot_line_chart_from_cube(cube, 'movement_detail')
     
     st.write('### Histograma da Duração dos Movimentos')
     plot_histogram(df, 'duration_calculated')
@@ -41,41 +56,91 @@ def main():
     st.write('### Box Plot da Duração dos Movimentos por Complexidade')
     plot_boxplot(df, 'complexity', 'duration_calculated')
 
-    st.write('## Filtros Personalizados')
-    movement_filter = st.sidebar.multiselect('Filtrar por Detalhe de Movimento:', options=df['movement_detail'].unique())
-    complexity_filter = st.sidebar.multiselect('Filtrar por Complexidade:', options=df['complexity'].unique())
+    st.write('## Análise por Processo')
+    case_analysis = load_case_analysis(DATASET_OPTIONS[dataset_selection])
+    if case_analysis is not None:
+        plot_case_metrics(case_analysis)
 
-    df_filtered = apply_filters(df, movement_filter, complexity_filter)
+    st.write('## Filtros Personalizados')
+    movement_filter = st.sidebar.multiselect('Filtrar por Detalhe de Movimento:', options=cube['movement_detail'].unique())
+    complexity_filter = st.sidebar.multiselect('Filtrar por Complexidade:', options=cube['complexity'].unique())
+
+    index = load_filter_index(DATASET_OPTIONS[dataset_selection])
+    activity_filter = st.sidebar.multiselect(
+        'Filtrar por Grupo de Atividade:', options=index.values('activity_group'),
+    ) if 'activity_group' in index.dimensions else []
+    date_range = None
+    if st.sidebar.checkbox('Filtrar por Período'):
+        start, end = df['dataInicio'].min(), df['dataInicio'].max()
+        period = st.sidebar.date_input('Período (Data de Início):', value=(start, end))
+        if len(period) == 2:
+            date_range = (pd.Timestamp(period[0]), pd.Timestamp(period[1]) + pd.Timedelta(days=1, ns=-1))
+
+    df_filtered = apply_filters(
+        df, movement_filter, complexity_filter,
+        index=index, activity_filter=activity_filter, date_range=date_range,
+    )
+    # O cubo só tem as dimensões movement_detail x complexity; outros filtros exigem
+    # reagregar as linhas selecionadas.
+    if activity_filter or date_range:
+        cube_filtered = construir_cubo(df_filtered)
+    else:
+        cube_filtered = filtrar_cubo(cube, movement_filter, complexity_filter)
     
     st.write('## Dados Filtrados')
-    st.dataframe(df_filtered)
+    show_paginated_table(df_filtered, key='pagina_dados_filtrados')
 
     st.write('### Gráficos Filtrados')
-    plot_bar_chart(df_filtered, 'movement_detail')
-    plot_bar_chart(df_filtered, 'complexity')
-    plot_line_chart(df_filtered, 'movement_detail', 'duration_calculated')
+    plot_bar_chart_from_cube(cube_filtered, 'movement_detail')
+    plot_bar_chart_from_cube(cube_filtered, 'complexity')
+    plot_line_chart_from_cube(cube_filtered, 'movement_detail')
 
     if st.sidebar.checkbox('Comparar com Outro Dataset'):
         compare_dataset_selection = st.sidebar.selectbox(
             'Selecione o Dataset para Comparação:', 
             options=[key for key in DATASET_OPTIONS.keys() if key != dataset_selection]
         )
-        df_compare = load_data(DATASET_OPTIONS[compare_dataset_selection])
+        cube_compare = load_cube(DATASET_OPTIONS[compare_dataset_selection])
+        if cube_compare is None:
+            return
 
         st.write(f'## Comparação entre {dataset_selection} e {compare_dataset_selection}')
         st.write('### Distribuição de Movimentos por Tipo (Comparação)')
         combined_counts = pd.concat([
-            df_filtered['movement_detail'].value_counts(),
-            df_compare['movement_detail'].value_counts()
+            contagens(cube_filtered, 'movement_detail'),
+            contagens(cube_compare, 'movement_detail')
         ], axis=1, keys=[dataset_selection, compare_dataset_selection])
         st.bar_chart(combined_counts)
 
         st.write('### Duração Média dos Movimentos por Tipo (Comparação)')
         combined_means = pd.concat([
-            df_filtered.groupby('movement_detail')['duration_calculated'].mean(),
-            df_compare.groupby('movement_detail')['duration_calculated'].mean()
+            media_duracao(cube_filtered, 'movement_detail'),
+            media_duracao(cube_compare, 'movement_detail')
         ], axis=1, keys=[dataset_selection, compare_dataset_selection])
         st.line_chart(combined_means)
 
+        # Medianas e processos distintos saem dos sketches (t-digest e HyperLogLog),
+        # que se combinam entre células e unidades sem reler as linhas.
+        if activity_filter or date_range:
+            sketches_filtered = construir_sketches(df_filtered)
+        else:
+            sketches_filtered = filtrar_cubo(
+                load_sketches(DATASET_OPTIONS[dataset_selection]), movement_filter, complexity_filter,
+            )
+        sketches_compare = load_sketches(DATASET_OPTIONS[compare_dataset_selection])
+
+        st.write('### Duração Mediana dos Movimentos por Tipo (Comparação)')
+        combined_medians = pd.concat([
+            quantis_duracao(sketches_filtered, 'movement_detail', quantis=(0.5,))['p50'],
+            quantis_duracao(sketches_compare, 'movement_detail', quantis=(0.5,))['p50'],
+        ], axis=1, keys=[dataset_selection, compare_dataset_selection])
+        st.line_chart(combined_medians)
+
+        st.write('### Processos Distintos (estimativa)')
+        col1, col2, col3 = st.columns(3)
+        col1.metric(dataset_selection, f'{processos_distintos(sketches_filtered).sum():.0f}')
+        col2.metric(compare_dataset_selection, f'{processos_distintos(sketches_compare).sum():.0f}')
+        col3.metric('Os dois', f'{processos_distintos(combinar_sketches([sketches_filtered, sketches_compare])).sum():.0f}')
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,56 @@
+"""Fixtures dos benchmarks: movimentos sintéticos por tamanho e a medição das etapas.
+
+Os tamanhos vêm de `BENCH_TAMANHOS` (ex.: `BENCH_TAMANHOS=10k,1m`; padrão 10k). Os
+CSVs sintéticos vêm da fábrica `unidade_sintetica` (`tests/conftest.py`) e são gerados
+na primeira vez em `BENCH_DIRETORIO` (padrão: um diretório temporário da sessão), para
+que 1M/10M sejam reaproveitados entre execuções.
+"""
+
+import os
+
+import pytest
+from src.data.sintetico import TAMANHOS
+from src.pipeline.instrumentacao import pico_rss_mb, reiniciar_pico_rss
+
+TAMANHOS_BENCH = os.environ.get('BENCH_TAMANHOS', '10k').split(',')
+RODADAS = 3
+
+
+@pytest.fixture(scope='session', params=TAMANHOS_BENCH)
+def tamanho(request):
+    """Tamanho do dataset sintético (uma chave de `TAMANHOS`)."""
+    if request.param not in TAMANHOS:
+        pytest.fail(f'BENCH_TAMANHOS: {request.param!r} não está em {list(TAMANHOS)}')
+    return request.param
+
+
+@pytest.fixture(scope='session')
+def sintetico(tamanho, unidade_sintetica):
+    """Unidade sintética do tamanho pedido (saídas por etapa em cache; não altere)."""
+    return unidade_sintetica(
+        f'movimentos_sinteticos_{tamanho}', TAMANHOS[tamanho], diretorio=os.environ.get('BENCH_DIRETORIO'),
+    )
+
+
+@pytest.fixture
+def medir(benchmark):
+    """Mede uma função com o `benchmark` e anota linhas e pico de RSS no resultado.
+
+    Uso: `medir(funcao, *args, linhas=len(df), copiar=True)`. Com `copiar`, os
+    argumentos são copiados antes de cada rodada, fora do tempo medido (para etapas
+    que alteram o DataFrame recebido).
+    """
+
+    def executar(funcao, *args, linhas=None, copiar=False, rodadas=RODADAS):
+        reiniciar_pico_rss()
+        if copiar:
+            resultado = benchmark.pedantic(
+                funcao, setup=lambda: (tuple(arg.copy() for arg in args), {}), rounds=rodadas,
+            )
+        else:
+            resultado = benchmark.pedantic(funcao, args=args, rounds=rodadas)
+        benchmark.extra_info['linhas'] = linhas
+        benchmark.extra_info['pico_rss_mb'] = pico_rss_mb()
+        return resultado
+
+    return executar
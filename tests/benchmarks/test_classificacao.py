@@ -0,0 +1,32 @@
+"""Classificação de `movement_detail`: linha a linha x vetorizada x por códigos."""
+
+import pandas as pd
+import pytest
+from src.features.build_features import (
+    classificar_movement_detail,
+    classificar_movement_detail_por_codigos,
+    classificar_movement_detail_vetorizado,
+)
+
+
+def linha_a_linha(df, tpu_cnj):
+    return df.apply(lambda row: classificar_movement_detail(row, tpu_cnj), axis=1)
+
+
+CAMINHOS = {
+    'linha_a_linha': linha_a_linha,
+    'vetorizado': classificar_movement_detail_vetorizado,
+    'por_codigos': classificar_movement_detail_por_codigos,
+}
+
+
+@pytest.fixture(scope='session')
+def referencia(sintetico, tpu_cnj):
+    return linha_a_linha(sintetico.pre_processado, tpu_cnj)
+
+
+@pytest.mark.parametrize('caminho', list(CAMINHOS))
+def test_classificacao(medir, caminho, sintetico, tpu_cnj, referencia):
+    rodadas = 1 if caminho == 'linha_a_linha' else 3
+    obtido = medir(CAMINHOS[caminho], sintetico.pre_processado, tpu_cnj, linhas=len(sintetico.pre_processado), rodadas=rodadas)
+    pd.testing.assert_series_equal(obtido.astype(object), referencia, check_names=False)
@@ -0,0 +1,47 @@
+"""Descoberta de processos: Heuristics Miner do pm4py x DFG vetorizado.
+
+A rede obtida do DFG vetorizado deve ter a mesma matriz de dependência e as mesmas
+conexões da rede descoberta pelo pm4py sobre o DataFrame.
+"""
+
+import pytest
+from src.models.model import construir_dfg, heuristics_net_from_dfg
+
+classic = pytest.importorskip('pm4py.algo.discovery.heuristics.variants.classic')
+
+
+def conexoes(heu_net):
+    """Arestas da rede (origem, destino) após os limiares do Heuristics Miner."""
+    return sorted(
+        (nome, saida.node_name)
+        for nome, no in heu_net.nodes.items()
+        for saida in no.output_connections
+    )
+
+
+@pytest.fixture(scope='session')
+def log_pm4py(sintetico):
+    log = sintetico.processado.rename(columns={
+        'processoID': 'case:concept:name',
+        'activity': 'concept:name',
+        'dataInicio': 'time:timestamp',
+    })
+    log['concept:name'] = log['concept:name'].astype(str)
+    return log
+
+
+@pytest.fixture(scope='session')
+def rede_pm4py(log_pm4py):
+    return classic.apply_heu_pandas(log_pm4py)
+
+
+def test_pm4py(medir, log_pm4py):
+    medir(classic.apply_heu_pandas, log_pm4py, linhas=len(log_pm4py), rodadas=1)
+
+
+def test_dfg_vetorizado(medir, sintetico, rede_pm4py):
+    obtido = medir(
+        lambda df: heuristics_net_from_dfg(construir_dfg(df)), sintetico.processado, linhas=len(sintetico.processado),
+    )
+    assert obtido.dependency_matrix == rede_pm4py.dependency_matrix
+    assert conexoes(obtido) == conexoes(rede_pm4py)
@@ -0,0 +1,30 @@
+"""Etapas do pipeline sobre os dados sintéticos: pré-processamento, features, engines e casos."""
+
+import pytest
+from src.data.make_dataset import load_and_preprocess_data
+from src.features.build_features import especializar_movimentos
+from src.features.case_analytics import analisar_casos
+from src.pipeline.engines import ENGINES, executar_pipeline
+
+
+def test_pre_processamento(medir, sintetico):
+    df = medir(load_and_preprocess_data, sintetico.csv, linhas=len(sintetico.pre_processado))
+    assert len(df) == len(sintetico.pre_processado)
+
+
+def test_features(medir, sintetico, tpu_cnj):
+    df = medir(
+        lambda pre: especializar_movimentos(pre, tpu_cnj), sintetico.pre_processado, linhas=len(sintetico.pre_processado), copiar=True,
+    )
+    assert df['movement_detail'].notna().all()
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_pipeline(medir, engine, sintetico, tpu_cnj):
+    df = medir(executar_pipeline, sintetico.csv, engine, tpu_cnj, linhas=len(sintetico.processado))
+    assert len(df) == len(sintetico.processado)
+
+
+def test_analise_casos(medir, sintetico):
+    analise = medir(analisar_casos, sintetico.pre_processado, linhas=len(sintetico.pre_processado))
+    assert analise.casos['n_movimentos'].sum() == len(sintetico.pre_processado)
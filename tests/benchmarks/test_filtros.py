@@ -0,0 +1,39 @@
+"""Filtros do dashboard: `isin` coluna a coluna x índice de bitmaps."""
+
+import pandas as pd
+import pytest
+from src.visualization.filter_index import FilterIndex
+from src.visualization.filters import apply_filters
+
+CENARIOS = ['movimento', 'movimento+complexidade', 'movimento+período']
+
+
+@pytest.fixture(scope='session')
+def indice(sintetico):
+    return FilterIndex(sintetico.processado)
+
+
+def filtros(df, cenario):
+    movimentos = df['movement_detail'].value_counts().index[:3].tolist()
+    complexidades = df['complexity'].value_counts().index[:1].tolist()
+    inicio, fim = df['dataInicio'].quantile([0.25, 0.75])
+    return {
+        'movimento': dict(movement_filter=movimentos, complexity_filter=[]),
+        'movimento+complexidade': dict(movement_filter=movimentos, complexity_filter=complexidades),
+        'movimento+período': dict(movement_filter=movimentos, complexity_filter=[], date_range=(inicio, fim)),
+    }[cenario]
+
+
+def test_construcao_indice(medir, sintetico):
+    medir(FilterIndex, sintetico.processado, linhas=len(sintetico.processado))
+
+
+@pytest.mark.parametrize('cenario', CENARIOS)
+@pytest.mark.parametrize('com_indice', [False, True], ids=['isin', 'indice'])
+def test_filtro(medir, cenario, com_indice, sintetico, indice):
+    df = sintetico.processado
+    selecao = filtros(df, cenario)
+    index = indice if com_indice else None
+
+    obtido = medir(lambda: apply_filters(df, index=index, **selecao), linhas=len(df))
+    pd.testing.assert_frame_equal(obtido, apply_filters(df, **selecao))
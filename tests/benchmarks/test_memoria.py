@@ -0,0 +1,16 @@
+"""Memória do DataFrame de movimentos antes e depois do schema compacto."""
+
+import pandas as pd
+from src.data.schema import aplicar_schema, relatorio_memoria
+
+
+def test_aplicar_schema(medir, benchmark, sintetico):
+    antes = sintetico.processado.copy()
+    for coluna in antes.columns:
+        if isinstance(antes[coluna].dtype, pd.CategoricalDtype):
+            antes[coluna] = antes[coluna].astype(object)
+
+    depois = medir(aplicar_schema, antes, linhas=len(antes), copiar=True)
+    relatorio = relatorio_memoria(antes, depois)
+    benchmark.extra_info.update(relatorio.loc['TOTAL', ['mib_antes', 'mib_depois', 'reducao']].to_dict())
+    assert relatorio.loc['TOTAL', 'mib_depois'] < relatorio.loc['TOTAL', 'mib_antes']
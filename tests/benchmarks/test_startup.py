@@ -0,0 +1,86 @@
+"""Partida: tempo de importação dos pontos de entrada e até a primeira renderização.
+
+Cada rodada roda em um interpretador novo (importações a frio, sem cache de módulos):
+
+- importação: `import <módulo>` dos pontos de entrada do pipeline e do dashboard; as
+  dependências pesadas (matplotlib, seaborn, pm4py, graphviz) que cada um carregou
+  ficam em `extra_info`;
+- primeira renderização: do início do processo até o dashboard emitir o primeiro
+  elemento (`st.title`), executando `visualize.main()` (requer o Streamlit).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+MODULOS = [
+    'src.pipeline.batch',
+    'src.features.build_features',
+    'src.models.model',
+    'src.visualization.graphs',
+    'src.visualization.load_Data',
+    'src.visualization.visualize',
+]
+MODULOS_COM_STREAMLIT = {'src.visualization.graphs', 'src.visualization.load_Data', 'src.visualization.visualize'}
+DEPENDENCIAS_PESADAS = ['matplotlib', 'seaborn', 'pm4py', 'graphviz']
+RODADAS = 3
+
+_CODIGO_IMPORTACAO = """
+import json, sys
+import {modulo}
+print(json.dumps([nome for nome in {pesadas!r} if nome in sys.modules]))
+"""
+
+# O primeiro `st.title` interrompe a execução: mede só o caminho até o primeiro elemento.
+_CODIGO_RENDERIZACAO = """
+import streamlit as st
+
+class PrimeiroElemento(Exception):
+    pass
+
+def title(*args, **kwargs):
+    raise PrimeiroElemento
+
+st.title = title
+from src.visualization import visualize
+try:
+    visualize.main()
+except PrimeiroElemento:
+    pass
+"""
+
+
+def executar(codigo: str) -> str:
+    """Roda `codigo` em um interpretador novo e devolve a última linha da saída.
+
+    Args:
+    ----
+        codigo (str): Programa Python.
+
+    Returns:
+    -------
+        str: A última linha impressa ('' se nada for impresso).
+
+    """
+    processo = subprocess.run(
+        [sys.executable, '-c', codigo],
+        capture_output=True, text=True, check=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+    )
+    linhas = processo.stdout.strip().splitlines()
+    return linhas[-1] if linhas else ''
+
+
+@pytest.mark.parametrize('modulo', MODULOS)
+def test_importacao(benchmark, modulo):
+    if modulo in MODULOS_COM_STREAMLIT:
+        pytest.importorskip('streamlit')
+    codigo = _CODIGO_IMPORTACAO.format(modulo=modulo, pesadas=DEPENDENCIAS_PESADAS)
+    benchmark.extra_info['pesadas'] = json.loads(benchmark.pedantic(executar, args=(codigo,), rounds=RODADAS))
+
+
+def test_primeira_renderizacao(benchmark):
+    pytest.importorskip('streamlit')
+    benchmark.pedantic(executar, args=(_CODIGO_RENDERIZACAO,), rounds=RODADAS)
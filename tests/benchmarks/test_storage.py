@@ -0,0 +1,40 @@
+"""Carga da saída processada: CSV (caminho antigo do dashboard) x Parquet x Parquet com projeção."""
+
+import os
+
+import pandas as pd
+import pytest
+from src.data.storage import caminho_csv, carregar_movimentos, salvar_movimentos
+
+COLUNAS_PROJECAO = ['movement_detail', 'complexity', 'duration_calculated']
+
+
+def carregar_csv(file_path):
+    """Carga equivalente à versão CSV do `load_data` do dashboard."""
+    df = pd.read_csv(file_path)
+    df['dataInicio'] = pd.to_datetime(df['dataInicio'])
+    df['dataFinal'] = pd.to_datetime(df['dataFinal'])
+    return df
+
+
+@pytest.fixture(scope='session')
+def arquivos(sintetico, tmp_path_factory):
+    diretorio = tmp_path_factory.mktemp('storage')
+    caminho = str(diretorio / 'movimentos.parquet')
+    salvar_movimentos(sintetico.processado, caminho, exportar_csv=True)
+    return {'csv': caminho_csv(caminho), 'parquet': caminho}
+
+
+@pytest.mark.parametrize(
+    ('formato', 'carregar'),
+    [
+        ('csv', carregar_csv),
+        ('parquet', carregar_movimentos),
+        ('parquet', lambda caminho: carregar_movimentos(caminho, colunas=COLUNAS_PROJECAO)),
+    ],
+    ids=['csv', 'parquet', 'parquet_projecao'],
+)
+def test_carga(medir, benchmark, formato, carregar, arquivos, sintetico):
+    df = medir(carregar, arquivos[formato], linhas=len(sintetico.processado))
+    benchmark.extra_info['mib_em_disco'] = os.path.getsize(arquivos[formato]) / 2**20
+    assert len(df) == len(sintetico.processado)
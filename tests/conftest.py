@@ -0,0 +1,96 @@
+"""Fixtures compartilhadas: unidades sintéticas e suas saídas por etapa.
+
+Os testes e os benchmarks (`tests/benchmarks`) usam a mesma fábrica,
+`unidade_sintetica`; os testes, uma unidade pequena e fixa (`LINHAS_UNIDADE`).
+Tudo depende da árvore TPU do projeto: sem ela, os testes que a usam (pela
+fixture `tpu_cnj`) são pulados.
+"""
+
+import functools
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+import pytest
+from src.data.make_dataset import get_cnj_grouping, load_and_preprocess_data
+from src.data.sintetico import gerar_movimentos
+from src.data.tpu_index import CAMINHO_TPU
+from src.features.build_features import especializar_movimentos
+
+LINHAS_UNIDADE = 5_000
+
+
+@dataclass
+class UnidadeSintetica:
+    """CSV bruto de uma unidade sintética e, sob demanda, suas saídas por etapa.
+
+    As saídas ficam em cache: não as altere (use `.copy()`).
+    """
+
+    csv: str
+    tpu_cnj: dict
+
+    @functools.cached_property
+    def pre_processado(self) -> pd.DataFrame:
+        """Saída do pré-processamento."""
+        return load_and_preprocess_data(self.csv)
+
+    @functools.cached_property
+    def processado(self) -> pd.DataFrame:
+        """Saída da especialização."""
+        return especializar_movimentos(self.pre_processado.copy(), self.tpu_cnj)
+
+
+@pytest.fixture(scope='session')
+def tpu_cnj():
+    """Agrupamento CNJ da árvore TPU (os testes dependem do arquivo do projeto)."""
+    if not os.path.exists(CAMINHO_TPU):
+        pytest.skip(f'árvore TPU ausente: {CAMINHO_TPU}')
+    return get_cnj_grouping()
+
+
+@pytest.fixture(scope='session')
+def unidade_sintetica(tmp_path_factory, tpu_cnj):
+    """Fábrica de unidades sintéticas, uma por (nome, linhas, semente, diretório) na sessão.
+
+    `unidade_sintetica(nome, linhas, semente=0, diretorio=None)` gera (se ainda não
+    existir) `<diretorio>/<nome>.csv`; sem `diretorio`, usa um temporário da sessão.
+    """
+    unidades = {}
+
+    def criar(nome, linhas, semente=0, diretorio=None):
+        chave = (nome, linhas, semente, diretorio)
+        if chave not in unidades:
+            diretorio = diretorio or str(tmp_path_factory.mktemp('unidade'))
+            caminho = os.path.join(diretorio, f'{nome}.csv')
+            if not os.path.exists(caminho):
+                os.makedirs(diretorio, exist_ok=True)
+                gerar_movimentos(caminho, linhas, semente=semente)
+            unidades[chave] = UnidadeSintetica(caminho, tpu_cnj)
+        return unidades[chave]
+
+    return criar
+
+
+@pytest.fixture(scope='session')
+def unidade(unidade_sintetica):
+    """A unidade sintética pequena dos testes."""
+    return unidade_sintetica('movimentos_unidade_1', LINHAS_UNIDADE, semente=1)
+
+
+@pytest.fixture(scope='session')
+def unidade_csv(unidade):
+    """CSV bruto da unidade sintética (mesma semente, mesmo arquivo)."""
+    return unidade.csv
+
+
+@pytest.fixture(scope='session')
+def pre_processado(unidade):
+    """Saída do pré-processamento da unidade sintética (não altere; use `.copy()`)."""
+    return unidade.pre_processado
+
+
+@pytest.fixture(scope='session')
+def processado(unidade):
+    """Saída da especialização da unidade sintética (não altere; use `.copy()`)."""
+    return unidade.processado
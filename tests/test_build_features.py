@@ -0,0 +1,27 @@
+import pandas as pd
+from src.features.build_features import especializar_movimentos
+
+
+def test_classificacao_vetorizada_igual_a_linha_a_linha(pre_processado, tpu_cnj):
+    referencia = especializar_movimentos(pre_processado.copy(), tpu_cnj, vetorizado=False)
+    vetorizado = especializar_movimentos(pre_processado.copy(), tpu_cnj, por_codigos=False)
+    por_codigos = especializar_movimentos(pre_processado.copy(), tpu_cnj)
+
+    pd.testing.assert_frame_equal(vetorizado, referencia)
+    pd.testing.assert_frame_equal(por_codigos, referencia)
+
+
+def test_classificacao_preserva_ordem_das_regras(tpu_cnj):
+    df = pd.DataFrame({
+        'movimentoID': [85, 85, 85, 85],
+        'documento': ['Despacho e Sentença', 'N/A', 'N/A', None],
+        'complemento': ['urgente', 'com PRAZO e intimação', 'N/A', None],
+        'activity': ['Distribuição', 'Audiência', 'Expedição de documento', 'Outra'],
+        'activity_group': ['Decisão', 'Decisão', 'Decisão', 'Decisão'],
+    })
+    referencia = especializar_movimentos(df.copy(), tpu_cnj, vetorizado=False)
+    por_codigos = especializar_movimentos(df.copy(), tpu_cnj)
+
+    pd.testing.assert_frame_equal(por_codigos, referencia)
+    detalhes = referencia['movement_detail'].astype(str).str.split(': ').str[1].tolist()
+    assert detalhes == ['Sentença', 'Com Prazo', 'Expedição de Documento', 'Padrão']
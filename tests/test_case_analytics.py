@@ -0,0 +1,19 @@
+import pandas as pd
+from src.features.case_analytics import TABELAS, analisar_casos
+
+
+def test_analise_de_selecao_vazia(pre_processado):
+    completa = analisar_casos(pre_processado)
+    vazia = analisar_casos(pre_processado.iloc[:0])
+
+    for tabela in TABELAS:
+        assert getattr(vazia, tabela).empty
+        pd.testing.assert_series_equal(getattr(vazia, tabela).dtypes, getattr(completa, tabela).dtypes)
+
+
+def test_casos_somam_os_movimentos(pre_processado):
+    analise = analisar_casos(pre_processado)
+
+    assert analise.casos['n_movimentos'].sum() == len(pre_processado)
+    assert analise.casos['processoID'].is_unique
+    assert analise.variantes['frequencia'].sum() == len(analise.casos)
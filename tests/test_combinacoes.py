@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from src.features.combinacoes import codigos_combinados
+
+
+def combinacoes_por_tupla(colunas):
+    """Referência: numera as tuplas de valores na ordem da primeira ocorrência."""
+    numeros = {}
+    codigos = [numeros.setdefault(tupla, len(numeros)) for tupla in zip(*colunas)]
+    return np.array(codigos), list(numeros)
+
+
+def test_codigos_iguais_aos_das_tuplas():
+    rng = np.random.default_rng(0)
+    colunas = [
+        pd.Series(rng.choice(['a', 'b', None], 1_000)),
+        pd.Series(rng.integers(0, 5, 1_000)),
+        pd.Categorical(rng.choice(['x', 'y'], 1_000)),
+    ]
+    codigos, valores = codigos_combinados(colunas)
+    esperado, tuplas = combinacoes_por_tupla(colunas)
+
+    np.testing.assert_array_equal(codigos, esperado)
+    pd.testing.assert_frame_equal(pd.DataFrame(list(zip(*valores))), pd.DataFrame(tuplas))
+
+
+def test_cardinalidades_acima_de_int64():
+    # 6 colunas com ~2.000 valores cada: o produto (~6e19) não cabe em int64.
+    rng = np.random.default_rng(1)
+    colunas = [pd.Series(rng.integers(0, 2_000, 5_000)) for _ in range(6)]
+    colunas.append(colunas[0].copy())
+    codigos, valores = codigos_combinados(colunas)
+    esperado, tuplas = combinacoes_por_tupla(colunas)
+
+    np.testing.assert_array_equal(codigos, esperado)
+    pd.testing.assert_frame_equal(pd.DataFrame(list(zip(*valores))), pd.DataFrame(tuplas))
@@ -0,0 +1,31 @@
+import os
+
+from src.data.compartilhado import RegistroDatasets, caminho_mapeado
+from src.data.storage import salvar_movimentos
+
+
+def test_origens_com_o_mesmo_nome_nao_colidem(processado, tmp_path):
+    origens = []
+    for unidade, linhas in (('a', 100), ('b', 200)):
+        os.makedirs(tmp_path / unidade)
+        origem = str(tmp_path / unidade / 'movimentos_unidade_1_processado.parquet')
+        salvar_movimentos(processado.iloc[:linhas], origem)
+        origens.append(origem)
+    armazem = str(tmp_path / 'armazem')
+    registro = RegistroDatasets({'a': origens[0], 'b': origens[1]}, armazem)
+
+    assert caminho_mapeado(origens[0], armazem) != caminho_mapeado(origens[1], armazem)
+    assert len(registro.dataframe('a')) == 100
+    assert len(registro.dataframe('b')) == 200
+
+
+def test_nova_versao_da_origem_substitui_a_publicada(processado, tmp_path):
+    origem = str(tmp_path / 'movimentos_unidade_1_processado.parquet')
+    armazem = str(tmp_path / 'armazem')
+    salvar_movimentos(processado.iloc[:100], origem)
+    registro = RegistroDatasets({'u': origem}, armazem)
+    assert len(registro.dataframe('u')) == 100
+
+    salvar_movimentos(processado.iloc[:300], origem)
+    assert len(registro.dataframe('u')) == 300
+    assert os.listdir(armazem) == [os.path.basename(caminho_mapeado(origem, armazem))]
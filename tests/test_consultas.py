@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import pytest
+from src.api.consultas import ServicoConsultas
+from src.api.servidor import iniciar
+from src.data.storage import salvar_movimentos
+
+
+@pytest.fixture
+def servico(processado, tmp_path):
+    caminho = str(tmp_path / 'movimentos_unidade_1_processado.parquet')
+    salvar_movimentos(processado, caminho)
+    return ServicoConsultas({'Unidade 1': caminho}, diretorio=str(tmp_path / 'armazem'))
+
+
+def test_duracao_de_selecao_vazia(servico):
+    completa = servico.duracao('Unidade 1', 'complexity')
+    pelas_linhas = servico.duracao('Unidade 1', 'complexity', inicio='2030-01-01')
+    pelo_cubo = servico.duracao('Unidade 1', 'complexity', filtros={'movement_detail': ['Inexistente']})
+
+    for vazia in (pelas_linhas, pelo_cubo):
+        assert vazia.empty
+        assert list(vazia.columns) == list(completa.columns)
+
+
+async def _get(porta, alvo):
+    reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+    writer.write(f'GET {alvo} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    await writer.drain()
+    resposta = await reader.read()
+    writer.close()
+    cabecalho, corpo = resposta.split(b'\r\n\r\n', 1)
+    return int(cabecalho.split()[1]), json.loads(corpo)
+
+
+def test_servidor_responde_com_e_sem_cache(servico):
+    alvo = '/contagens?dataset=Unidade%201&dimensao=complexity'
+
+    async def consultar():
+        servidor = await iniciar(servico, porta=0)
+        porta = servidor.sockets[0].getsockname()[1]
+        async with servidor:
+            respostas = []
+            for _ in range(2):
+                respostas.append(await _get(porta, alvo))
+                respostas.append(await _get(porta, '/cache'))
+            return respostas
+
+    (status, primeira), (_, cache_1), (_, segunda), (_, cache_2) = asyncio.run(consultar())
+
+    assert status == 200
+    esperado = servico.contagens('Unidade 1', 'complexity')
+    assert {registro['complexity']: registro['contagem'] for registro in primeira} == esperado.to_dict()
+    assert segunda == primeira
+    # A primeira consulta é calculada (faltas); a segunda sai inteira do cache.
+    assert cache_1['faltas'] > 0
+    assert cache_1['acertos'] == 0
+    assert cache_2['faltas'] == cache_1['faltas']
+    assert cache_2['acertos'] == 1
@@ -0,0 +1,20 @@
+from src.visualization.cube import construir_cubo, contagens, estatisticas_duracao, filtrar_cubo
+
+
+def test_cubo_de_selecao_vazia_tem_as_colunas_do_cubo(processado):
+    cubo = construir_cubo(processado)
+    vazio = construir_cubo(processado.iloc[:0])
+
+    assert vazio.empty
+    assert list(vazio.columns) == list(cubo.columns)
+    assert contagens(vazio, 'complexity').empty
+    assert estatisticas_duracao(vazio, 'movement_detail').empty
+
+
+def test_cubo_filtrado_soma_as_contagens(processado):
+    cubo = construir_cubo(processado)
+    complexidade = processado['complexity'].iloc[0]
+
+    recorte = filtrar_cubo(cubo, complexity_filter=[complexidade])
+    esperado = processado['complexity'].eq(complexidade).sum()
+    assert contagens(recorte, 'complexity').sum() == esperado
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.datas import (
+    FUSOS_MISTURADOS,
+    FalhaConversaoDatas,
+    converter_coluna,
+    converter_datas,
+    detectar_formato,
+)
+
+
+@pytest.mark.parametrize(('valores', 'formato'), [
+    (['2023-01-05 10:30:00', '2023-02-15 08:00:00'], '%Y-%m-%d %H:%M:%S'),
+    (['2023-01-05T10:30:00.250', '2023-02-15T08:00:00.000'], '%Y-%m-%dT%H:%M:%S.%f'),
+    (['2023-01-05', None, '2023-02-15'], '%Y-%m-%d'),
+    # O primeiro valor é ambíguo; o 25 só cabe como dia.
+    (['05/01/2023 10:30', '25/01/2023 08:00'], '%d/%m/%Y %H:%M'),
+    (['2023-01-05T10:30:00-03:00', '2023-02-15T08:00:00-03:00'], '%Y-%m-%dT%H:%M:%S%z'),
+])
+def test_detectar_formato(valores, formato):
+    assert detectar_formato(np.array(valores, dtype=object)) == formato
+
+
+def test_detectar_formato_sem_valores():
+    assert detectar_formato(np.array([None, np.nan], dtype=object)) is None
+
+
+@pytest.mark.parametrize('valores', [
+    ['2023-01-05 10:30:00', None, '2023-01-05 10:30:00', '2023-03-01 00:00:00'],
+    ['05/01/2023 10:30', '25/01/2023 08:00', '05/01/2023 10:30', None],
+    ['2023-01-05T10:30:00-03:00', None, '2023-02-15T08:00:00-03:00'],
+])
+def test_converter_coluna_igual_ao_to_datetime(valores):
+    serie = pd.Series(valores, name='dataInicio')
+    formato = detectar_formato(serie.to_numpy(dtype=object))
+
+    datas, relatorio = converter_coluna(serie)
+
+    pd.testing.assert_series_equal(datas, pd.to_datetime(serie, format=formato))
+    assert relatorio.nulos == 1
+    assert relatorio.falhas == 0
+
+
+def test_fusos_misturados_saem_em_utc():
+    serie = pd.Series(['2023-01-05T10:30:00-03:00', '2023-01-05T10:30:00+00:00'])
+
+    datas, relatorio = converter_coluna(serie)
+
+    assert relatorio.fuso == FUSOS_MISTURADOS
+    assert datas.tolist() == [pd.Timestamp('2023-01-05 13:30'), pd.Timestamp('2023-01-05 10:30')]
+
+
+def test_falhas_sao_avisadas():
+    df = pd.DataFrame({
+        'dataInicio': ['2023-01-05 10:30:00', 'ontem', '2023-01-06 09:00:00', 'ontem', None],
+        'dataFinal': ['2023-01-05 11:00:00'] * 5,
+    })
+
+    with pytest.warns(FalhaConversaoDatas, match=r"dataInicio: 2 de 5 valores.*\['ontem'\]"):
+        relatorios = converter_datas(df, workers=1)
+
+    assert relatorios['dataInicio'].falhas == 2
+    assert relatorios['dataInicio'].nulos == 1
+    assert relatorios['dataFinal'].falhas == 0
+    assert df['dataInicio'].isna().sum() == 3
+    assert pd.api.types.is_datetime64_dtype(df['dataFinal'])
@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+from src.pipeline.engines import ENGINES, comparar_engines, executar_pipeline, normalizar_resultado
+
+
+def test_engines_produzem_o_mesmo_resultado(unidade_csv, processado, tpu_cnj):
+    pandas = normalizar_resultado(executar_pipeline(unidade_csv, 'pandas', tpu_cnj))
+    polars = normalizar_resultado(executar_pipeline(unidade_csv, 'polars', tpu_cnj))
+
+    pd.testing.assert_frame_equal(pandas, normalizar_resultado(processado))
+    pd.testing.assert_frame_equal(polars, pandas, check_dtype=False)
+
+
+@pytest.mark.usefixtures('tpu_cnj')  # comparar_engines lê a árvore TPU do projeto
+def test_comparar_engines(unidade_csv):
+    # Levanta AssertionError se as engines divergirem.
+    tempos = comparar_engines(unidade_csv)
+
+    assert set(tempos) == set(ENGINES)
+    assert all(segundos > 0 for segundos in tempos.values())
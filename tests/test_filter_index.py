@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.visualization.filter_index import FilterIndex
+from src.visualization.filters import apply_filters
+
+
+@pytest.fixture(scope='module')
+def indice(processado):
+    return FilterIndex(processado)
+
+
+def _selecoes(df):
+    movimentos = df['movement_detail'].value_counts().index[:3].tolist()
+    complexidade = df['complexity'].value_counts().index[:1].tolist()
+    grupo = df['activity_group'].value_counts().index[:2].tolist()
+    inicio, fim = df['dataInicio'].quantile([0.25, 0.75])
+    return [
+        dict(movement_filter=movimentos, complexity_filter=[]),
+        dict(movement_filter=movimentos, complexity_filter=complexidade),
+        dict(movement_filter=[], complexity_filter=complexidade, activity_filter=grupo),
+        dict(movement_filter=movimentos, complexity_filter=[], date_range=(inicio, fim)),
+        dict(movement_filter=[], complexity_filter=[], date_range=(None, inicio)),
+        dict(movement_filter=[], complexity_filter=[], date_range=(fim, None)),
+        dict(movement_filter=['valor inexistente'], complexity_filter=[]),
+    ]
+
+
+def test_indice_igual_ao_isin(processado, indice):
+    for selecao in _selecoes(processado):
+        pd.testing.assert_frame_equal(
+            apply_filters(processado, index=indice, **selecao), apply_filters(processado, **selecao),
+        )
+
+
+def test_sem_filtro_devolve_o_proprio_frame(processado, indice):
+    assert apply_filters(processado, [], [], index=indice) is processado
+
+
+def test_nulos_ficam_fora_dos_bitmaps_e_dos_intervalos():
+    df = pd.DataFrame({
+        'complexity': ['Simples', None, 'Alta', 'Simples'],
+        'dataInicio': pd.to_datetime(['2023-01-01', '2023-01-02', None, '2023-01-04']),
+    })
+    indice = FilterIndex(df)
+
+    assert indice.values('complexity') == ['Simples', 'Alta']
+    assert indice.positions({'complexity': ['Simples', 'Alta']}).tolist() == [0, 2, 3]
+    assert indice.positions(ranges={'dataInicio': (None, '2023-01-03')}).tolist() == [0, 1]
+
+
+def test_dimensao_extra_compoe_por_and(processado):
+    indice = FilterIndex(processado)
+    prefixo = processado['processoID'].astype(str).str[:1]
+    indice.add_dimension('prefixo_processo', prefixo)
+    complexidade = processado['complexity'].value_counts().index[0]
+
+    obtido = indice.positions({'prefixo_processo': ['1', '2'], 'complexity': [complexidade]})
+
+    esperado = np.flatnonzero(prefixo.isin(['1', '2']).to_numpy() & (processado['complexity'] == complexidade).to_numpy())
+    np.testing.assert_array_equal(obtido, esperado)
+    assert 'prefixo_processo' in indice.dimensions
+
+
+def test_limites_do_intervalo_em_nanossegundos():
+    datas = pd.Series(pd.to_datetime(['2023-01-01 00:00:00.000000700', '2023-01-01 00:00:00.000000900']))
+    indice = FilterIndex(pd.DataFrame({'dataInicio': datas}))
+
+    fim = pd.Timestamp('2023-01-01 00:00:00.000000800')
+    assert indice.positions(ranges={'dataInicio': (None, fim)}).tolist() == [0]
+    assert indice.positions(ranges={'dataInicio': (fim, None)}).tolist() == [1]
@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+import pytest
+from src.data.storage import carregar_movimentos
+from src.features.case_analytics import TABELAS, carregar_analise_casos
+from src.pipeline import incremental
+from src.pipeline.incremental import atualizar_unidade
+from src.visualization.cube import DIMENSOES, carregar_cubo_pre_computado
+
+
+def _escrever_linhas(caminho, linhas):
+    with open(caminho, 'w') as file:
+        file.writelines(linhas)
+
+
+def test_interrupcao_ao_gravar_estado_so_reprocessa(unidade_csv, tpu_cnj, tmp_path, monkeypatch):
+    with open(unidade_csv) as file:
+        linhas = file.readlines()
+    metade = len(linhas) // 2
+
+    referencia = tmp_path / 'referencia'
+    referencia.mkdir()
+    _escrever_linhas(referencia / 'unidade.csv', linhas)
+    atualizar_unidade(str(referencia / 'unidade.csv'), str(referencia / 'saida.parquet'), tpu_cnj)
+    esperado = carregar_movimentos(str(referencia / 'saida.parquet'))
+
+    csv, saida = str(tmp_path / 'unidade.csv'), str(tmp_path / 'saida.parquet')
+    _escrever_linhas(csv, linhas[:metade])
+    atualizar_unidade(csv, saida, tpu_cnj)
+    _escrever_linhas(csv, linhas)
+
+    def falhar(*args, **kwargs):
+        raise RuntimeError('interrompida')
+
+    # Para depois de gravar as partes, os sketches e o índice de chaves do trecho novo.
+    with monkeypatch.context() as patch:
+        patch.setattr(incremental.json, 'dump', falhar)
+        with pytest.raises(RuntimeError):
+            atualizar_unidade(csv, saida, tpu_cnj)
+
+    resultado = atualizar_unidade(csv, saida, tpu_cnj)
+
+    assert not resultado.reconstruida
+    assert len(carregar_movimentos(saida)) == len(esperado)
+    with open(incremental.caminhos_estado(saida)[0]) as file:
+        assert json.load(file)['linhas_gravadas'] == len(esperado)
+    assert len(list(tmp_path.glob('saida.chaves.*'))) == 1
+
+
+def test_agregados_acompanham_as_linhas_anexadas(unidade_csv, tpu_cnj, tmp_path):
+    with open(unidade_csv) as file:
+        linhas = file.readlines()
+
+    referencia = tmp_path / 'referencia'
+    referencia.mkdir()
+    _escrever_linhas(referencia / 'unidade.csv', linhas)
+    atualizar_unidade(str(referencia / 'unidade.csv'), str(referencia / 'saida.parquet'), tpu_cnj)
+
+    csv, saida = str(tmp_path / 'unidade.csv'), str(tmp_path / 'saida.parquet')
+    _escrever_linhas(csv, linhas[:len(linhas) // 3])
+    atualizar_unidade(csv, saida, tpu_cnj, chunksize=400)
+    _escrever_linhas(csv, linhas)
+    atualizar_unidade(csv, saida, tpu_cnj, chunksize=400)
+
+    # As tabelas valem para a saída atualizada (mais novas que ela) e batem com as de uma só execução.
+    esperado = carregar_analise_casos(str(referencia / 'saida.parquet'))
+    obtido = carregar_analise_casos(saida)
+    assert obtido is not None
+    for tabela in TABELAS:
+        pd.testing.assert_frame_equal(getattr(obtido, tabela), getattr(esperado, tabela))
+
+    cubo = carregar_cubo_pre_computado(saida)
+    assert cubo is not None
+    pd.testing.assert_frame_equal(
+        cubo.sort_values(DIMENSOES, ignore_index=True),
+        carregar_cubo_pre_computado(str(referencia / 'saida.parquet')).sort_values(DIMENSOES, ignore_index=True),
+    )
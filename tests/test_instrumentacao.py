@@ -0,0 +1,83 @@
+import threading
+
+from src.pipeline.instrumentacao import (
+    VARIAVEL_PERFIL,
+    VARIAVEL_SAIDA,
+    etapa,
+    ler_registros,
+    limpar_registros,
+    registros,
+    resumo,
+)
+
+
+def test_perfil_de_uma_etapa_por_vez(tmp_path, monkeypatch):
+    monkeypatch.setenv(VARIAVEL_PERFIL, str(tmp_path))
+    limpar_registros()
+    dentro = threading.Event()
+    liberar = threading.Event()
+
+    def externa():
+        with etapa('externa'):
+            dentro.set()
+            liberar.wait(5)
+
+    thread = threading.Thread(target=externa)
+    thread.start()
+    dentro.wait(5)
+    # Outra thread, profundidade própria (0): seria perfilada, mas o perfil está ocupado.
+    with etapa('concorrente'), etapa('aninhada'):
+        pass
+    liberar.set()
+    thread.join()
+
+    assert sorted(arquivo.name.split('-')[0] for arquivo in tmp_path.glob('*.prof')) == ['externa']
+    assert sorted(registro.etapa for registro in registros()) == ['aninhada', 'concorrente', 'externa']
+
+    # Livre de novo: a próxima etapa externa é perfilada.
+    with etapa('seguinte'):
+        pass
+    assert len(list(tmp_path.glob('seguinte-*.prof'))) == 1
+
+
+def test_profundidade_por_thread(tmp_path, monkeypatch):
+    monkeypatch.delenv(VARIAVEL_PERFIL, raising=False)
+    dentro = threading.Event()
+    liberar = threading.Event()
+
+    def sem_perfil():
+        with etapa('sem_perfil'):
+            dentro.set()
+            liberar.wait(5)
+
+    thread = threading.Thread(target=sem_perfil)
+    thread.start()
+    dentro.wait(5)
+    # A etapa aberta na outra thread não faz desta uma etapa aninhada.
+    monkeypatch.setenv(VARIAVEL_PERFIL, str(tmp_path))
+    with etapa('externa'):
+        pass
+    liberar.set()
+    thread.join()
+
+    assert len(list(tmp_path.glob('externa-*.prof'))) == 1
+
+
+def test_saida_em_json_lines(tmp_path, monkeypatch):
+    saida = tmp_path / 'metricas.jsonl'
+    monkeypatch.setenv(VARIAVEL_SAIDA, str(saida))
+    monkeypatch.delenv(VARIAVEL_PERFIL, raising=False)
+
+    with etapa('primeira', 3) as medicao:
+        medicao.saida({'a': 1})
+    antes = saida.read_text()
+    with etapa('segunda'):
+        pass
+
+    # Cada etapa só acrescenta a sua linha; as anteriores ficam intactas.
+    assert saida.read_text().startswith(antes)
+    lidos = ler_registros(str(saida))
+    assert [registro['etapa'] for registro in lidos] == ['primeira', 'segunda']
+    assert lidos[0]['linhas_entrada'] == 3
+    assert lidos[0]['linhas_saida'] == 1
+    assert set(resumo(lidos).index) == {'primeira', 'segunda'}
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from src.data.make_dataset import ChavesVistas, load_and_preprocess_data_em_chunks
+from src.data.schema import aplicar_schema
+from src.data.storage import carregar_movimentos
+
+
+def test_pre_processamento_em_chunks_igual_ao_em_memoria(unidade_csv, pre_processado, tmp_path):
+    saida = str(tmp_path / 'pre_processado.parquet')
+
+    linhas = load_and_preprocess_data_em_chunks(unidade_csv, saida, chunksize=700)
+
+    assert linhas == len(pre_processado)
+    pd.testing.assert_frame_equal(
+        aplicar_schema(carregar_movimentos(saida)),
+        pre_processado.reset_index(drop=True),
+        check_categorical=False,
+    )
+
+
+def test_chaves_vistas_marca_so_a_primeira_ocorrencia():
+    rng = np.random.default_rng(0)
+    chaves, vistas = ChavesVistas(), set()
+    for _ in range(20):
+        bloco = pd.DataFrame({
+            'processoID': rng.integers(0, 2_000, 500),
+            'activity': rng.choice(['Despacho', 'Audiência'], 500),
+        })
+        esperado = []
+        for chave in zip(bloco['processoID'], bloco['activity']):
+            esperado.append(chave not in vistas)
+            vistas.add(chave)
+
+        np.testing.assert_array_equal(chaves.marcar_novas(bloco), esperado)
+
+    assert len(chaves) == len(vistas)
+    np.testing.assert_array_equal(ChavesVistas(chaves.hashes).hashes, chaves.hashes)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.visualization.resumo_graficos import (
+    bins_histograma,
+    estatisticas_boxplot,
+    n_paginas,
+    pagina,
+)
+
+
+def test_bins_histograma_igual_ao_numpy():
+    rng = np.random.default_rng(0)
+    valores = pd.Series(np.r_[rng.exponential(3_600, 10_000), np.nan, np.inf])
+
+    contagens, bordas = bins_histograma(valores, bins=25)
+
+    esperado, bordas_esperadas = np.histogram(valores[np.isfinite(valores)], bins=25)
+    np.testing.assert_array_equal(contagens, esperado)
+    np.testing.assert_allclose(bordas, bordas_esperadas)
+    assert contagens.sum() == 10_000
+
+
+def test_bins_histograma_sem_valores():
+    contagens, bordas = bins_histograma(pd.Series([np.nan, None]), bins=10)
+    assert contagens.sum() == 0
+    assert len(bordas) == 11
+
+
+def test_estatisticas_boxplot_iguais_as_do_matplotlib():
+    cbook = pytest.importorskip('matplotlib.cbook')
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'grupo': rng.choice(['Simples', 'Média', 'Alta'], 6_000),
+        'duracao': rng.lognormal(8, 1.5, 6_000),
+    })
+
+    estatisticas = {item['label']: item for item in estatisticas_boxplot(df, 'grupo', 'duracao', max_outliers=10_000)}
+
+    for grupo, valores in df.groupby('grupo')['duracao']:
+        (esperado,) = cbook.boxplot_stats(valores.to_numpy())
+        obtido = estatisticas[grupo]
+        for chave in ('q1', 'med', 'q3', 'whislo', 'whishi', 'mean'):
+            assert obtido[chave] == pytest.approx(esperado[chave]), (grupo, chave)
+        np.testing.assert_allclose(obtido['fliers'], np.sort(esperado['fliers']))
+
+
+def test_outliers_limitados_mantem_os_extremos():
+    valores = np.r_[np.linspace(0, 1, 10_000), 100 + np.arange(1_000.0)]
+    df = pd.DataFrame({'grupo': 'A', 'duracao': valores})
+
+    (estatistica,) = estatisticas_boxplot(df, 'grupo', 'duracao', max_outliers=50)
+
+    assert len(estatistica['fliers']) == 50
+    assert estatistica['fliers'][0] == 100
+    assert estatistica['fliers'][-1] == valores.max()
+
+
+def test_paginas_limitadas():
+    df = pd.DataFrame({'a': range(1_234)})
+
+    assert n_paginas(df, 500) == 3
+    assert len(pagina(df, 1, 500)) == 500
+    assert pagina(df, 3, 500)['a'].tolist() == list(range(1_000, 1_234))
+    # Números fora do intervalo ficam na primeira/última página.
+    assert pagina(df, 99, 500)['a'].iloc[0] == 1_000
+    assert pagina(df, 0, 500)['a'].iloc[0] == 0
+    assert n_paginas(df.iloc[:0]) == 1
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from src.data.schema import (
+    TIPO_TEXTO_LIVRE,
+    aplicar_schema,
+    mapear_com_padrao,
+    preencher_na,
+    reduzir_inteiro,
+    relatorio_memoria,
+)
+
+
+def test_aplicar_schema_compacta_sem_mudar_valores(processado):
+    original = processado.copy()
+    objetos = original.astype({
+        coluna: object for coluna in original.columns if isinstance(original[coluna].dtype, pd.CategoricalDtype)
+    })
+
+    compacto = aplicar_schema(objetos.copy())
+
+    for coluna in ['activity', 'activity_group', 'movement_detail', 'complexity']:
+        assert isinstance(compacto[coluna].dtype, pd.CategoricalDtype), coluna
+    assert compacto['processoID'].dtype.itemsize < 8
+    pd.testing.assert_frame_equal(compacto, original, check_categorical=False)
+    # Idempotente: uma segunda passada não muda nada.
+    pd.testing.assert_frame_equal(aplicar_schema(compacto.copy()), compacto)
+
+    relatorio = relatorio_memoria(objetos, compacto)
+    assert relatorio.loc['TOTAL', 'mib_depois'] < relatorio.loc['TOTAL', 'mib_antes']
+
+
+def test_texto_de_alta_cardinalidade_fica_como_string_arrow():
+    df = pd.DataFrame({'documento': [f'doc {i}' for i in range(10)], 'complemento': ['a', 'b'] * 5})
+
+    aplicar_schema(df)
+
+    assert df['documento'].dtype == TIPO_TEXTO_LIVRE
+    assert isinstance(df['complemento'].dtype, pd.CategoricalDtype)
+
+
+def test_reduzir_inteiro():
+    assert reduzir_inteiro(pd.Series([1, 2, 300])).dtype == np.int16
+    assert reduzir_inteiro(pd.Series([1.0, np.nan, 3.0])).dtype == 'Int8'
+    decimais = pd.Series([1.5, 2.0])
+    assert reduzir_inteiro(decimais) is decimais
+
+
+def test_preencher_e_mapear_em_categoricas_como_em_objetos():
+    objetos = pd.Series(['a', None, 'b', 'c', None], dtype=object)
+    categoricas = objetos.astype('category')
+    mapa = {'a': 'grupo 1', 'b': 'grupo 1'}
+
+    preenchida = preencher_na(categoricas, 'N/A')
+    mapeada = mapear_com_padrao(preenchida, mapa)
+
+    assert isinstance(mapeada.dtype, pd.CategoricalDtype)
+    assert preenchida.astype(object).tolist() == objetos.fillna('N/A').tolist()
+    assert mapeada.astype(object).tolist() == mapear_com_padrao(objetos.fillna('N/A'), mapa).tolist()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.sketches import HyperLogLog, TDigest, combinar_sketches, construir_sketches
+
+QUANTIS = [0.01, 0.5, 0.9, 0.99, 0.999]
+
+
+def amostra(distribuicao):
+    rng = np.random.default_rng(0)
+    if distribuicao == 'lognormal':
+        return rng.lognormal(10, 1.5, 200_000)
+    return rng.pareto(1.5, 200_000)
+
+
+@pytest.mark.parametrize('distribuicao', ['lognormal', 'pareto'])
+def test_quantis_proximos_dos_exatos(distribuicao):
+    valores = amostra(distribuicao)
+    exatos = np.quantile(valores, QUANTIS)
+
+    digest = TDigest.de_valores(valores)
+    np.testing.assert_allclose(digest.quantil(QUANTIS), exatos, rtol=0.02)
+
+
+@pytest.mark.parametrize('distribuicao', ['lognormal', 'pareto'])
+def test_quantis_da_combinacao_proximos_dos_exatos(distribuicao):
+    valores = amostra(distribuicao)
+    exatos = np.quantile(valores, QUANTIS)
+
+    digest = TDigest.vazio()
+    for parte in np.array_split(valores, 20):
+        digest = digest.combinar(TDigest.de_valores(parte))
+    assert digest.n == len(valores)
+    np.testing.assert_allclose(digest.quantil(QUANTIS), exatos, rtol=0.02)
+
+
+def test_hll_do_mesmo_id_independe_do_tipo():
+    ids = np.arange(100_000, 200_000)
+    como_int64 = HyperLogLog.de_valores(pd.Series(ids, dtype='int64'))
+    com_nulo = pd.Series([*ids, None], dtype='Int64')
+    como_int64_anulavel = HyperLogLog.de_valores(com_nulo)
+    como_objeto = HyperLogLog.de_valores(com_nulo.to_numpy())
+
+    np.testing.assert_array_equal(como_int64.registradores, como_int64_anulavel.registradores)
+    np.testing.assert_array_equal(como_int64.registradores, como_objeto.registradores)
+    assert como_int64.combinar(como_int64_anulavel).estimativa() == pytest.approx(len(ids), rel=0.03)
+
+
+def test_sketches_de_unidades_com_tipos_diferentes(processado):
+    inteiro = processado.assign(processoID=processado['processoID'].astype('int64'))
+    # Uma unidade com um processoID nulo fica com o tipo anulável (ver `reduzir_inteiro`).
+    anulavel = processado.assign(processoID=processado['processoID'].astype('Int64'))
+    anulavel.loc[anulavel.index[0], 'processoID'] = pd.NA
+
+    combinados = combinar_sketches([construir_sketches(inteiro), construir_sketches(anulavel)], por=[])
+    distintos = processado['processoID'].nunique()
+    assert combinados['hll'].iloc[0].estimativa() == pytest.approx(distintos, rel=0.03)
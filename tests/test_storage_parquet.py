@@ -0,0 +1,66 @@
+import pandas as pd
+from src.data.schema import aplicar_schema
+from src.data.storage import (
+    EscritorMovimentos,
+    caminho_csv,
+    carregar_movimentos,
+    exportar_csv_em_blocos,
+    salvar_movimentos,
+)
+
+
+def test_parquet_preserva_valores_e_tipos(processado, tmp_path):
+    caminho = str(tmp_path / 'processado.parquet')
+
+    salvar_movimentos(processado, caminho, exportar_csv=True)
+    lido = carregar_movimentos(caminho)
+
+    assert pd.api.types.is_datetime64_dtype(lido['dataInicio'])
+    assert isinstance(lido['activity'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(
+        aplicar_schema(lido), processado.reset_index(drop=True), check_categorical=False,
+    )
+    # O CSV é só uma exportação, com as mesmas linhas.
+    assert len(pd.read_csv(caminho_csv(caminho))) == len(processado)
+
+
+def test_projecao_e_filtros_no_leitor(processado, tmp_path):
+    caminho = str(tmp_path / 'processado.parquet')
+    salvar_movimentos(processado, caminho)
+    complexidade = processado['complexity'].value_counts().index[0]
+    corte = processado['dataInicio'].median()
+
+    lido = carregar_movimentos(
+        caminho,
+        colunas=['processoID', 'complexity', 'dataInicio'],
+        filtros=[('complexity', 'in', [complexidade]), ('dataInicio', '>=', corte)],
+    )
+
+    esperado = processado.loc[
+        (processado['complexity'] == complexidade) & (processado['dataInicio'] >= corte),
+        ['processoID', 'complexity', 'dataInicio'],
+    ]
+    assert list(lido.columns) == ['processoID', 'complexity', 'dataInicio']
+    pd.testing.assert_frame_equal(
+        aplicar_schema(lido).astype({'complexity': object}),
+        esperado.reset_index(drop=True).astype({'complexity': object}),
+    )
+
+
+def test_escritor_em_blocos_mantem_o_schema(pre_processado, tmp_path):
+    caminho = str(tmp_path / 'pre_processado.parquet')
+    blocos = [pre_processado.iloc[:1000].copy(), pre_processado.iloc[1000:].copy()]
+    # Um bloco com uma coluna de texto inteiramente nula não muda o tipo da coluna.
+    blocos[1]['complemento'] = None
+
+    with EscritorMovimentos(caminho) as escritor:
+        for bloco in blocos:
+            escritor.escrever(bloco)
+
+    assert escritor.linhas == len(pre_processado)
+    lido = carregar_movimentos(caminho)
+    assert lido['complemento'].iloc[1000:].isna().all()
+    assert lido['complemento'].iloc[:1000].tolist() == pre_processado['complemento'].iloc[:1000].tolist()
+
+    assert exportar_csv_em_blocos(caminho) == len(pre_processado)
+    assert len(pd.read_csv(caminho_csv(caminho))) == len(pre_processado)
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+from src.data.make_dataset import get_cnj_grouping
+from src.data.tpu_index import CAMINHO_TPU, GRUPO_PADRAO, carregar_indice_tpu
+from src.features.build_features import mapear_para_tpu
+
+
+def _grupos_recursivos(cnj_tree):
+    """`get_cnj_grouping` original: percurso recursivo da árvore."""
+    grupos = {}
+
+    def preencher_grupo(node, current_group=None):
+        for key, sub_node in node.items():
+            if not sub_node:
+                grupos[int(key)] = current_group if current_group else GRUPO_PADRAO
+            else:
+                preencher_grupo(sub_node, current_group or key)
+
+    preencher_grupo(cnj_tree)
+    return grupos
+
+
+def _classe_recursiva(cnj_tree, activity):
+    """`mapear_para_tpu` original: busca recursiva a cada chamada."""
+    def buscar_classe_tpu(node, activity):
+        if activity in node:
+            return node[activity] if node[activity] else activity
+        for sub_node in node.values():
+            result = buscar_classe_tpu(sub_node, activity)
+            if result:
+                return result
+        return None
+
+    return buscar_classe_tpu(cnj_tree, activity) or GRUPO_PADRAO
+
+
+def _escrever_arvore(caminho, arvore, mtime_ns=None):
+    with open(caminho, 'w') as file:
+        json.dump(arvore, file)
+    if mtime_ns is not None:
+        os.utime(caminho, ns=(mtime_ns, mtime_ns))
+
+
+def test_indice_reconstruido_quando_o_json_muda(tmp_path):
+    caminho = str(tmp_path / 'arvore.json')
+    _escrever_arvore(caminho, {'Grupo A': {'10': {}}, '99': {}}, mtime_ns=1_000_000_000)
+    assert carregar_indice_tpu(caminho).folha_para_grupo == {10: 'Grupo A', 99: GRUPO_PADRAO}
+
+    # Mesmo tamanho e mesmo mtime: o índice (em memória e no pickle) é reaproveitado.
+    _escrever_arvore(caminho, {'Grupo B': {'10': {}}, '99': {}}, mtime_ns=1_000_000_000)
+    assert carregar_indice_tpu(caminho).folha_para_grupo == {10: 'Grupo A', 99: GRUPO_PADRAO}
+
+    # Só o mtime muda.
+    _escrever_arvore(caminho, {'Grupo B': {'10': {}}, '98': {}}, mtime_ns=2_000_000_000)
+    assert carregar_indice_tpu(caminho).folha_para_grupo == {10: 'Grupo B', 98: GRUPO_PADRAO}
+
+    # Só o tamanho muda.
+    _escrever_arvore(caminho, {'Grupo B': {'10': {}, '11': {}}, '98': {}}, mtime_ns=2_000_000_000)
+    indice = carregar_indice_tpu(caminho)
+    assert indice.folha_para_grupo == {10: 'Grupo B', 11: 'Grupo B', 98: GRUPO_PADRAO}
+    assert indice.caminho['11'] == ('Grupo B', '11')
+    assert os.path.exists(caminho + '.idx.pkl')
+
+
+@pytest.fixture(scope='module')
+def arvore_tpu():
+    with open(CAMINHO_TPU) as file:
+        return json.load(file)
+
+
+def test_get_cnj_grouping_igual_ao_recursivo(arvore_tpu, tpu_cnj):
+    assert tpu_cnj == _grupos_recursivos(arvore_tpu)
+    assert get_cnj_grouping() == tpu_cnj
+
+
+@pytest.mark.usefixtures('tpu_cnj')  # pula sem a árvore do projeto
+def test_mapear_para_tpu_igual_ao_recursivo(arvore_tpu):
+    chaves = [*carregar_indice_tpu().pai, 'atividade inexistente']
+    for chave in chaves:
+        assert mapear_para_tpu(chave) == _classe_recursiva(arvore_tpu, chave), chave